@@ -0,0 +1,82 @@
+"""
+Renders a 2,000-line source file as an image of highlighted code, like the code_to_image example:
+a row of tokens per line, each one a Text in a monospaced font.
+
+"shaping" only shapes the tokens, with the process caches cleared first. "render" renders the whole
+image (already built), also with the caches cleared, so every token is shaped again.
+
+Run it from the repository root, optionally with the source file and the font to use (a system
+family name or a font file):
+
+    python benchmarks/code_rendering.py [source file] [font]
+"""
+import keyword
+import re
+import statistics
+import sys
+import time
+import pictex
+from pictex import Canvas, Text, Row, Column
+from pictex.models import Style, FontSmoothing
+from pictex.text import FontManager, TextShaper
+
+LINES = 2000
+RENDERS = 3
+TOKEN_PATTERN = re.compile(r"\s+|\w+|#.*|\"[^\"]*\"|'[^']*'|.")
+COLORS = {"keyword": "#C678DD", "string": "#98C379", "comment": "#7F848E", "number": "#D19A66", "text": "#ABB2BF"}
+
+def _token_color(token: str) -> str:
+    if keyword.iskeyword(token):
+        return COLORS["keyword"]
+    if token.startswith(("'", '"')):
+        return COLORS["string"]
+    if token.startswith("#"):
+        return COLORS["comment"]
+    if token.isdigit():
+        return COLORS["number"]
+    return COLORS["text"]
+
+def _read_lines(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as source:
+        lines = source.read().splitlines()
+    # Repeated up to LINES, numbering them so every line is different
+    return [f"{lines[index % len(lines)]}  # {index}" for index in range(LINES)]
+
+def _code_block(lines: list[str]) -> Column:
+    return Column(*[
+        Row(
+            Text(f"{number: >4}").color("#636D83").margin(0, 15, 0, 0),
+            Row(*[Text(token).color(_token_color(token)) for token in TOKEN_PATTERN.findall(line)]),
+        )
+        for number, line in enumerate(lines, 1)
+    ]).padding(15, 20).background_color("#282C34")
+
+def _time(name: str, function) -> None:
+    timings = []
+    for _ in range(RENDERS):
+        pictex.clear_caches()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    print(f"{name:<8} {statistics.median(timings) * 1000:8.1f} ms (median of {RENDERS})")
+
+def _shape_tokens(font: str, tokens: list[str]) -> None:
+    style = Style()
+    style.font_family.set(font)
+    style.font_size.set(14)
+    shaper = TextShaper(style, FontManager(style, FontSmoothing.SUBPIXEL))
+    for token in tokens:
+        shaper.shape(token)
+
+if __name__ == "__main__":
+    source_path = sys.argv[1] if len(sys.argv) > 1 else __file__
+    font = sys.argv[2] if len(sys.argv) > 2 else "DejaVu Sans Mono"
+    lines = _read_lines(source_path)
+    print(f"{len(lines)} lines, font '{font}'")
+
+    tokens = [token for line in lines for token in TOKEN_PATTERN.findall(line)]
+    _time("shaping", lambda: _shape_tokens(font, tokens))
+    # Built once: containers copy their children, which is slower than rendering them
+    code_block = _code_block(lines)
+    canvas = Canvas().font_family(font).font_size(14)
+    _time("render", lambda: canvas.render(code_block))
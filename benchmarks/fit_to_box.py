@@ -0,0 +1,66 @@
+"""
+Compares fitting a title in a fixed box with `Text.fit_to_box()` against the usual
+workaround: rendering again and again, with decreasing font sizes, until it fits.
+
+Shaping calls are the lines (or words, when wrapping) that had to be shaped, taken
+from the misses of the "shaped_lines" cache.
+
+Run it from the repository root:
+
+    python benchmarks/fit_to_box.py
+"""
+import time
+import pictex
+from pictex import Canvas, Text
+
+BOX_WIDTH, BOX_HEIGHT = 640, 200
+MIN_SIZE, MAX_SIZE = 12, 120
+TITLES = [
+    "How to cook the perfect steak",
+    "The 10 best places to visit this summer, ranked by our readers",
+    "Why your code is slow: a deep dive into profiling Python applications in production",
+    "A short one",
+    "Breaking news: local developer finally fixes the flaky test that haunted the team for years",
+]
+
+def _title(text: str) -> Text:
+    return Text(text).size(BOX_WIDTH, BOX_HEIGHT).text_wrap("wrap")
+
+def _fits(canvas: Canvas, text: str, font_size: float) -> bool:
+    # The content grows beyond the box when the text overflows it
+    image = canvas.render(Text(text).font_size(font_size).size(width=BOX_WIDTH).text_wrap("wrap"))
+    return image.width <= BOX_WIDTH and image.height <= BOX_HEIGHT
+
+def render_with_loop(canvas: Canvas, text: str) -> int:
+    """Tries decreasing font sizes, one full render each, and returns the number of renders."""
+    renders = 0
+    font_size = MAX_SIZE
+    while font_size > MIN_SIZE:
+        renders += 1
+        if _fits(canvas, text, font_size):
+            break
+        font_size -= 4
+    canvas.render(_title(text).font_size(font_size))
+    return renders + 1
+
+def render_with_fit_to_box(canvas: Canvas, text: str) -> int:
+    canvas.render(_title(text).fit_to_box(MIN_SIZE, MAX_SIZE))
+    return 1
+
+def run(name: str, render) -> None:
+    canvas = Canvas()
+    pictex.clear_caches()
+    renders = 0
+    start = time.perf_counter()
+    for title in TITLES:
+        renders += render(canvas, title)
+    elapsed = time.perf_counter() - start
+    shaping_calls = pictex.cache_info()["shaped_lines"].misses
+    print(
+        f"{name:<14} {elapsed * 1000 / len(TITLES):8.2f} ms/title  "
+        f"{renders / len(TITLES):6.1f} renders/title  {shaping_calls / len(TITLES):7.1f} shaping calls/title"
+    )
+
+if __name__ == "__main__":
+    run("render loop", render_with_loop)
+    run("fit_to_box()", render_with_fit_to_box)
@@ -0,0 +1,50 @@
+"""
+Renders the same texts many times, like a long-running worker does, and reports the memory
+of the process and the number of entries of the typeface registry along the way. Both should
+stay flat once the first renders have loaded the fonts.
+
+The texts use a font file, a system font family with that file as fallback, a font
+found in the system for the emoji, and an instance of a variable font.
+
+Run it from the repository root, optionally with the number of renders (100,000 by default):
+
+    python benchmarks/registry_soak.py [renders]
+"""
+import os
+import sys
+import time
+import pictex
+from pictex import Canvas, Text, Row
+from pictex.text import TypefaceLoader
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "assets")
+STATIC_FONT_PATH = os.path.join(ASSETS_DIR, "Lato-BoldItalic.ttf")
+VARIABLE_FONT_PATH = os.path.join(ASSETS_DIR, "Oswald-VariableFont_wght.ttf")
+REPORT_EVERY = 10_000
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        resident_pages = int(statm.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+def _report(renders: int, start: float) -> None:
+    print(
+        f"{renders:>8} renders  {time.perf_counter() - start:7.1f} s  "
+        f"RSS {_rss_mb():7.1f} MB  registry {len(TypefaceLoader._registry):5} entries"
+    )
+
+def run(total_renders: int) -> None:
+    canvas = Canvas().font_family(STATIC_FONT_PATH).font_size(24)
+    start = time.perf_counter()
+    for index in range(1, total_renders + 1):
+        canvas.render(Row(
+            Text(f"Order #{index % 500} ☺"),
+            Text("Shipped").font_family("sans-serif").font_fallbacks(STATIC_FONT_PATH),
+            Text("Express").font_family(VARIABLE_FONT_PATH).font_weight(700),
+        ).gap(10))
+        if index % REPORT_EVERY == 0:
+            _report(index, start)
+    print(pictex.cache_info()["typeface_registry"])
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
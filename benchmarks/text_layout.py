@@ -0,0 +1,50 @@
+"""
+Measures the layout and painting of text-heavy images: a table of decorated labels and a few
+wrapped paragraphs. The shaped lines are cached after the first render, so the timings show
+the cost of laying out and painting the text rather than shaping it.
+
+Run it from the repository root:
+
+    python benchmarks/text_layout.py
+"""
+import statistics
+import time
+from pictex import Canvas, Text, Row, Column
+
+ROWS = 200
+RENDERS = 20
+PARAGRAPH = (
+    "Layout engines spend a surprising amount of time on small things: asking fonts for their "
+    "metrics, computing the gap between lines and placing decorations under every line of text."
+)
+
+def _table() -> Column:
+    return Column(*[
+        Row(
+            Text(f"Item {index}"),
+            Text(f"{index * 3.5:.2f} €").underline(),
+            Text("sold out" if index % 7 == 0 else "available").strikethrough(),
+        ).gap(20)
+        for index in range(ROWS)
+    ])
+
+def _paragraphs() -> Column:
+    return Column(*[
+        Text(f"{index}. {PARAGRAPH}\n{PARAGRAPH}").size(width=600).text_wrap("wrap").underline()
+        for index in range(20)
+    ]).gap(10)
+
+def run(name: str, canvas: Canvas, build) -> None:
+    canvas.render(build())
+    timings = []
+    for _ in range(RENDERS):
+        element = build()
+        start = time.perf_counter()
+        canvas.render(element)
+        timings.append(time.perf_counter() - start)
+    print(f"{name:<12} {statistics.median(timings) * 1000:8.2f} ms/render (median of {RENDERS})")
+
+if __name__ == "__main__":
+    canvas = Canvas().font_size(16).line_height(1.4)
+    run("table", canvas, _table)
+    run("paragraphs", canvas, _paragraphs)
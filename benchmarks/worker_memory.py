@@ -0,0 +1,81 @@
+"""
+Reports the memory used by worker processes that render with the same large fonts, loading them
+like pictex does (Skia maps the font files in memory, so the pages are shared by every process
+through the OS page cache) and copying the font bytes into each process instead.
+
+RSS counts the shared pages in every process, PSS divides them between the processes sharing
+them, and private is what each worker adds on its own. Linux only (it reads /proc/self/smaps_rollup).
+
+Run it from the repository root, optionally with the fonts to load (the largest installed
+fonts by default):
+
+    python benchmarks/worker_memory.py [font paths...]
+"""
+import multiprocessing
+import os
+import sys
+import skia
+from pictex.text import TypefaceLoader
+from pictex.text.system_font_index import get_default_font_dirs
+
+WORKERS = 8
+FONT_COUNT = 3
+# Glyphs from many blocks, so a good part of each font is read
+SAMPLE_TEXT = "".join(chr(codepoint) for codepoint in range(0x20, 0x3000, 7))
+
+def _largest_installed_fonts() -> list[str]:
+    paths = [
+        os.path.join(directory, filename)
+        for font_dir in get_default_font_dirs()
+        for directory, _, filenames in os.walk(font_dir)
+        for filename in filenames
+        if filename.lower().endswith((".ttf", ".otf", ".ttc"))
+    ]
+    return sorted(paths, key=os.path.getsize, reverse=True)[:FONT_COUNT]
+
+def _load_copied(path: str) -> skia.Typeface:
+    with open(path, "rb") as font_file:
+        return skia.Typeface.MakeFromData(skia.Data.MakeWithCopy(font_file.read()))
+
+def _memory_mb() -> dict[str, float]:
+    memory = {}
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                memory[name] = int(value.split()[0]) / 1024
+    return memory
+
+def _worker(mode: str, paths: list[str], ready, done, results) -> None:
+    before = _memory_mb()
+    typefaces = [TypefaceLoader.load_from_file(path) if mode == "mapped" else _load_copied(path) for path in paths]
+    canvas = skia.Surface(4000, 100).getCanvas()
+    for typeface in typefaces:
+        # Drawing reads the glyph outlines, so the pages of the font are actually loaded
+        canvas.drawString(SAMPLE_TEXT, 0, 50, skia.Font(typeface, 20), skia.Paint())
+
+    ready.wait() # All the workers are alive when measuring, so the shared pages are split between them
+    after = _memory_mb()
+    results.put({name: after[name] - before[name] for name in after})
+    done.wait()
+
+def run(mode: str, paths: list[str]) -> None:
+    context = multiprocessing.get_context("spawn")
+    ready, done, results = context.Barrier(WORKERS), context.Barrier(WORKERS), context.Queue()
+    workers = [context.Process(target=_worker, args=(mode, paths, ready, done, results)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    deltas = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    average = lambda name: sum(delta[name] for delta in deltas) / len(deltas)
+    private = average("Private_Clean") + average("Private_Dirty")
+    print(f"{mode:<8} per worker: RSS {average('Rss'):7.1f} MB  PSS {average('Pss'):7.1f} MB  private {private:7.1f} MB")
+
+if __name__ == "__main__":
+    font_paths = sys.argv[1:] or _largest_installed_fonts()
+    size_mb = sum(os.path.getsize(path) for path in font_paths) / 1024 ** 2
+    print(f"{WORKERS} workers, {len(font_paths)} fonts ({size_mb:.1f} MB): {', '.join(map(os.path.basename, font_paths))}")
+    run("mapped", font_paths)
+    run("copied", font_paths)
@@ -2,15 +2,19 @@
 pictex: A Python library for creating complex visual compositions and beautifully styled images.
 """
 
-from .builders import Canvas, Text, Row, Column, Image, Element
+from .builders import Canvas, FrozenCanvas, Text, Row, Column, Image, Element
 from .models.public import *
 from .bitmap_image import BitmapImage
 from .vector_image import VectorImage
+from .serialization import from_dict, from_json, json_schema
+from .utils import cache_info, clear_caches, CacheInfo
+from .preload import preload
 
 __version__ = "1.1.1"
 
 __all__ = [
     "Canvas",
+    "FrozenCanvas",
     "Text",
     "Row",
     "Column",
@@ -23,6 +27,7 @@ __all__ = [
     "OutlineStroke",
     "FontSmoothing",
     "TextAlign",
+    "TextWrap",
     "FontStyle",
     "FontWeight",
     "TextDecoration",
@@ -45,4 +50,11 @@ __all__ = [
     "HorizontalAlignment",
     "VerticalDistribution",
     "VerticalAlignment",
+    "from_dict",
+    "from_json",
+    "json_schema",
+    "cache_info",
+    "clear_caches",
+    "CacheInfo",
+    "preload",
 ]
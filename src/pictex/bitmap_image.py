@@ -1,9 +1,11 @@
 from __future__ import annotations
-from typing import Literal
+from typing import Literal, Optional
+from multiprocessing import resource_tracker, shared_memory
 import skia
 import numpy as np
 from .models import Box
 import os
+import weakref
 
 class BitmapImage:
     """A wrapper around a rendered raster image.
@@ -29,6 +31,11 @@ class BitmapImage:
         cv2.waitKey(0)
         ```
 
+    `BitmapImage` objects can be pickled, so they can be returned from
+    `multiprocessing` or `concurrent.futures.ProcessPoolExecutor` workers. They
+    are pickled as raw pixels; see `share()` to move large images through
+    shared memory instead.
+
     Attributes:
         content_box (Box): The bounding box of the content (text + padding),
             relative to the image's top-left corner.
@@ -51,6 +58,44 @@ class BitmapImage:
         """
         self._skia_image = skia_image
         self._content_box = content_box
+        self._shared_pixels: Optional[_SharedPixels] = None
+
+    def __reduce__(self):
+        image = self._skia_image
+        image_format = (image.width(), image.height(), image.colorType(), image.alphaType())
+        if self._shared_pixels is None:
+            return _from_pixels, (self.to_bytes(), *image_format, self._content_box)
+
+        self._shared_pixels.hand_over()
+        return _from_shared_memory, (self._shared_pixels.name, self._shared_pixels.size, *image_format, self._content_box)
+
+    def share(self) -> BitmapImage:
+        """Returns a copy of this image that is pickled through shared memory.
+
+        The pixels are copied once to a `multiprocessing.shared_memory` block,
+        and only the name of the block is pickled. This avoids copying large
+        images through the pipes used by process pools. The block belongs to
+        the returned image until it's pickled, and it's released when the image
+        is garbage collected without being pickled. Once pickled, the block is
+        released by the process that unpickles it (even if loading it fails),
+        so the image can only be loaded once, and a pickled copy that is never
+        loaded keeps its block until the system is restarted.
+
+        Example:
+            ```python
+            def render_job(text: str) -> BitmapImage:
+                return Canvas().font_size(200).render(text).share()
+
+            with ProcessPoolExecutor() as executor:
+                images = list(executor.map(render_job, ["One", "Two"]))
+            ```
+
+        Returns:
+            A new `BitmapImage` with the same pixels and content box.
+        """
+        shared = BitmapImage(self._skia_image, self._content_box)
+        shared._shared_pixels = _SharedPixels(self.to_bytes())
+        return shared
 
     @property
     def content_box(self) -> Box:
@@ -185,3 +230,73 @@ class BitmapImage:
             ImportError: If the Pillow library is not installed.
         """
         self.to_pillow().show()
+
+def _from_pixels(
+        pixels: bytes,
+        width: int,
+        height: int,
+        color_type: skia.ColorType,
+        alpha_type: skia.AlphaType,
+        content_box: Box,
+) -> BitmapImage:
+    image = skia.Image.frombytes(pixels, (width, height), color_type, alpha_type)
+    return BitmapImage(image, content_box)
+
+class _SharedPixels:
+    """
+    The pixels of a shared image, in a shared memory block owned by this process until the image is pickled.
+    While it's owned, the block is registered in the resource tracker and released when the image is garbage collected.
+    """
+
+    def __init__(self, pixels: bytes):
+        self.size = len(pixels)
+        block = shared_memory.SharedMemory(create=True, size=max(self.size, 1))
+        block.buf[:self.size] = pixels
+        self.name = block.name
+        self._finalizer = weakref.finalize(self, _release_shared_memory, block, os.getpid())
+
+    def hand_over(self) -> None:
+        """
+        Gives the block to the process that unpickles the image. This process must neither release it
+        nor let its resource tracker warn about it as leaked (or unlink it, maybe before it's read) at exit.
+        """
+        detached = self._finalizer.detach()
+        if detached is None:
+            # Already handed over by a previous pickling
+            return
+
+        _, _, (block, _), _ = detached
+        block.close()
+        if os.name == "posix":
+            # Blocks are only registered on POSIX, Windows releases them when their last handle is closed
+            resource_tracker.unregister(block._name, "shared_memory")
+
+def _release_shared_memory(block: shared_memory.SharedMemory, owner_pid: int) -> None:
+    block.close()
+    # Forked children have a copy of the image, but the block is still owned by the parent
+    if os.getpid() == owner_pid:
+        block.unlink()
+
+def _from_shared_memory(
+        name: str,
+        size: int,
+        width: int,
+        height: int,
+        color_type: skia.ColorType,
+        alpha_type: skia.AlphaType,
+        content_box: Box,
+) -> BitmapImage:
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        raise ValueError("The pixels of this shared image were already loaded: a shared image can only be loaded once") from None
+
+    pixels = block.buf[:size]
+    try:
+        image = skia.Image.frombytes(pixels, (width, height), color_type, alpha_type)
+    finally:
+        # Released even if loading fails (the traceback would keep the view, and the block couldn't be closed)
+        pixels.release()
+        block.unlink()
+        block.close()
+    return BitmapImage(image, content_box)
@@ -1,4 +1,5 @@
 from .canvas import Canvas
+from .frozen_canvas import FrozenCanvas
 from .container import Container
 from .element import Element
 from .row import Row
@@ -1,12 +1,11 @@
 from __future__ import annotations
 from typing import Union
 from .element import Element
-from .row import Row
 from .stylable import Stylable
+from .frozen_canvas import FrozenCanvas
 from ..models import *
 from ..bitmap_image import BitmapImage
 from ..vector_image import VectorImage
-from ..renderer import Renderer
 from .with_size_mixin import WithSizeMixin
 
 class Canvas(Stylable, WithSizeMixin):
@@ -30,6 +29,18 @@ class Canvas(Stylable, WithSizeMixin):
         ```
     """
 
+    def freeze(self) -> FrozenCanvas:
+        """Creates an immutable snapshot of the current canvas configuration.
+
+        The returned `FrozenCanvas` can render exactly like this canvas, but
+        it's not affected by later changes to this canvas, and it's safe to
+        render from several threads at the same time.
+
+        Returns:
+            A `FrozenCanvas` with a copy of the current styles.
+        """
+        return FrozenCanvas(self._style)
+
     def render(
             self,
             *elements: Union[Element, str],
@@ -50,14 +61,15 @@ class Canvas(Stylable, WithSizeMixin):
         Returns:
             An `Image` object containing the rendered result.
         """
-        font_smoothing = font_smoothing if isinstance(font_smoothing, FontSmoothing) else FontSmoothing(font_smoothing)
-        renderer = Renderer()
-        element = Row(*elements)
-        element._style = self._style
-        root = element._to_node()
-        return renderer.render_as_bitmap(root, crop_mode, font_smoothing)
+        return self.freeze().render(*elements, crop_mode=crop_mode, font_smoothing=font_smoothing)
 
-    def render_as_svg(self, *elements: Union[Element, str], embed_font: bool = True) -> VectorImage:
+    def render_as_svg(
+            self,
+            *elements: Union[Element, str],
+            embed_font: bool = True,
+            subset_fonts: bool = True,
+            woff2_fonts: bool = False
+    ) -> VectorImage:
         """Renders the given elements as a scalable vector graphic (SVG).
 
         This method produces a vector-based image, ideal for web use and
@@ -72,12 +84,19 @@ class Canvas(Stylable, WithSizeMixin):
                 font is used with this option enabled. If `False`, the SVG will
                 reference the font by name, relying on the viewing system to
                 have the font installed.
+            subset_fonts: If `True` (default), the embedded fonts only include the
+                glyphs used in the SVG, which makes them much smaller. It requires
+                the `svg` extra (`pip install "pictex[svg]"`); without it, the whole
+                font files are embedded.
+            woff2_fonts: If `True`, the embedded fonts are compressed as WOFF2.
+                It requires the `svg` extra.
 
         Returns:
             A `VectorImage` object containing the SVG data.
         """
-        renderer = Renderer()
-        element = Row(*elements)
-        element._style = self._style
-        root = element._to_node()
-        return renderer.render_as_svg(root, embed_font)
+        return self.freeze().render_as_svg(
+            *elements,
+            embed_font=embed_font,
+            subset_fonts=subset_fonts,
+            woff2_fonts=woff2_fonts
+        )
@@ -5,5 +5,40 @@ from ..nodes import Node
 
 class Element(Stylable, WithPositionMixin, WithSizeMixin):
 
+    def to_dict(self) -> dict:
+        """Serializes the element, and all its descendants, into a dictionary.
+
+        The dictionary only contains strings, numbers, lists and dictionaries,
+        and includes every style property explicitly set on each element. It
+        can be rebuilt into an element with `pictex.from_dict()`.
+
+        Example:
+            ```python
+            import pictex
+
+            data = Text("Hello").font_size(40).color("blue").to_dict()
+            # {'type': 'text', 'text': 'Hello', 'style': {'font_size': 40, 'color': '#0000ffff'}}
+            element = pictex.from_dict(data)
+            ```
+
+        Returns:
+            A dictionary describing the element tree.
+        """
+        from ..serialization import to_dict
+        return to_dict(self)
+
+    def to_json(self) -> str:
+        """Serializes the element, and all its descendants, into canonical JSON.
+
+        The output is compact and deterministic: equal element trees always
+        produce the same string, so it can be used as a cache key. It can be
+        rebuilt into an element with `pictex.from_json()`.
+
+        Returns:
+            A JSON string describing the element tree.
+        """
+        from ..serialization import to_json
+        return to_json(self)
+
     def _to_node(self) -> Node:
         raise NotImplementedError()
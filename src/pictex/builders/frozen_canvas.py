@@ -0,0 +1,102 @@
+from __future__ import annotations
+from copy import deepcopy
+from typing import Union
+from .element import Element
+from .row import Row
+from .text import Text
+from ..models import Style, CropMode, FontSmoothing
+from ..bitmap_image import BitmapImage
+from ..vector_image import VectorImage
+from ..renderer import Renderer
+
+class FrozenCanvas:
+    """An immutable snapshot of a `Canvas` configuration.
+
+    A `FrozenCanvas` is created by calling `Canvas.freeze()`. It keeps its own
+    copy of the canvas styles, so later changes to the original `Canvas` don't
+    affect it, and it exposes no styling methods, so it can't be changed either.
+
+    Since rendering never modifies the snapshot, the same `FrozenCanvas` can be
+    shared between threads and used to render from all of them at once.
+
+    Example:
+        ```python
+        from concurrent.futures import ThreadPoolExecutor
+
+        template = Canvas().font_size(40).color("blue").freeze()
+        with ThreadPoolExecutor() as executor:
+            images = list(executor.map(template.render, ["One", "Two", "Three"]))
+        ```
+    """
+
+    __slots__ = ("_style",)
+
+    def __init__(self, style: Style):
+        """Initializes the snapshot.
+
+        Note:
+            This constructor is intended for internal use by the library,
+            typically called from `Canvas.freeze()`.
+
+        Args:
+            style: The styles to snapshot. They are deep-copied.
+        """
+        object.__setattr__(self, "_style", deepcopy(style))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{type(self).__name__}' is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"'{type(self).__name__}' is immutable")
+
+    def __copy__(self) -> FrozenCanvas:
+        return self
+
+    def __deepcopy__(self, memo) -> FrozenCanvas:
+        return self
+
+    def __reduce__(self):
+        return FrozenCanvas, (self._style,)
+
+    def render(
+            self,
+            *elements: Union[Element, str],
+            crop_mode: CropMode = CropMode.NONE,
+            font_smoothing: Union[FontSmoothing, str] = FontSmoothing.SUBPIXEL,
+    ) -> BitmapImage:
+        """Renders an image from the given elements using the frozen styles.
+
+        See `Canvas.render()` for the meaning of each argument.
+
+        Returns:
+            A `BitmapImage` object containing the rendered result.
+        """
+        font_smoothing = font_smoothing if isinstance(font_smoothing, FontSmoothing) else FontSmoothing(font_smoothing)
+        root = self._build_root(*elements)
+        return Renderer().render_as_bitmap(root, crop_mode, font_smoothing)
+
+    def render_as_svg(
+            self,
+            *elements: Union[Element, str],
+            embed_font: bool = True,
+            subset_fonts: bool = True,
+            woff2_fonts: bool = False
+    ) -> VectorImage:
+        """Renders the given elements as a scalable vector graphic (SVG) using the frozen styles.
+
+        See `Canvas.render_as_svg()` for the meaning of each argument.
+
+        Returns:
+            A `VectorImage` object containing the SVG data.
+        """
+        root = self._build_root(*elements)
+        return Renderer().render_as_svg(root, embed_font, subset_fonts, woff2_fonts)
+
+    def _build_root(self, *elements: Union[Element, str]):
+        # The snapshot and the elements are only read while building the render tree (nodes compute
+        #  their own styles from deep copies), so it's safe to share them between concurrent renders,
+        #  and there's no need to copy the elements like Row(*elements) would do.
+        element = Row()
+        element._style = self._style
+        element._children = [Text(child) if isinstance(child, str) else child for child in elements]
+        return element._to_node()
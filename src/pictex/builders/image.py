@@ -1,3 +1,4 @@
+from copy import deepcopy
 from .element import Element
 from .with_size_mixin import WithSizeMixin
 from ..nodes import Node, RowNode
@@ -74,12 +75,16 @@ class Image(Element, WithSizeMixin):
         return self
 
     def _to_node(self) -> Node:
+        style = self._style
         if self._resize_factor != 1.0:
             image = self._style.background_image.get().get_skia_image()
             if not image:
                 raise ValueError(f"Unable to load image '{self._path}'")
             width = image.width()
             height = image.height()
-            self.size(width * self._resize_factor, height * self._resize_factor)
+            # The builder itself is left untouched, since it can be shared between renders
+            style = deepcopy(self._style)
+            style.width.set(self._parse_size_value(width * self._resize_factor))
+            style.height.set(self._parse_size_value(height * self._resize_factor))
 
-        return RowNode(self._style, [])
+        return RowNode(style, [])
@@ -392,6 +392,24 @@ class Stylable:
         self._style.text_align.set(alignment if isinstance(alignment, TextAlign) else TextAlign(alignment))
         return self
 
+    def text_wrap(self, mode: Union[TextWrap, str]) -> Self:
+        """Sets how text is wrapped when it doesn't fit in the width of its element.
+
+        Text is only wrapped when the width is constrained, e.g., with `size(width=...)`
+        or with a `'fill-available'` width. Lines are broken at spaces, and words longer
+        than the width are never split. Explicit newlines (`\\n`) are always respected.
+
+        Args:
+            mode: `TextWrap.NOWRAP` (the default), `TextWrap.WRAP` to fill each line with
+                as many words as possible, or `TextWrap.PRETTY` to balance the length of
+                the lines. A string is also accepted (`"nowrap"`, `"wrap"`, `"pretty"`).
+
+        Returns:
+            The `Self` instance for chaining.
+        """
+        self._style.text_wrap.set(mode if isinstance(mode, TextWrap) else TextWrap(mode))
+        return self
+
     def _build_color(self, color: Union[str, PaintSource]) -> PaintSource:
         """Internal helper to create a SolidColor from a string.
 
@@ -1,6 +1,12 @@
+from typing import Optional, Tuple
 from .element import Element
 from ..nodes import Node, TextNode
 
+try:
+    from typing import Self
+except ImportError:
+    from typing_extensions import Self
+
 class Text(Element):
     """The fundamental builder for creating and styling text.
 
@@ -23,6 +29,44 @@ class Text(Element):
     def __init__(self, text: str):
         super().__init__()
         self._text = text
+        self._font_size_range: Optional[Tuple[float, float]] = None
+
+    def fit_to_box(self, min_size: float, max_size: float) -> Self:
+        """
+        Uses the largest font size, between `min_size` and `max_size`, that makes the text
+        fit in the element box, instead of the font size set with `.font_size()`.
+
+        The box is given by the width and height set with `.size()` (or imposed by the
+        parent, like with `'fill-available'`). A dimension that is not set doesn't limit
+        the font size, so at least one of them should be. If text wrapping is enabled
+        (see `.text_wrap()`), the text is wrapped at each size being tried. When the text
+        doesn't fit even at `min_size`, `min_size` is used and the text overflows.
+
+        The font size is chosen while laying out the element, so no extra renders are needed.
+
+        Example:
+            ```python
+            # A title that shrinks to fit a 400x120 box
+            Text("A very long thumbnail title").size(400, 120).text_wrap("wrap").fit_to_box(12, 80)
+            ```
+
+        Args:
+            min_size: The minimum font size. Must be a positive number.
+            max_size: The maximum font size. Must not be smaller than `min_size`.
+
+        Returns:
+            Self: The instance for method chaining.
+
+        Raises:
+            ValueError: If the sizes are not positive or `min_size` is greater than `max_size`.
+        """
+        if min_size <= 0 or max_size <= 0:
+            raise ValueError("Font sizes must be positive numbers.")
+        if min_size > max_size:
+            raise ValueError("min_size can't be greater than max_size.")
+
+        self._font_size_range = (min_size, max_size)
+        return self
 
     def _to_node(self) -> Node:
-        return TextNode(self._style, self._text)
+        return TextNode(self._style, self._text, self._font_size_range)
@@ -1,3 +1,3 @@
 from .render import RenderProps, RenderMetrics
-from .text import Line, TextRun
+from .text import Line, TextRun, FontMetrics
 from .typeface import TypefaceSource, TypefaceLoadingInfo
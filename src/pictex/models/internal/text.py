@@ -1,4 +1,7 @@
+from __future__ import annotations
 from dataclasses import dataclass
+from typing import Optional
+import numpy as np
 import skia
 
 @dataclass
@@ -7,6 +10,10 @@ class TextRun:
     text: str
     font: skia.Font
     width: float = 0.0
+    glyphs: Optional[np.ndarray] = None # Glyph IDs
+    positions: Optional[np.ndarray] = None # (x, y) of each glyph, from the run origin on the baseline
+    # x of each character from the run origin, when the glyphs aren't one per character (shaped with HarfBuzz)
+    character_x: Optional[np.ndarray] = None
 
 @dataclass
 class Line:
@@ -15,3 +22,32 @@ class Line:
     width: float
     height: float
     bounds: skia.Rect
+    blob: Optional[skia.TextBlob] = None # The glyphs of all the runs, positioned from (0, 0) on the baseline
+
+@dataclass(frozen=True)
+class FontMetrics:
+    """The vertical metrics of a font. Positions are relative to the baseline (negative above it)."""
+    ascent: float
+    descent: float
+    leading: float
+    underline_position: float
+    underline_thickness: float
+    strikeout_position: float
+    strikeout_thickness: float
+
+    @property
+    def height(self) -> float:
+        return -self.ascent + self.descent + self.leading
+
+    @staticmethod
+    def from_font(font: skia.Font) -> FontMetrics:
+        metrics = font.getMetrics()
+        return FontMetrics(
+            ascent=metrics.fAscent,
+            descent=metrics.fDescent,
+            leading=metrics.fLeading,
+            underline_position=metrics.fUnderlinePosition,
+            underline_thickness=metrics.fUnderlineThickness,
+            strikeout_position=metrics.fStrikeoutPosition,
+            strikeout_thickness=metrics.fStrikeoutThickness,
+        )
@@ -18,12 +18,20 @@ class BackgroundImage:
 
     def get_skia_image(self) -> Optional[skia.Image]:
         if self._skia_image is None:
+            # Imported here, utils depends on the models
+            from ...utils import ImageLoader
             try:
-                self._skia_image = skia.Image.open(self.path)
+                self._skia_image = ImageLoader.load(self.path)
             except Exception:
                 raise ValueError(f"Could not load background image from: {self.path}")
         return self._skia_image
 
+    def __getstate__(self):
+        # The decoded image can't be pickled, it's loaded again from the path when needed
+        state = self.__dict__.copy()
+        state["_skia_image"] = None
+        return state
+
     def __deepcopy__(self, memo):
         return BackgroundImage(
             path=deepcopy(self.path, memo),
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from functools import cached_property
 import skia
 
 from .paint_source import PaintSource
@@ -101,6 +102,17 @@ class SolidColor(PaintSource):
 
         raise ValueError(f"Unknown color name or format: '{value}'")
 
+    def to_skia_color(self) -> int:
+        """Returns this color as a packed `skia.Color` value.
+
+        The conversion is computed once per instance, since the color is immutable.
+        """
+        return self._skia_color
+
+    @cached_property
+    def _skia_color(self) -> int:
+        return skia.Color(self.r, self.g, self.b, self.a)
+
     def apply_to_paint(self, paint: skia.Paint, bounds: skia.Rect) -> None:
         """Applies this solid color to a Skia Paint object.
 
@@ -113,4 +125,4 @@ class SolidColor(PaintSource):
                 used for solid colors but is part of the interface for
                 compatibility with gradients.
         """
-        paint.setColor(skia.Color(self.r, self.g, self.b, self.a))
\ No newline at end of file
+        paint.setColor(self.to_skia_color())
@@ -79,8 +79,6 @@ class LinearGradient(PaintSource):
         if not self.colors:
             return
 
-        skia_colors = [skia.Color(c.r, c.g, c.b, c.a) for c in self.colors]
-        
         # Convert relative points to absolute coordinates based on the bounds
         p1 = (
             bounds.left() + self.start_point[0] * bounds.width(),
@@ -91,9 +89,12 @@ class LinearGradient(PaintSource):
             bounds.top() + self.end_point[1] * bounds.height()
         )
 
-        shader = skia.GradientShader.MakeLinear(
-            points=[p1, p2],
-            colors=skia_colors,
-            positions=self.stops
+        # Imported here, utils depends on the models
+        from ...utils import make_linear_shader
+        shader = make_linear_shader(
+            p1,
+            p2,
+            tuple(c.to_skia_color() for c in self.colors),
+            tuple(self.stops) if self.stops is not None else None
         )
         paint.setShader(shader)
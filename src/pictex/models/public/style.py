@@ -6,7 +6,7 @@ from .effects import Shadow, OutlineStroke
 from .layout import Margin, Padding, HorizontalDistribution, VerticalAlignment, HorizontalAlignment, VerticalDistribution
 from .position import Position
 from .style_property import StyleProperty
-from .typography import TextAlign, FontWeight, FontStyle
+from .typography import TextAlign, TextWrap, FontWeight, FontStyle
 from .paint_source import PaintSource
 from .decoration import TextDecoration
 from .color import SolidColor
@@ -27,6 +27,7 @@ class Style:
     font_style: StyleProperty[FontStyle] = field(default_factory=lambda: StyleProperty(FontStyle.NORMAL))
     line_height: StyleProperty[float] = field(default_factory=lambda: StyleProperty(1.0))  # Multiplier for the font size, like in CSS
     text_align: StyleProperty[TextAlign] = field(default_factory=lambda: StyleProperty(TextAlign.LEFT))
+    text_wrap: StyleProperty[TextWrap] = field(default_factory=lambda: StyleProperty(TextWrap.NOWRAP))
     color: StyleProperty[PaintSource] = field(default_factory=lambda: StyleProperty(SolidColor(0, 0, 0)))
     text_shadows: StyleProperty[list[Shadow]] = field(default_factory=lambda: StyleProperty([]))
     text_stroke: StyleProperty[Optional[OutlineStroke]] = field(default_factory=lambda: StyleProperty(None))
@@ -7,6 +7,12 @@ class TextAlign(str, Enum):
     CENTER = "center"
     RIGHT = "right"
 
+class TextWrap(str, Enum):
+    """Text wrapping options. Text is only wrapped when the width of the element is constrained (e.g., with `size()`)."""
+    NOWRAP = "nowrap"
+    WRAP = "wrap" # Fills each line with as many words as possible
+    PRETTY = "pretty" # Chooses the breaks that give lines of similar length (optimal fit)
+
 class FontStyle(str, Enum):
     """Represents the builders of a font. Useful for variable fonts. """
     NORMAL = "normal"
@@ -1,12 +1,15 @@
 from __future__ import annotations
 from copy import deepcopy
-from typing import Optional, Tuple
+from typing import Hashable, Optional, Tuple, TYPE_CHECKING
 import skia
 from ..models import Style, Shadow, PositionMode, RenderProps, CropMode
 from ..painters import Painter
 from ..utils import create_composite_shadow_filter, clone_skia_rect, to_int_skia_rect, cached_property, Cacheable
 from ..layout import SizeResolver
 
+if TYPE_CHECKING:
+    from .render_cache import RenderCache
+
 class Node(Cacheable):
 
     def __init__(self, style: Style):
@@ -16,6 +19,7 @@ class Node(Cacheable):
         self._children: list[Node] = []
         self._forced_size: Tuple[Optional[int], Optional[int]] = (None, None)
         self._render_props: Optional[RenderProps] = None
+        self._render_cache: Optional[RenderCache] = None
         self._absolute_position: Optional[Tuple[float, float]] = None
 
     @property
@@ -28,8 +32,25 @@ class Node(Cacheable):
 
     @cached_property()
     def computed_styles(self) -> Style:
+        if self._render_cache:
+            return self._render_cache.get_computed_styles(self)
         return self._compute_styles()
 
+    @cached_property()
+    def identity_key(self) -> Hashable:
+        """
+        A key that is equal for nodes with the same type, content and computed styles.
+        Children are not included: the key only identifies what the node itself paints and measures.
+        """
+        # Nodes with equal computed styles share the same object during a render (see RenderCache)
+        return (type(self).__name__, self._get_content_key(), id(self.computed_styles))
+
+    @cached_property(group='bounds')
+    def paint_key(self) -> Hashable:
+        """A key that is equal for nodes whose own painting is identical (same identity and same bounds)."""
+        bounds = tuple((rect.left(), rect.top(), rect.right(), rect.bottom()) for rect in self._get_all_bounds())
+        return (self.identity_key, bounds)
+
     @cached_property(group='bounds')
     def size(self) -> Tuple[int, int]:
         return (self.border_bounds.width(), self.border_bounds.height())
@@ -137,15 +158,23 @@ class Node(Cacheable):
         Prepares the node and its children to be rendered.
         It's meant to be called in the root node.
         """
+        from .render_cache import RenderCache
         self.clear()
-        self._init_render_dependencies(render_props)
+        render_cache = RenderCache(render_props)
+        self._init_render_dependencies(render_props, render_cache)
         self._calculate_bounds()
         self._setup_absolute_position()
+        render_cache.collect_repeated_paints(self)
 
-    def _init_render_dependencies(self, render_props: RenderProps) -> None:
+    def _init_render_dependencies(self, render_props: RenderProps, render_cache: RenderCache) -> None:
         self._render_props = render_props
+        self._render_cache = render_cache
         for child in self._children:
-            child._init_render_dependencies(render_props)
+            child._init_render_dependencies(render_props, render_cache)
+
+    def _get_content_key(self) -> Hashable:
+        """The part of the identity key that depends on the node content (apart from the styles)."""
+        return None
 
     def _calculate_bounds(self) -> None:
         for child in self._children:
@@ -189,19 +218,28 @@ class Node(Cacheable):
         canvas.save()
         x, y = self.absolute_position
         canvas.translate(x, y)
-        for painter in self._get_painters():
-            painter.paint(canvas)
+        picture = self._render_cache.get_picture(self)
+        if picture:
+            canvas.drawPicture(picture)
+        else:
+            self._paint_self(canvas)
 
         canvas.restore()
 
         for child in self._children:
             child.paint(canvas)
 
+    def _paint_self(self, canvas: skia.Canvas) -> None:
+        """Paints the node itself (without children), relative to the node origin."""
+        for painter in self._get_painters():
+            painter.paint(canvas)
+
     def clear(self):
         for child in self._children:
             child.clear()
 
         self._render_props = None
+        self._render_cache = None
         self._absolute_position = None
         self._forced_size = (None, None)
         self.clear_cache()
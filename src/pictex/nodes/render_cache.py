@@ -0,0 +1,113 @@
+from __future__ import annotations
+from collections import Counter
+from typing import TYPE_CHECKING, Hashable, Optional
+import skia
+from ..models import RenderProps, Style
+from ..text import FontManager
+
+if TYPE_CHECKING:
+    from .node import Node
+    from .text_node import TextNode
+
+class RenderCache:
+    """
+    Results shared between structurally identical nodes during a single render.
+
+    Nodes with the same raw styles and the same inherited values share a single computed `Style` object. Two nodes
+    are identical when they have the same type, content and computed styles (see `Node.identity_key`).
+    Identical text nodes share the shaping of the first one found (its prototype), and identical nodes that
+    end up with the same bounds share a single recorded picture, which is replayed at each node position.
+    Text nodes with the same font (even with different texts or other styles) share a single `FontManager`.
+    """
+
+    def __init__(self, render_props: RenderProps):
+        # Pictures are only replayed on raster renders, the SVG output must keep every drawing call
+        self._share_pictures = not render_props.is_svg
+        self._font_smoothing = render_props.font_smoothing
+        self._font_managers: dict[Hashable, FontManager] = {}
+        self._computed_styles: dict[Hashable, Style] = {}
+        self._inherited_keys: dict[int, Hashable] = {}
+        self._text_prototypes: dict[Hashable, TextNode] = {}
+        self._repeated_paint_keys: set[Hashable] = set()
+        self._pictures: dict[Hashable, skia.Picture] = {}
+
+    def get_computed_styles(self, node: Node) -> Style:
+        """Returns the computed styles of the node, reusing the ones of a previous node with the same inputs."""
+        parent_styles = node.parent.computed_styles if node.parent else None
+        key = (repr(node._raw_style), self._get_inherited_key(parent_styles))
+        styles = self._computed_styles.get(key)
+        if styles is None:
+            styles = node._compute_styles()
+            self._computed_styles[key] = styles
+        return styles
+
+    def _get_inherited_key(self, styles: Optional[Style]) -> Hashable:
+        if styles is None:
+            return None
+
+        # Computed styles are kept alive by this cache during the whole render, so their ids are stable
+        key = self._inherited_keys.get(id(styles))
+        if key is None:
+            key = tuple(
+                repr(getattr(styles, field_name))
+                for field_name in styles.get_field_names()
+                if styles.is_inheritable(field_name)
+            )
+            self._inherited_keys[id(styles)] = key
+        return key
+
+    def get_text_prototype(self, node: TextNode) -> TextNode:
+        """Returns the first text node identical to the given one. If there isn't any, the node itself is registered."""
+        return self._text_prototypes.setdefault(node.identity_key, node)
+
+    def get_font_manager(self, styles: Style) -> FontManager:
+        """
+        Returns the font manager for the font of the styles, created the first time that font is found.
+        The key has every style property read by `FontManager`, so the styles of the first node can serve the others.
+        """
+        key = (
+            styles.font_family.get(),
+            styles.font_size.get(),
+            styles.font_weight.get(),
+            styles.font_style.get(),
+            tuple(styles.font_fallbacks.get()),
+            styles.line_height.get(),
+        )
+        font_manager = self._font_managers.get(key)
+        if font_manager is None:
+            font_manager = FontManager(styles, self._font_smoothing)
+            self._font_managers[key] = font_manager
+        return font_manager
+
+    def collect_repeated_paints(self, root: Node) -> None:
+        """Finds the nodes painted more than once in the (already laid out) tree."""
+        if not self._share_pictures:
+            return
+
+        counter = Counter()
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            counter[node.paint_key] += 1
+            pending.extend(node.children)
+
+        self._repeated_paint_keys = {key for key, count in counter.items() if count > 1}
+
+    def get_picture(self, node: Node) -> Optional[skia.Picture]:
+        """
+        Returns the recorded picture for the node own painters, or None if the node isn't repeated.
+        The picture is recorded the first time it's requested.
+        """
+        key = node.paint_key
+        if key not in self._repeated_paint_keys:
+            return None
+
+        picture = self._pictures.get(key)
+        if picture is None:
+            recorder = skia.PictureRecorder()
+            canvas = recorder.beginRecording(node.paint_bounds)
+            node._paint_self(canvas)
+            picture = recorder.finishRecordingAsPicture()
+            self._pictures[key] = picture
+
+        return picture
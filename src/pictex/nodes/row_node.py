@@ -3,6 +3,7 @@ from .container_node import ContainerNode
 from .node import Node
 from ..models import VerticalAlignment, HorizontalDistribution, SizeValueMode
 from ..utils import cached_property
+from math import ceil
 import skia
 
 class RowNode(ContainerNode):
@@ -22,6 +23,8 @@ class RowNode(ContainerNode):
         if not children:
             return 0
 
+        # Flexible children get their final width first, since their height may depend on it (e.g., wrapped text)
+        self._resize_children_if_needed(children)
         return max(child.margin_bounds.height() for child in children)
     
     @cached_property(group='bounds')
@@ -102,7 +105,8 @@ class RowNode(ContainerNode):
             else:
                 fixed_children_width += child.size[0]
 
-        container_width = self.content_bounds.width()
+        # Same value as self.content_bounds.width(), which isn't available yet when called to compute the height
+        container_width = ceil(self.content_width)
         total_gap_space = user_gap * (len(children) - 1) if len(children) > 1 else 0
         remaining_space = container_width - fixed_children_width - total_gap_space
         
@@ -1,77 +1,147 @@
-from typing import Optional
+from __future__ import annotations
+from typing import Hashable, Optional, Tuple
 import skia
 from .node import Node
-from ..models import TextDecoration, Style, RenderProps, Line
+from .render_cache import RenderCache
+from ..models import TextDecoration, Style, RenderProps, Line, TextWrap, SizeValue, SizeValueMode
 from ..text import FontManager, TextShaper
 from ..painters import Painter, BackgroundPainter, TextPainter, DecorationPainter, BorderPainter
 from ..utils import clone_skia_rect, cached_property, cached_method
 
 class TextNode(Node):
 
-    def __init__(self, style: Style, text: str):
+    def __init__(self, style: Style, text: str, font_size_range: Optional[Tuple[float, float]] = None):
         super().__init__(style)
         self._text = text
+        self._font_size_range = font_size_range
         self._font_manager: Optional[FontManager] = None
         self._text_shaper: Optional[TextShaper] = None
+        self._prototype: Optional[TextNode] = None
 
     @property
     def text(self) -> str:
         return self._text
 
+    @cached_property('bounds')
+    def text_shaper(self) -> TextShaper:
+        """The shaper for the text. With a font size range (see `Text.fit_to_box()`), it uses the fitted font size."""
+        if self._font_size_range is None:
+            return self._text_shaper
+
+        min_size, max_size = self._font_size_range
+        font_size = self._text_shaper.fit_font_size(
+            self._text, min_size, max_size, self._get_constrained_width(), self._get_constrained_height()
+        )
+        return self._text_shaper.with_font_size(font_size)
+
+    @property
+    def font_manager(self) -> FontManager:
+        return self.text_shaper.get_font_manager()
+
     @cached_property('bounds')
     def text_bounds(self) -> Optional[skia.Rect]:
-        return self._compute_text_bounds()
+        return self._compute_text_bounds(self.shaped_lines)
 
-    @cached_property('bounds') # This doesn't depend on the bounds right now, but it could in the future (text wrapping)
+    @cached_property('bounds')
     def shaped_lines(self) -> list[Line]:
-        return self._text_shaper.shape(self._text)
+        """The lines to paint: the unwrapped lines, wrapped to the content width when it's constrained."""
+        wrap_width = self._get_wrap_width()
+        if wrap_width is None:
+            return self.unwrapped_lines
+        return self.text_shaper.shape(self._text, wrap_width)
 
-    def _init_render_dependencies(self, render_props: RenderProps):
-        super()._init_render_dependencies(render_props)
-        self._font_manager = FontManager(self.computed_styles, self._render_props.font_smoothing)
+    @cached_property('bounds')
+    def unwrapped_lines(self) -> list[Line]:
+        """The lines of the text, only broken on explicit newlines. They define the intrinsic width."""
+        if self._shares_prototype_measures():
+            return self._prototype.unwrapped_lines
+        return self.text_shaper.shape(self._text)
+
+    def _shares_prototype_measures(self) -> bool:
+        # Fitted font sizes depend on the box, and identical nodes may have different boxes
+        return self._prototype is not self and self._font_size_range is None
+
+    def _get_wrap_width(self) -> Optional[float]:
+        if self.computed_styles.text_wrap.get() == TextWrap.NOWRAP:
+            return None
+        return self._get_constrained_width()
+
+    def _get_constrained_width(self) -> Optional[float]:
+        """The content width, or None when it depends on the text itself."""
+        if self._forced_size[0] is None and not _is_constrained(self.computed_styles.width.get()):
+            return None
+        return self.content_width
+
+    def _get_constrained_height(self) -> Optional[float]:
+        """The content height, or None when it depends on the text itself."""
+        if self._forced_size[1] is None and not _is_constrained(self.computed_styles.height.get()):
+            return None
+        return self.content_height
+
+    def _init_render_dependencies(self, render_props: RenderProps, render_cache: RenderCache):
+        super()._init_render_dependencies(render_props, render_cache)
+        # Identical text nodes (same text and computed styles) reuse the fonts and shaping of the first one
+        self._prototype = render_cache.get_text_prototype(self)
+        if self._prototype is not self:
+            self._font_manager = self._prototype._font_manager
+            self._text_shaper = self._prototype._text_shaper
+            return
+
+        self._font_manager = render_cache.get_font_manager(self.computed_styles)
         self._text_shaper = TextShaper(self.computed_styles, self._font_manager)
 
     def clear(self):
         super().clear()
         self._font_manager = None
         self._text_shaper = None
+        self._prototype = None
+
+    def _get_content_key(self) -> Hashable:
+        return (self._text, self._font_size_range)
 
     def _get_painters(self) -> list[Painter]:
         return [
             BackgroundPainter(self.computed_styles, self.border_bounds, self._render_props.is_svg),
             BorderPainter(self.computed_styles, self.border_bounds),
-            TextPainter(self.computed_styles, self._font_manager, self.text_bounds, self.content_bounds, self.shaped_lines, self._render_props.is_svg),
-            DecorationPainter(self.computed_styles, self._font_manager, self.text_bounds, self.shaped_lines),
+            TextPainter(self.computed_styles, self.font_manager, self.text_bounds, self.content_bounds, self.shaped_lines, self._render_props.is_svg),
+            DecorationPainter(self.computed_styles, self.font_manager, self.text_bounds, self.shaped_lines),
         ]
 
     # We are including the decorations as part of the TextNode content.
     #  However, we could include them only in paint bounds, remove them from here.
     @cached_method('bounds')
-    def _compute_intrinsic_content_bounds(self) -> skia.Rect:
-        line_gap = self.computed_styles.line_height.get() * self.computed_styles.font_size.get()
+    def _compute_intrinsic_content_bounds(self, wrapped: bool) -> skia.Rect:
+        # The intrinsic width never depends on the wrapping, since wrapping depends on the width
+        lines = self.shaped_lines if wrapped else self.unwrapped_lines
+        text_bounds = self.text_bounds if wrapped else self._compute_text_bounds(lines)
+        line_gap = self.font_manager.get_line_gap()
         content_bounds = skia.Rect.MakeEmpty()
-        primary_font = self._font_manager.get_primary_font()
-        font_metrics = primary_font.getMetrics()
-        current_y = self.text_bounds.top() - font_metrics.fAscent
+        font_metrics = self.font_manager.get_primary_font_metrics()
+        current_y = text_bounds.top() - font_metrics.ascent
 
-        for line in self.shaped_lines:
+        for line in lines:
             # This is not correct actually... the X position should be also calculated, doing something similar that the DecorationPainter
             #  However... I think it shouldn't cause any issue
             line_bounds = line.bounds.makeOffset(0, current_y)
 
-            self._add_decoration_bounds(content_bounds, self.computed_styles.underline.get(), line_bounds, current_y + font_metrics.fUnderlinePosition)
-            self._add_decoration_bounds(content_bounds, self.computed_styles.strikethrough.get(), line_bounds, current_y + font_metrics.fStrikeoutPosition)
+            self._add_decoration_bounds(content_bounds, self.computed_styles.underline.get(), line_bounds, current_y + font_metrics.underline_position)
+            self._add_decoration_bounds(content_bounds, self.computed_styles.strikethrough.get(), line_bounds, current_y + font_metrics.strikeout_position)
 
             current_y += line_gap
 
-        content_bounds.join(self.text_bounds)
+        content_bounds.join(text_bounds)
         return content_bounds
     
     def compute_intrinsic_width(self) -> int:
-        return self._compute_intrinsic_content_bounds().width()
+        if self._shares_prototype_measures():
+            return self._prototype.compute_intrinsic_width()
+        return self._compute_intrinsic_content_bounds(wrapped=False).width()
     
     def compute_intrinsic_height(self) -> int:
-        return self._compute_intrinsic_content_bounds().height()
+        # Identical nodes may have different widths, so wrapped text is measured by each node
+        if self._shares_prototype_measures() and self.computed_styles.text_wrap.get() == TextWrap.NOWRAP:
+            return self._prototype.compute_intrinsic_height()
+        return self._compute_intrinsic_content_bounds(wrapped=True).height()
 
     def _add_decoration_bounds(
             self,
@@ -98,12 +168,12 @@ class TextNode(Node):
         paint_bounds.join(self._compute_shadow_bounds(self.border_bounds, self.computed_styles.box_shadows.get()))
         return paint_bounds
 
-    def _compute_text_bounds(self) -> skia.Rect:
-        line_gap = self.computed_styles.line_height.get() * self.computed_styles.font_size.get()
+    def _compute_text_bounds(self, lines: list[Line]) -> skia.Rect:
+        line_gap = self.font_manager.get_line_gap()
         current_y = 0
         text_bounds = skia.Rect.MakeEmpty()
 
-        for line in self.shaped_lines:
+        for line in lines:
             line_bounds = line.bounds.makeOffset(0, current_y)
             text_bounds.join(line_bounds)
             current_y += line_gap
@@ -112,3 +182,7 @@ class TextNode(Node):
 
     def _get_all_bounds(self) -> list[skia.Rect]:
         return super()._get_all_bounds() + [self.text_bounds]
+
+def _is_constrained(size: Optional[SizeValue]) -> bool:
+    # A 'fill-available' size is only known once the parent forces it, before that it's the intrinsic size
+    return size is not None and size.mode in (SizeValueMode.ABSOLUTE, SizeValueMode.PERCENT, SizeValueMode.FIT_BACKGROUND_IMAGE)
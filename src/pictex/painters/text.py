@@ -1,5 +1,6 @@
 from .painter import Painter
 from ..text import FontManager
+from ..text.run_shaper import make_svg_blob
 from ..utils import create_composite_shadow_filter, get_line_x_position
 from typing import Optional
 import skia
@@ -39,23 +40,19 @@ class TextPainter(Painter):
         paint.setImageFilter(filter)
 
     def _draw_text(self, canvas: skia.Canvas, paint: skia.Paint) -> None:
-        primary_font = self._font_manager.get_primary_font()
-        font_metrics = primary_font.getMetrics()
-        current_y = self._text_bounds.top() - font_metrics.fAscent
-        line_gap = self._style.line_height.get() * self._style.font_size.get()
+        current_y = self._text_bounds.top() - self._font_manager.get_primary_font_metrics().ascent
+        line_gap = self._font_manager.get_line_gap()
         block_width = self._parent_bounds.width()
         outline_paint = self._build_outline_paint()
         
         for line in self._lines:
-            draw_x_start = self._text_bounds.x() + get_line_x_position(line.width, block_width, self._style.text_align.get())
-            current_x = draw_x_start
-            
-            for run in line.runs:
+            blob = make_svg_blob(line) if self._is_svg else line.blob
+            if blob:
+                draw_x_start = self._text_bounds.x() + get_line_x_position(line.width, block_width, self._style.text_align.get())
                 if outline_paint:
-                    canvas.drawString(run.text, current_x, current_y, run.font, outline_paint)
-                canvas.drawString(run.text, current_x, current_y, run.font, paint)
-                current_x += run.width
-            
+                    canvas.drawTextBlob(blob, draw_x_start, current_y, outline_paint)
+                canvas.drawTextBlob(blob, draw_x_start, current_y, paint)
+
             current_y += line_gap
 
     def _build_outline_paint(self) -> Optional[skia.Paint]:
@@ -14,10 +14,9 @@ class DecorationPainter(Painter):
         self._lines = lines
 
     def paint(self, canvas: skia.Canvas) -> None:
-        primary_font = self._font_manager.get_primary_font()
-        font_metrics = primary_font.getMetrics()
-        line_gap = self._style.line_height.get() * self._style.font_size.get()
-        current_y = self._text_bounds.top() - font_metrics.fAscent
+        font_metrics = self._font_manager.get_primary_font_metrics()
+        line_gap = self._font_manager.get_line_gap()
+        current_y = self._text_bounds.top() - font_metrics.ascent
         block_width = self._text_bounds.width()
         
         for line in self._lines:
@@ -26,8 +25,8 @@ class DecorationPainter(Painter):
                 continue
 
             line_x_start = self._text_bounds.x() + get_line_x_position(line.width, block_width, self._style.text_align.get())
-            self._draw_decoration(canvas, self._style.underline.get(), line_x_start, current_y + font_metrics.fUnderlinePosition, line.width)
-            self._draw_decoration(canvas, self._style.strikethrough.get(), line_x_start, current_y + font_metrics.fStrikeoutPosition, line.width)
+            self._draw_decoration(canvas, self._style.underline.get(), line_x_start, current_y + font_metrics.underline_position, line.width)
+            self._draw_decoration(canvas, self._style.strikethrough.get(), line_x_start, current_y + font_metrics.strikeout_position, line.width)
 
             current_y += line_gap
 
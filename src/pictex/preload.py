@@ -0,0 +1,60 @@
+"""
+Warm-up of the process-wide caches, so the first renders of a worker are as fast as the next ones.
+
+Everything loaded here lives in the memory of the process, so workers forked after calling
+`preload()` (e.g. by `multiprocessing` with the "fork" start method, or by servers that load
+the application before forking) start with the caches already filled.
+"""
+
+from typing import Iterable, Optional
+import string
+import skia
+from .builders import Canvas, Text
+from .models import Style
+from .text import TypefaceLoader
+from .utils import ImageLoader
+
+DEFAULT_CHARSET = string.digits + string.ascii_letters + string.punctuation + " "
+
+def preload(
+        fonts: Optional[Iterable[Optional[str]]] = None,
+        charsets: Optional[Iterable[str]] = None,
+        images: Optional[Iterable[str]] = None,
+        font_sizes: Optional[Iterable[float]] = None,
+) -> None:
+    """Loads fonts and images and fills the caches used while rendering them.
+
+    Each charset is rendered with each font and font size, which loads the
+    typefaces, finds the system fonts for the glyphs the fonts don't support,
+    shapes the text and rasterizes the glyphs into Skia's glyph cache.
+
+    Args:
+        fonts: Font file paths or system font family names. `None` stands for
+            the default font, which is also used when no fonts are given.
+        charsets: Strings with the characters to warm up. Defaults to the
+            printable ASCII characters.
+        images: Paths of the images that will be used as backgrounds or in `Image` elements.
+        font_sizes: Font sizes to rasterize the glyphs at. Defaults to the default font size.
+
+    Raises:
+        ValueError: If an image can't be loaded.
+    """
+    TypefaceLoader.warm_up()
+
+    for path in images or []:
+        try:
+            image = ImageLoader.load(path)
+        except Exception:
+            raise ValueError(f"Could not load image from: {path}")
+        # Drawing it once makes Skia decode the pixels, which it keeps in its own cache while the image is alive
+        skia.Surface(1, 1).getCanvas().drawImage(image, 0, 0)
+
+    charsets = list(charsets or [DEFAULT_CHARSET])
+    font_sizes = list(font_sizes or [Style().font_size.get()])
+    for font in fonts or [None]:
+        canvas = Canvas() if font is None else Canvas().font_family(font)
+        for font_size in font_sizes:
+            canvas.font_size(font_size)
+            for charset in charsets:
+                canvas.render(Text(charset))
+    TypefaceLoader.flush()
@@ -0,0 +1,93 @@
+from io import BytesIO
+from typing import Callable, Iterable, Optional
+import os
+from ..utils import LRUCache, register_cache
+
+try:
+    from fontTools import subset, ttLib
+except ImportError:
+    subset = None
+    ttLib = None
+
+_NOT_CACHED = object()
+
+# Subsets are small, but a document may use thousands of glyphs of a CJK font.
+# Whole fonts converted to WOFF2 (when subsetting is disabled) are kept here too
+_subsets: LRUCache[tuple, Optional[bytes]] = LRUCache(
+    maxsize=256,
+    maxbytes=32 * 1024 * 1024,
+    sizeof=lambda font_data: len(font_data) if font_data else 0
+)
+
+def is_font_subsetting_available() -> bool:
+    """Whether fonts embedded in SVGs can be reduced to the glyphs they use. It requires 'fonttools'."""
+    return subset is not None
+
+def subset_font(filepath: str, characters: Iterable[str], woff2: bool = False) -> Optional[bytes]:
+    """
+    Returns the font file reduced to the glyphs needed to render the characters (including the ones
+    reached through ligatures and other layout features), or None if the font can't be subset.
+    Subsets are cached per font file (path, size and modification time), characters and format.
+    """
+    if subset is None:
+        raise ImportError('Font subsetting requires fontTools. Install it with: pip install "pictex[svg]"')
+
+    text = "".join(sorted(set(characters)))
+    return _get_cached(filepath, text, woff2, lambda: _subset_font(filepath, text, woff2))
+
+def convert_to_woff2(filepath: str) -> Optional[bytes]:
+    """
+    Returns the whole font file compressed as WOFF2, or None if it can't be converted.
+    Results are cached per font file, like the subsets.
+    """
+    if ttLib is None:
+        raise ImportError('WOFF2 fonts require fontTools and brotli. Install them with: pip install "pictex[svg]"')
+
+    return _get_cached(filepath, None, True, lambda: _convert_to_woff2(filepath))
+
+def _get_cached(filepath: str, text: Optional[str], woff2: bool, build: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+    try:
+        file_stat = os.stat(filepath)
+    except OSError:
+        return None
+
+    key = (os.path.abspath(filepath), file_stat.st_mtime_ns, file_stat.st_size, text, woff2)
+    font_data = _subsets.get(key, _NOT_CACHED)
+    if font_data is _NOT_CACHED:
+        font_data = build()
+        _subsets.put(key, font_data)
+    return font_data
+
+def _subset_font(filepath: str, text: str, woff2: bool) -> Optional[bytes]:
+    options = subset.Options()
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    options.flavor = "woff2" if woff2 else None
+    try:
+        font = subset.load_font(filepath, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=text)
+        subsetter.subset(font)
+        output = BytesIO()
+        subset.save_font(font, output, options)
+        return output.getvalue()
+    except ImportError as e:
+        # WOFF2 also requires brotli
+        raise ImportError('WOFF2 fonts require brotli. Install it with: pip install "pictex[svg]"') from e
+    except Exception:
+        return None
+
+def _convert_to_woff2(filepath: str) -> Optional[bytes]:
+    try:
+        font = ttLib.TTFont(filepath)
+        font.flavor = "woff2"
+        output = BytesIO()
+        font.save(output)
+        return output.getvalue()
+    except ImportError as e:
+        raise ImportError('WOFF2 fonts require brotli. Install it with: pip install "pictex[svg]"') from e
+    except Exception:
+        return None
+
+register_cache("font_subsets", _subsets)
@@ -26,7 +26,7 @@ class Renderer:
         final_image = surface.makeImageSnapshot()
         return ImageProcessor().process(root, final_image, crop_mode)
     
-    def render_as_svg(self, root: Node, embed_fonts: bool) -> VectorImage:
+    def render_as_svg(self, root: Node, embed_fonts: bool, subset_fonts: bool = True, woff2_fonts: bool = False) -> VectorImage:
         """Renders the text with the given builders, generating a vector image."""
         # If support shadows in the near future, we should use CropMode.NONE.
         root.prepare_tree_for_rendering(RenderProps(True, CropMode.CONTENT_BOX, FontSmoothing.SUBPIXEL))
@@ -39,4 +39,4 @@ class Renderer:
 
         root.paint(canvas)
         del canvas
-        return VectorImageProcessor().process(stream, embed_fonts, root)
+        return VectorImageProcessor(subset_fonts, woff2_fonts).process(stream, embed_fonts, root)
@@ -6,13 +6,30 @@ import warnings
 from ..exceptions import SystemFontCanNotBeEmbeddedInSvgWarning
 from ..nodes import Node, TextNode
 from ..text import TypefaceLoader
+from .font_subsetter import is_font_subsetting_available, subset_font, convert_to_woff2
+from ..utils import LRUCache, register_cache
 import xml.etree.ElementTree as ET
 from ..vector_image import VectorImage
 from ..models import Shadow, Style
 from typing import Optional
 import os
 
+_NOT_CACHED = object()
+# The blocks of embedded fonts hold the whole (or subset) font file, encoded in base64
+_font_face_css_cache: LRUCache[tuple, Optional[str]] = LRUCache(
+    maxsize=256,
+    maxbytes=64 * 1024 * 1024,
+    sizeof=lambda css_block: len(css_block) if css_block else 0
+)
+register_cache("font_face_css", _font_face_css_cache)
+
 class VectorImageProcessor:
+
+    def __init__(self, subset_fonts: bool = True, woff2_fonts: bool = False):
+        self._subset_fonts = subset_fonts and is_font_subsetting_available()
+        self._woff2_fonts = woff2_fonts
+        if woff2_fonts and not is_font_subsetting_available():
+            raise ImportError('WOFF2 fonts require fontTools and brotli. Install them with: pip install "pictex[svg]"')
     
     def process(self, stream: skia.DynamicMemoryWStream, embed_fonts: bool, root: Node) -> VectorImage:
         data = stream.detachAsData()
@@ -21,7 +38,8 @@ class VectorImageProcessor:
         typefaces = self._map_to_file_typefaces(fonts, embed_fonts)
         svg = self._fix_text_attributes(svg, typefaces)
         # svg = self._add_shadows(svg, root.computed_styles)
-        svg = self._embed_fonts_in_svg(svg, typefaces, embed_fonts)
+        characters = self._get_used_characters(svg, typefaces) if embed_fonts and self._subset_fonts else {}
+        svg = self._embed_fonts_in_svg(svg, typefaces, embed_fonts, characters)
         return VectorImage(svg)
     
     def _get_used_fonts(self, root: Node) -> list[skia.Font]:
@@ -37,7 +55,26 @@ class VectorImageProcessor:
                         fonts.append(run.font)
 
         return fonts
-    
+
+    def _get_used_characters(self, svg: str, typefaces: list[TypefaceLoadingInfo]) -> dict[str, set[str]]:
+        """
+        Returns the characters written in the SVG with each font file, to embed only the glyphs they need.
+        They are read from the SVG, not from the text: those are the characters the viewer will look up in the font.
+        """
+        texts_by_family: dict[str, list[str]] = {}
+        root = ET.fromstring(svg)
+        for text_elem in root.iter("{http://www.w3.org/2000/svg}text"):
+            font_family = text_elem.attrib.get("font-family")
+            # Skia writes the text in its own indented line
+            text = "".join(text_elem.itertext()).strip("\n\t")
+            texts_by_family.setdefault(font_family, []).append(text)
+
+        characters: dict[str, set[str]] = {typeface.filepath: set() for typeface in typefaces}
+        for typeface in typefaces:
+            for text in texts_by_family.get(self._get_svg_family_name(typeface.typeface), []):
+                characters[typeface.filepath].update(text)
+        return characters
+
     def _map_to_file_typefaces(self, fonts: list[skia.Font], should_warn_for_system_fonts: bool) -> list[TypefaceLoadingInfo]:
         typefaces = []
         for font in fonts:
@@ -62,8 +99,14 @@ class VectorImageProcessor:
             typefaces.append(loading_info)
         return typefaces
     
-    def _embed_fonts_in_svg(self, svg: str, typefaces: list[TypefaceLoadingInfo], embed_fonts: bool) -> str:
-        css = self._get_css_code_for_typefaces(typefaces, embed_fonts)
+    def _embed_fonts_in_svg(
+            self,
+            svg: str,
+            typefaces: list[TypefaceLoadingInfo],
+            embed_fonts: bool,
+            characters: dict[str, set[str]]
+    ) -> str:
+        css = self._get_css_code_for_typefaces(typefaces, embed_fonts, characters)
         defs = f"""
 <defs>
     <builders type="text/css">
@@ -88,39 +131,94 @@ class VectorImageProcessor:
         svg = self._add_prefix_to_font_families(svg, typefaces)
         return svg
 
-    def _get_css_code_for_typefaces(self, typefaces: list[TypefaceLoadingInfo], embed_fonts: bool) -> str:
+    def _get_css_code_for_typefaces(
+            self,
+            typefaces: list[TypefaceLoadingInfo],
+            embed_fonts: bool,
+            characters: dict[str, set[str]]
+    ) -> str:
+        css_blocks = []
+        for typeface in typefaces:
+            css_block = self._get_font_face_css(typeface, embed_fonts, characters)
+            # Instances of the same variable font share the file, so they get the same block
+            if css_block and css_block not in css_blocks:
+                css_blocks.append(css_block)
+        return "".join(css_blocks)
+
+    def _get_font_face_css(
+            self,
+            typeface: TypefaceLoadingInfo,
+            embed_fonts: bool,
+            characters: dict[str, set[str]]
+    ) -> Optional[str]:
+        """
+        Returns the @font-face block of the typeface, or None if its file can't be read.
+        Blocks are cached per file (path, size and modification time), so repeated exports don't read the fonts.
+        """
+        filepath = typeface.filepath
+        try:
+            file_stat = os.stat(filepath)
+        except OSError:
+            return None
+
+        font_family = self._get_svg_family_name(typeface.typeface)
+        subset_text = "".join(sorted(characters[filepath])) if embed_fonts and filepath in characters else None
+        key = (
+            os.path.abspath(filepath), file_stat.st_mtime_ns, file_stat.st_size,
+            font_family, embed_fonts, subset_text, self._woff2_fonts
+        )
+        css_block = _font_face_css_cache.get(key, _NOT_CACHED)
+        if css_block is _NOT_CACHED:
+            css_block = self._build_font_face_css(filepath, font_family, embed_fonts, characters)
+            _font_face_css_cache.put(key, css_block)
+        return css_block
+
+    def _build_font_face_css(
+            self,
+            filepath: str,
+            font_family: str,
+            embed_fonts: bool,
+            characters: dict[str, set[str]]
+    ) -> Optional[str]:
         format_map = {
             "ttf": "truetype",
             "otf": "opentype",
             "woff": "woff",
             "woff2": "woff2",
         }
-        
-        css = ""
-        for typeface in typefaces:
-            font_family = self._get_svg_family_name(typeface.typeface)
-            filepath = typeface.filepath
-            try:
-                with open(filepath, "rb") as font_file:
-                    font_data = font_file.read()
-            except IOError as e:
-                continue
-            
-            src = os.path.normpath(filepath).replace("\\", "/")
-            if embed_fonts:
-                encoded_font = base64.b64encode(font_data).decode("utf-8")
-                file_extension = filepath.lower().split('.')[-1]
-                font_format = format_map.get(file_extension, "truetype")
-                src = f"data:font/{file_extension};base64,{encoded_font}') format('{font_format}"
 
-            css += f"""
+        src = os.path.normpath(filepath).replace("\\", "/")
+        if embed_fonts:
+            font_data, file_extension = self._get_embedded_font_data(filepath, characters)
+            if font_data is None:
+                return None
+            encoded_font = base64.b64encode(font_data).decode("utf-8")
+            font_format = format_map.get(file_extension, "truetype")
+            src = f"data:font/{file_extension};base64,{encoded_font}') format('{font_format}"
+
+        return f"""
 @font-face {{
     font-family: '{font_family}';
     src: url('{src}');
 }}
             """
-        
-        return css
+
+    def _get_embedded_font_data(self, filepath: str, characters: dict[str, set[str]]) -> tuple[Optional[bytes], str]:
+        """Returns the font to embed (only the used glyphs, when possible) and its file extension."""
+        if self._subset_fonts and filepath in characters:
+            font_data = subset_font(filepath, characters[filepath], self._woff2_fonts)
+            if font_data is not None:
+                return font_data, "woff2" if self._woff2_fonts else filepath.lower().split('.')[-1]
+        elif self._woff2_fonts:
+            font_data = convert_to_woff2(filepath)
+            if font_data is not None:
+                return font_data, "woff2"
+
+        try:
+            with open(filepath, "rb") as font_file:
+                return font_file.read(), filepath.lower().split('.')[-1]
+        except IOError:
+            return None, ""
 
     def _get_svg_family_name(self, typeface: skia.Typeface) -> str:
         family_names = list(map(lambda fn: fn[0], typeface.getFamilyNames()))
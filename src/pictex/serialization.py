@@ -0,0 +1,389 @@
+"""
+Declarative serialization of element trees.
+
+Elements are converted to plain dictionaries (and JSON) made only of strings, numbers,
+lists and dictionaries, so render jobs can be moved between processes or machines and
+rebuilt on the other side with `from_dict()`.
+
+Only the style properties explicitly set on each element are serialized, and numbers
+are normalized, so equal trees always produce the same canonical JSON (see `to_json()`).
+That makes the serialized form suitable as a cache key.
+"""
+
+from __future__ import annotations
+from copy import deepcopy
+from typing import Any, Callable, NamedTuple, Optional, Union
+import json
+from .builders import Element, Text, Row, Column, Image
+from .models import (
+    Style, PaintSource, SolidColor, LinearGradient, Shadow, OutlineStroke, TextDecoration,
+    Padding, Margin, Border, BorderStyle, BorderRadius, BorderRadiusValue, BackgroundImage,
+    BackgroundImageSizeMode, Position, PositionMode, SizeValue, SizeValueMode, FontWeight,
+    FontStyle, TextAlign, TextWrap, HorizontalDistribution, VerticalAlignment, VerticalDistribution,
+    HorizontalAlignment,
+)
+
+class _Codec(NamedTuple):
+    encode: Callable[[Any], Any]
+    decode: Callable[[Any], Any]
+    schema: dict
+
+def _number(value: Union[int, float]) -> Union[int, float]:
+    """Normalizes a number so 10 and 10.0 have the same serialized form."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+def _encode_color(color: SolidColor) -> str:
+    return f"#{color.r:02x}{color.g:02x}{color.b:02x}{color.a:02x}"
+
+def _decode_color(value: str) -> SolidColor:
+    return SolidColor.from_str(value)
+
+def _encode_paint(paint: PaintSource) -> Union[str, dict]:
+    if isinstance(paint, SolidColor):
+        return _encode_color(paint)
+    if isinstance(paint, LinearGradient):
+        data = {
+            "type": "linear_gradient",
+            "colors": [_encode_color(c) for c in paint.colors],
+            "start_point": [_number(v) for v in paint.start_point],
+            "end_point": [_number(v) for v in paint.end_point],
+        }
+        if paint.stops is not None:
+            data["stops"] = [_number(v) for v in paint.stops]
+        return data
+    raise TypeError(f"Unsupported paint source for serialization: {type(paint).__name__}")
+
+def _decode_paint(value: Union[str, dict]) -> PaintSource:
+    if isinstance(value, str):
+        return _decode_color(value)
+    if value.get("type") == "linear_gradient":
+        stops = value.get("stops")
+        return LinearGradient(
+            colors=value["colors"],
+            stops=list(stops) if stops is not None else None,
+            start_point=tuple(value.get("start_point", (0.0, 0.5))),
+            end_point=tuple(value.get("end_point", (1.0, 0.5))),
+        )
+    raise ValueError(f"Unknown paint source: {value!r}")
+
+def _optional(codec: _Codec) -> _Codec:
+    return _Codec(
+        encode=lambda v: None if v is None else codec.encode(v),
+        decode=lambda v: None if v is None else codec.decode(v),
+        schema={"oneOf": [{"type": "null"}, codec.schema]},
+    )
+
+def _list_of(codec: _Codec) -> _Codec:
+    return _Codec(
+        encode=lambda values: [codec.encode(v) for v in values],
+        decode=lambda values: [codec.decode(v) for v in values],
+        schema={"type": "array", "items": codec.schema},
+    )
+
+def _enum(enum_type) -> _Codec:
+    return _Codec(
+        encode=lambda v: v.value,
+        decode=enum_type,
+        schema={"enum": [member.value for member in enum_type]},
+    )
+
+def _encode_sides(box: Union[Padding, Margin]) -> list:
+    return [_number(box.top), _number(box.right), _number(box.bottom), _number(box.left)]
+
+def _encode_radius_value(value: BorderRadiusValue) -> Union[int, float, str]:
+    if value.mode == 'percent':
+        return f"{_number(value.value)}%"
+    return _number(value.value)
+
+def _decode_radius_value(value: Union[int, float, str]) -> BorderRadiusValue:
+    if isinstance(value, str):
+        return BorderRadiusValue(value=float(value.rstrip('%')), mode='percent')
+    return BorderRadiusValue(value=float(value), mode='absolute')
+
+def _encode_size(value: SizeValue) -> Union[int, float, str]:
+    if value.mode == SizeValueMode.ABSOLUTE:
+        return _number(value.value)
+    if value.mode == SizeValueMode.PERCENT:
+        return f"{_number(value.value)}%"
+    return value.mode.value
+
+def _decode_size(value: Union[int, float, str]) -> SizeValue:
+    if isinstance(value, (int, float)):
+        return SizeValue(SizeValueMode.ABSOLUTE, float(value))
+    if value.endswith('%'):
+        return SizeValue(SizeValueMode.PERCENT, float(value.rstrip('%')))
+    return SizeValue(SizeValueMode(value))
+
+_NUMBER = _Codec(_number, float, {"type": "number"})
+_STRING = _Codec(str, str, {"type": "string"})
+_POINT_SCHEMA = {"type": "array", "items": {"type": "number"}, "minItems": 2, "maxItems": 2}
+_PAINT = _Codec(_encode_paint, _decode_paint, {"$ref": "#/$defs/paint"})
+
+_SHADOW = _Codec(
+    encode=lambda s: {
+        "offset": [_number(v) for v in s.offset],
+        "blur_radius": _number(s.blur_radius),
+        "color": _encode_color(s.color),
+    },
+    decode=lambda v: Shadow(offset=tuple(v["offset"]), blur_radius=v["blur_radius"], color=_decode_color(v["color"])),
+    schema={"$ref": "#/$defs/shadow"},
+)
+_OUTLINE_STROKE = _Codec(
+    encode=lambda s: {"width": _number(s.width), "color": _encode_paint(s.color)},
+    decode=lambda v: OutlineStroke(width=v["width"], color=_decode_paint(v["color"])),
+    schema={"$ref": "#/$defs/outline_stroke"},
+)
+_TEXT_DECORATION = _Codec(
+    encode=lambda d: {
+        "thickness": _number(d.thickness),
+        "color": None if d.color is None else _encode_paint(d.color),
+    },
+    decode=lambda v: TextDecoration(
+        color=None if v.get("color") is None else _decode_paint(v["color"]),
+        thickness=v["thickness"],
+    ),
+    schema={"$ref": "#/$defs/text_decoration"},
+)
+_PADDING = _Codec(_encode_sides, lambda v: Padding(*map(float, v)), {"$ref": "#/$defs/sides"})
+_MARGIN = _Codec(_encode_sides, lambda v: Margin(*map(float, v)), {"$ref": "#/$defs/sides"})
+_BORDER = _Codec(
+    encode=lambda b: {"width": _number(b.width), "color": _encode_paint(b.color), "style": b.style.value},
+    decode=lambda v: Border(width=v["width"], color=_decode_paint(v["color"]), style=BorderStyle(v.get("style", "solid"))),
+    schema={"$ref": "#/$defs/border"},
+)
+_BORDER_RADIUS = _Codec(
+    encode=lambda r: [_encode_radius_value(c) for c in (r.top_left, r.top_right, r.bottom_right, r.bottom_left)],
+    decode=lambda v: BorderRadius(*map(_decode_radius_value, v)),
+    schema={"$ref": "#/$defs/border_radius"},
+)
+_BACKGROUND_IMAGE = _Codec(
+    encode=lambda b: {"path": b.path, "size_mode": b.size_mode.value},
+    decode=lambda v: BackgroundImage(path=v["path"], size_mode=BackgroundImageSizeMode(v.get("size_mode", "cover"))),
+    schema={"$ref": "#/$defs/background_image"},
+)
+_POSITION_FIELDS = (
+    "container_anchor_x", "container_anchor_y", "content_anchor_x", "content_anchor_y", "x_offset", "y_offset"
+)
+_POSITION = _Codec(
+    encode=lambda p: {**{name: _number(getattr(p, name)) for name in _POSITION_FIELDS}, "mode": p.mode.value},
+    decode=lambda v: Position(**{name: float(v.get(name, 0.0)) for name in _POSITION_FIELDS}, mode=PositionMode(v["mode"])),
+    schema={"$ref": "#/$defs/position"},
+)
+_SIZE = _Codec(_encode_size, _decode_size, {"$ref": "#/$defs/size"})
+
+_STYLE_CODECS: dict[str, _Codec] = {
+    "font_family": _optional(_STRING),
+    "font_fallbacks": _list_of(_STRING),
+    "font_size": _NUMBER,
+    "font_weight": _Codec(lambda w: int(w), FontWeight, {"enum": [w.value for w in FontWeight]}),
+    "font_style": _enum(FontStyle),
+    "line_height": _NUMBER,
+    "text_align": _enum(TextAlign),
+    "text_wrap": _enum(TextWrap),
+    "color": _PAINT,
+    "text_shadows": _list_of(_SHADOW),
+    "text_stroke": _optional(_OUTLINE_STROKE),
+    "underline": _optional(_TEXT_DECORATION),
+    "strikethrough": _optional(_TEXT_DECORATION),
+    "box_shadows": _list_of(_SHADOW),
+    "padding": _PADDING,
+    "margin": _MARGIN,
+    "background_color": _optional(_PAINT),
+    "background_image": _optional(_BACKGROUND_IMAGE),
+    "border": _optional(_BORDER),
+    "border_radius": _optional(_BORDER_RADIUS),
+    "position": _optional(_POSITION),
+    "width": _optional(_SIZE),
+    "height": _optional(_SIZE),
+    "horizontal_distribution": _enum(HorizontalDistribution),
+    "vertical_alignment": _enum(VerticalAlignment),
+    "vertical_distribution": _enum(VerticalDistribution),
+    "horizontal_alignment": _enum(HorizontalAlignment),
+    "gap": _NUMBER,
+}
+
+def style_to_dict(style: Style) -> dict:
+    """Serializes the explicitly set properties of a `Style`."""
+    data = {}
+    for name, codec in _STYLE_CODECS.items():
+        style_property = getattr(style, name)
+        if style_property.was_set:
+            data[name] = codec.encode(style_property.get())
+    return data
+
+def apply_style_dict(style: Style, data: dict) -> Style:
+    """Sets on `style` every property found in a dictionary created by `style_to_dict()`."""
+    for name, value in data.items():
+        codec = _STYLE_CODECS.get(name)
+        if codec is None:
+            raise ValueError(f"Unknown style property: '{name}'")
+        getattr(style, name).set(codec.decode(value))
+    return style
+
+def to_dict(element: Element) -> dict:
+    """Serializes an element tree into a dictionary. See `Element.to_dict()`."""
+    if isinstance(element, Text):
+        data = {"type": "text", "text": element._text}
+        if element._font_size_range is not None:
+            data["fit_to_box"] = [_number(size) for size in element._font_size_range]
+    elif isinstance(element, Image):
+        data = {"type": "image", "path": element._path}
+        if element._resize_factor != 1.0:
+            data["resize_factor"] = _number(element._resize_factor)
+    elif isinstance(element, (Row, Column)):
+        data = {"type": "row" if isinstance(element, Row) else "column"}
+        if element._children:
+            data["children"] = [to_dict(child) for child in element._children]
+    else:
+        raise TypeError(f"Unsupported element for serialization: {type(element).__name__}")
+
+    style = style_to_dict(element._style)
+    if style:
+        data["style"] = style
+    return data
+
+def from_dict(data: dict) -> Element:
+    """Rebuilds an element tree from a dictionary created by `Element.to_dict()`.
+
+    Args:
+        data: The serialized element.
+
+    Returns:
+        The rebuilt `Element` (a `Text`, `Row`, `Column` or `Image`).
+
+    Raises:
+        ValueError: If the dictionary contains an unknown element type or style property.
+    """
+    element_type = data.get("type")
+    if element_type == "text":
+        element = Text(data["text"])
+        if "fit_to_box" in data:
+            element.fit_to_box(*data["fit_to_box"])
+    elif element_type == "image":
+        element = Image(data["path"])
+        element._resize_factor = float(data.get("resize_factor", 1.0))
+    elif element_type in ("row", "column"):
+        element = Row() if element_type == "row" else Column()
+        # Children are freshly built, so we skip the defensive deep copy done by the constructor.
+        element._children = [from_dict(child) for child in data.get("children", ())]
+    else:
+        raise ValueError(f"Unknown element type: {element_type!r}")
+
+    style = data.get("style")
+    if style:
+        apply_style_dict(element._style, style)
+    return element
+
+def to_json(element: Element) -> str:
+    """Serializes an element tree into its canonical, compact JSON form. See `Element.to_json()`."""
+    return json.dumps(to_dict(element), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def from_json(data: Union[str, bytes]) -> Element:
+    """Rebuilds an element tree from a JSON document created by `Element.to_json()`.
+
+    Args:
+        data: The JSON document.
+
+    Returns:
+        The rebuilt `Element`.
+    """
+    return from_dict(json.loads(data))
+
+def _object_schema(properties: dict, required: Optional[list[str]] = None) -> dict:
+    schema = {"type": "object", "properties": properties, "additionalProperties": False}
+    if required:
+        schema["required"] = required
+    return schema
+
+_JSON_SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "title": "PicTex element",
+    "$ref": "#/$defs/element",
+    "$defs": {
+        "element": {
+            "oneOf": [
+                _object_schema({
+                    "type": {"const": "text"},
+                    "text": {"type": "string"},
+                    "fit_to_box": {
+                        "type": "array", "items": {"type": "number", "exclusiveMinimum": 0}, "minItems": 2, "maxItems": 2,
+                        "description": "Minimum and maximum font sizes, see Text.fit_to_box().",
+                    },
+                    "style": {"$ref": "#/$defs/style"},
+                }, ["type", "text"]),
+                _object_schema({
+                    "type": {"const": "image"},
+                    "path": {"type": "string"},
+                    "resize_factor": {"type": "number", "exclusiveMinimum": 0},
+                    "style": {"$ref": "#/$defs/style"},
+                }, ["type", "path"]),
+                _object_schema({
+                    "type": {"enum": ["row", "column"]},
+                    "children": {"type": "array", "items": {"$ref": "#/$defs/element"}},
+                    "style": {"$ref": "#/$defs/style"},
+                }, ["type"]),
+            ]
+        },
+        "style": _object_schema({name: codec.schema for name, codec in _STYLE_CODECS.items()}),
+        "color": {"type": "string", "description": "A color name or a hex code ('#RGB', '#RRGGBB' or '#RRGGBBAA')."},
+        "paint": {
+            "oneOf": [
+                {"$ref": "#/$defs/color"},
+                _object_schema({
+                    "type": {"const": "linear_gradient"},
+                    "colors": {"type": "array", "items": {"$ref": "#/$defs/color"}},
+                    "stops": {"type": "array", "items": {"type": "number"}},
+                    "start_point": _POINT_SCHEMA,
+                    "end_point": _POINT_SCHEMA,
+                }, ["type", "colors"]),
+            ]
+        },
+        "shadow": _object_schema({
+            "offset": _POINT_SCHEMA,
+            "blur_radius": {"type": "number"},
+            "color": {"$ref": "#/$defs/color"},
+        }, ["offset", "blur_radius", "color"]),
+        "outline_stroke": _object_schema({
+            "width": {"type": "number"},
+            "color": {"$ref": "#/$defs/paint"},
+        }, ["width", "color"]),
+        "text_decoration": _object_schema({
+            "thickness": {"type": "number"},
+            "color": {"oneOf": [{"type": "null"}, {"$ref": "#/$defs/paint"}]},
+        }, ["thickness"]),
+        "sides": {
+            "type": "array", "items": {"type": "number"}, "minItems": 4, "maxItems": 4,
+            "description": "Top, right, bottom and left values.",
+        },
+        "border": _object_schema({
+            "width": {"type": "number"},
+            "color": {"$ref": "#/$defs/paint"},
+            "style": {"enum": [s.value for s in BorderStyle]},
+        }, ["width", "color"]),
+        "border_radius": {
+            "type": "array", "minItems": 4, "maxItems": 4,
+            "items": {"oneOf": [{"type": "number"}, {"type": "string", "pattern": "%$"}]},
+            "description": "Top-left, top-right, bottom-right and bottom-left radii, in pixels or percentages.",
+        },
+        "background_image": _object_schema({
+            "path": {"type": "string"},
+            "size_mode": {"enum": [m.value for m in BackgroundImageSizeMode]},
+        }, ["path"]),
+        "position": _object_schema({
+            **{name: {"type": "number"} for name in _POSITION_FIELDS},
+            "mode": {"enum": [m.value for m in PositionMode]},
+        }, ["mode"]),
+        "size": {
+            "oneOf": [
+                {"type": "number"},
+                {"type": "string", "pattern": "%$"},
+                {"enum": [m.value for m in SizeValueMode if m not in (SizeValueMode.ABSOLUTE, SizeValueMode.PERCENT)]},
+            ]
+        },
+    },
+}
+
+def json_schema() -> dict:
+    """Returns the JSON schema describing the output of `Element.to_dict()`."""
+    return deepcopy(_JSON_SCHEMA)
@@ -1,11 +1,18 @@
+from __future__ import annotations
+from copy import copy
 import skia
 import os
 import struct
-from typing import List, Optional
+from typing import Iterator, List, Optional
 import warnings
-from ..models import Style, FontStyle, FontSmoothing
+from ..models import Style, FontStyle, FontSmoothing, FontMetrics
 from ..exceptions import FontNotFoundWarning
 from .typeface_loader import TypefaceLoader
+from .glyph_coverage import glyph_coverage_cache
+from .run_shaper import get_fixed_advance
+
+_PRINTABLE_ASCII = "".join(chr(codepoint) for codepoint in range(0x20, 0x7F))
+_NOT_COMPUTED = object()
 
 class FontManager:
 
@@ -13,14 +20,69 @@ class FontManager:
         self._style = style
         self._font_smoothing = font_smoothing
         self._primary_font = self._create_font(self._style.font_family.get())
-        self._fallback_font_typefaces = self._prepare_fallbacks()
+        self._primary_font_metrics: Optional[FontMetrics] = None
+        self._monospace_advance = _NOT_COMPUTED
+        self._fallback_font_specs = tuple(self._style.font_fallbacks.get())
+        # Loaded on demand, in order (None for fonts not found). Shared by the copies with other font sizes
+        self._fallback_font_typefaces: list[Optional[skia.Typeface]] = []
 
     def get_primary_font(self) -> skia.Font:
         return self._primary_font
 
+    def get_primary_font_metrics(self) -> FontMetrics:
+        """The metrics of the primary font, asked to Skia once and shared by the shaper, the layout and the painters."""
+        if self._primary_font_metrics is None:
+            self._primary_font_metrics = FontMetrics.from_font(self._primary_font)
+        return self._primary_font_metrics
+
+    def get_monospace_advance(self) -> Optional[float]:
+        """
+        The advance width shaping gives to every printable ASCII glyph of the primary font when it's monospaced
+        (and supports all of them), or None otherwise. It's only computed once per font.
+        """
+        if self._monospace_advance is _NOT_COMPUTED:
+            self._monospace_advance = self._compute_monospace_advance()
+        return self._monospace_advance
+
+    def get_line_gap(self) -> float:
+        """The distance between the baselines of two consecutive lines."""
+        return self._style.line_height.get() * self._primary_font.getSize()
+
+    def get_fallback_font_specs(self) -> tuple[str, ...]:
+        """The configured fallback fonts (paths or family names), without loading them."""
+        return self._fallback_font_specs
+
+    def iter_fallback_font_typefaces(self) -> Iterator[skia.Typeface]:
+        """
+        Yields the fallback typefaces in order, loading each one the first time it's reached.
+        Texts fully supported by the primary font never load them. Fonts not found are skipped.
+        """
+        for index, font_path_or_name in enumerate(self._fallback_font_specs):
+            if index == len(self._fallback_font_typefaces):
+                self._fallback_font_typefaces.append(self._create_font_typeface(font_path_or_name))
+            typeface = self._fallback_font_typefaces[index]
+            if typeface:
+                yield typeface
+
     def get_fallback_font_typefaces(self) -> List[skia.Typeface]:
-        return self._fallback_font_typefaces
+        return list(self.iter_fallback_font_typefaces())
+
+    def with_font_size(self, font_size: float) -> FontManager:
+        """Returns a copy of the manager whose primary font has another size. The typefaces are reused."""
+        resized = copy(self)
+        resized._primary_font = self._primary_font.makeWithSize(font_size)
+        resized._primary_font_metrics = None
+        resized._monospace_advance = _NOT_COMPUTED
+        return resized
     
+    def _compute_monospace_advance(self) -> Optional[float]:
+        typeface = self._primary_font.getTypeface()
+        if not typeface.isFixedPitch() or not glyph_coverage_cache.supports_printable_ascii(typeface):
+            return None
+
+        # Fixed pitch is only a hint of the font, the actual advances are checked at this size
+        return get_fixed_advance(self._primary_font, _PRINTABLE_ASCII)
+
     def _create_font(self, font_path_or_name: Optional[str]) -> skia.Font:
         typeface = self._create_font_typeface(font_path_or_name)
         if not typeface:
@@ -76,21 +138,13 @@ class FontManager:
         }
         to_four_char_code = lambda tag: struct.unpack('!I', tag.encode('utf-8'))[0]
         available_axes_tags = { axis.tag for axis in typeface.getVariationDesignParameters() }
-        coordinates_list = [
-            skia.FontArguments.VariationPosition.Coordinate(axis=to_four_char_code(tag), value=value)
+        coordinates = tuple(
+            (to_four_char_code(tag), value)
             for tag, value in variations.items()
             if to_four_char_code(tag) in available_axes_tags
-        ]
+        )
 
-        if not coordinates_list:
+        if not coordinates:
             return typeface
         
-        coordinates = skia.FontArguments.VariationPosition.Coordinates(coordinates_list)
-        variation_position = skia.FontArguments.VariationPosition(coordinates)
-        font_args = skia.FontArguments()
-        font_args.setVariationDesignPosition(variation_position)
-        return TypefaceLoader.clone_with_arguments(typeface, font_args)
-
-    def _prepare_fallbacks(self) -> List[skia.Font]:
-        user_fallbacks = [self._create_font_typeface(fb) for fb in self._style.font_fallbacks.get()]
-        return list(filter(lambda e: e, user_fallbacks))
+        return TypefaceLoader.clone_with_variations(typeface, coordinates)
@@ -0,0 +1,95 @@
+from threading import Lock
+import numpy as np
+import skia
+from ..utils import LRUCache, CacheInfo, register_cache
+
+_PLANE_SIZE = 0x10000
+_UNKNOWN = 0
+_SUPPORTED = 1
+_UNSUPPORTED = 2
+_PRINTABLE_ASCII = np.arange(0x20, 0x7F, dtype=np.uint32)
+
+class GlyphCoverageCache:
+    """
+    Process-wide cache of the codepoints supported by each typeface.
+
+    Whether a typeface has a glyph for a codepoint never changes, so it's asked to Skia only once.
+    The answers are stored per typeface (by its unique ID) and per Unicode plane, in arrays that are
+    filled lazily: only the codepoints actually looked up are asked, in a single batched call.
+    """
+
+    def __init__(self, max_typefaces: int = 256):
+        self._typefaces: LRUCache[int, dict[int, np.ndarray]] = LRUCache(max_typefaces)
+        self._printable_ascii_support: LRUCache[int, bool] = LRUCache(max_typefaces)
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_support(self, typeface: skia.Typeface, codepoints: np.ndarray) -> np.ndarray:
+        """Returns a boolean mask telling which of the codepoints have a glyph in the typeface."""
+        with self._lock:
+            planes = self._typefaces.get(typeface.uniqueID())
+            if planes is None:
+                planes = {}
+                self._typefaces.put(typeface.uniqueID(), planes)
+
+            plane_numbers = codepoints >> 16
+            unique_plane_numbers = np.unique(plane_numbers).tolist()
+            if len(unique_plane_numbers) == 1:
+                return self._get_plane_support(typeface, planes, unique_plane_numbers[0], codepoints)
+
+            supported = np.empty(len(codepoints), dtype=bool)
+            for plane_number in unique_plane_numbers:
+                in_plane = plane_numbers == plane_number
+                supported[in_plane] = self._get_plane_support(typeface, planes, plane_number, codepoints[in_plane])
+            return supported
+
+    def supports_printable_ascii(self, typeface: skia.Typeface) -> bool:
+        """Whether the typeface has a glyph for every printable ASCII character. It's only computed once per typeface."""
+        supported = self._printable_ascii_support.get(typeface.uniqueID())
+        if supported is None:
+            supported = bool(self.get_support(typeface, _PRINTABLE_ASCII).all())
+            self._printable_ascii_support.put(typeface.uniqueID(), supported)
+        return supported
+
+    def _get_plane_support(
+            self,
+            typeface: skia.Typeface,
+            planes: dict[int, np.ndarray],
+            plane_number: int,
+            codepoints: np.ndarray
+    ) -> np.ndarray:
+        states = planes.get(plane_number)
+        if states is None:
+            states = np.zeros(_PLANE_SIZE, dtype=np.uint8)
+            planes[plane_number] = states
+
+        offsets = codepoints & (_PLANE_SIZE - 1)
+        codepoint_states = states[offsets]
+        is_unknown = codepoint_states == _UNKNOWN
+        unknown_count = int(np.count_nonzero(is_unknown))
+        self._hits += len(codepoints) - unknown_count
+        self._misses += unknown_count
+        if unknown_count:
+            unknown_offsets = np.unique(offsets[is_unknown])
+            glyphs = typeface.unicharsToGlyphs(((plane_number << 16) | unknown_offsets).tolist())
+            states[unknown_offsets] = np.where(np.asarray(glyphs) != 0, _SUPPORTED, _UNSUPPORTED)
+            codepoint_states = states[offsets]
+
+        return codepoint_states == _SUPPORTED
+
+    def cache_info(self) -> CacheInfo:
+        """Hits and misses are counted per codepoint, the size is the number of typefaces."""
+        with self._lock:
+            typefaces_info = self._typefaces.cache_info()
+            return CacheInfo(self._hits, self._misses, typefaces_info.maxsize, typefaces_info.currsize)
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._typefaces.cache_clear()
+            self._printable_ascii_support.cache_clear()
+            self._hits = 0
+            self._misses = 0
+
+glyph_coverage_cache = GlyphCoverageCache()
+register_cache("glyph_coverage", glyph_coverage_cache)
@@ -0,0 +1,174 @@
+import struct
+from typing import Optional
+import numpy as np
+import skia
+from ..models import TextRun, Line
+from ..utils import LRUCache, register_cache
+
+try:
+    import uharfbuzz as hb
+except ImportError:
+    hb = None
+
+# Features applied by default that change the glyphs or the advances of Latin and common text (ligatures, kerning)
+_ADVANCE_CHANGING_FEATURES = {"liga", "clig", "calt", "rlig", "rclt", "kern", "dist", "curs"}
+_COMMON_SCRIPTS = ("DFLT", "latn")
+_DEFAULT_LANGUAGE_INDEX = 0xFFFF
+_KERN_TABLE = struct.unpack('!I', b'kern')[0]
+
+def is_harfbuzz_available() -> bool:
+    """Whether text is shaped with HarfBuzz (kerning, ligatures, complex scripts). It requires 'uharfbuzz'."""
+    return hb is not None
+
+def shape_run(run: TextRun) -> None:
+    """Sets the glyphs of the run, with their positions from the run origin on the baseline, and its advance width."""
+    if hb is None:
+        # Same glyphs and positions that canvas.drawString() would use
+        glyphs = run.font.textToGlyphs(run.text)
+        run.glyphs = np.array(glyphs, dtype=np.uint16)
+        run.positions = np.zeros((len(glyphs), 2), dtype=np.float32)
+        run.positions[:, 0] = run.font.getXPos(glyphs)
+        run.width = run.font.measureText(run.text)
+        return
+
+    hb_font, units_per_em = _get_harfbuzz_font(run.font.getTypeface())
+    buffer = hb.Buffer()
+    buffer.add_str(run.text)
+    buffer.guess_segment_properties()
+    hb.shape(hb_font, buffer)
+
+    scale = run.font.getSize() / units_per_em
+    glyph_positions = buffer.glyph_positions
+    advances = np.array([position.x_advance for position in glyph_positions], dtype=np.float64)
+    pen_x = np.cumsum(advances) - advances
+    run.glyphs = np.array([info.codepoint for info in buffer.glyph_infos], dtype=np.uint16)
+    run.positions = np.empty((len(glyph_positions), 2), dtype=np.float32)
+    run.positions[:, 0] = (pen_x + [position.x_offset for position in glyph_positions]) * scale
+    # HarfBuzz y axis goes up, Skia's goes down
+    run.positions[:, 1] = np.array([position.y_offset for position in glyph_positions]) * -scale
+    run.width = float(advances.sum() * scale)
+    clusters = np.array([info.cluster for info in buffer.glyph_infos], dtype=np.int64)
+    run.character_x = _get_character_x(run, clusters, pen_x * scale)
+
+def get_fixed_advance(font: skia.Font, text: str) -> Optional[float]:
+    """
+    Returns the advance width that `shape_run()` gives to every glyph of the text, or None if the glyphs
+    have different advances or shaping may change them (e.g. programming ligatures or kerning).
+    """
+    glyphs = font.textToGlyphs(text)
+    if hb is None:
+        advances = set(font.getWidths(glyphs))
+        return advances.pop() if len(advances) == 1 else None
+
+    typeface = font.getTypeface()
+    harfbuzz_font = _load_harfbuzz_font(typeface)
+    if _KERN_TABLE in typeface.getTableTags() or _has_advance_changing_features(harfbuzz_font.face):
+        return None
+    advances = {harfbuzz_font.font.get_glyph_h_advance(glyph) for glyph in glyphs}
+    return advances.pop() * font.getSize() / harfbuzz_font.face.upem if len(advances) == 1 else None
+
+def shape_monospace_run(run: TextRun, advance: float) -> None:
+    """
+    Like `shape_run()`, for runs whose glyphs all have the given advance (see `get_fixed_advance()`),
+    e.g. ASCII in a monospaced font: positions and width are computed instead of measured or shaped.
+    """
+    run.glyphs = np.array(run.font.textToGlyphs(run.text), dtype=np.uint16)
+    run.positions = np.zeros((len(run.glyphs), 2), dtype=np.float32)
+    run.positions[:, 0] = np.arange(len(run.glyphs)) * advance
+    run.width = len(run.glyphs) * advance
+
+def make_blob(runs: list[TextRun]) -> Optional[skia.TextBlob]:
+    """Builds a blob with the glyphs of the (already shaped) runs, one after the other from (0, 0) on the baseline."""
+    builder = skia.TextBlobBuilder()
+    x = 0.0
+    for run in runs:
+        if hb is None:
+            # Default positioning, like canvas.drawString(). It also keeps each run in its own <text> element on SVG
+            builder.allocRun(run.text, run.font, x, 0)
+        elif len(run.glyphs):
+            positions = [skia.Point(px, py) for px, py in (run.positions + (x, 0)).tolist()]
+            builder.allocRunPos(run.font, run.glyphs.tolist(), positions)
+        x += run.width
+    return builder.make()
+
+def make_svg_blob(line: Line) -> Optional[skia.TextBlob]:
+    """
+    Builds a blob for SVG output with the glyph of each character (from the font cmap) at its shaped position.
+    The SVG device writes the characters of the glyphs it draws, so ligature glyphs would become other characters
+    (e.g. 'fi' becomes U+FB01) or be dropped, and the text of the SVG would be wrong.
+    """
+    if all(run.character_x is None for run in line.runs):
+        # A glyph per character already
+        return line.blob
+
+    builder = skia.TextBlobBuilder()
+    x = 0.0
+    for run in line.runs:
+        if run.text:
+            character_x = run.character_x if run.character_x is not None else run.positions[:, 0]
+            positions = [skia.Point(position + x, 0) for position in character_x.tolist()]
+            builder.allocRunPos(run.font, run.font.textToGlyphs(run.text), positions)
+        x += run.width
+    return builder.make()
+
+def _get_character_x(run: TextRun, clusters: np.ndarray, pen_x: np.ndarray) -> np.ndarray:
+    """
+    Places each character at the start of its HarfBuzz cluster (keeping kerning between clusters).
+    The characters of a cluster (a ligature, or a letter and its marks) follow each other with their own advances.
+    """
+    character_count = len(run.text)
+    cluster_starts = np.unique(clusters)
+    cluster_x = np.full(len(cluster_starts), np.inf)
+    np.minimum.at(cluster_x, np.searchsorted(cluster_starts, clusters), pen_x)
+
+    character_clusters = np.searchsorted(cluster_starts, np.arange(character_count), side="right") - 1
+    widths = np.array(run.font.getWidths(run.font.textToGlyphs(run.text)), dtype=np.float64)
+    offsets = np.cumsum(widths) - widths
+    offsets -= offsets[cluster_starts[character_clusters]]
+    return (cluster_x[character_clusters] + offsets).astype(np.float32)
+
+class _HarfBuzzFont:
+    """A HarfBuzz font reading its tables from a Skia typeface, so it works for file, system and cloned typefaces."""
+
+    def __init__(self, typeface: skia.Typeface):
+        self._typeface = typeface
+        # HarfBuzz doesn't own the table data returned by the callback, so it must be kept alive here
+        self._tables: dict[str, bytes] = {}
+        self.face = hb.Face.create_for_tables(self._get_table, None)
+        self.font = hb.Font(self.face)
+        variations = {
+            struct.pack('!I', coordinate.axis).decode('latin-1'): coordinate.value
+            for coordinate in typeface.getVariationDesignPosition()
+        }
+        if variations:
+            self.font.set_variations(variations)
+
+    def _get_table(self, face, tag: str, user_data) -> bytes:
+        if tag not in self._tables:
+            data: Optional[skia.Data] = self._typeface.copyTableData(struct.unpack('!I', tag.encode('latin-1'))[0])
+            self._tables[tag] = bytes(data) if data is not None else b""
+        return self._tables[tag]
+
+_harfbuzz_fonts: LRUCache[int, _HarfBuzzFont] = LRUCache(maxsize=64)
+register_cache("harfbuzz_fonts", _harfbuzz_fonts)
+
+def _get_harfbuzz_font(typeface: skia.Typeface) -> tuple["hb.Font", int]:
+    harfbuzz_font = _load_harfbuzz_font(typeface)
+    return harfbuzz_font.font, harfbuzz_font.face.upem
+
+def _load_harfbuzz_font(typeface: skia.Typeface) -> _HarfBuzzFont:
+    harfbuzz_font = _harfbuzz_fonts.get(typeface.uniqueID())
+    if harfbuzz_font is None:
+        harfbuzz_font = _HarfBuzzFont(typeface)
+        _harfbuzz_fonts.put(typeface.uniqueID(), harfbuzz_font)
+    return harfbuzz_font
+
+def _has_advance_changing_features(face: "hb.Face") -> bool:
+    for table in ("GSUB", "GPOS"):
+        script_tags = face.get_table_script_tags(table)
+        for script in _COMMON_SCRIPTS:
+            if script in script_tags:
+                features = face.get_language_feature_tags(table, script_tags.index(script), _DEFAULT_LANGUAGE_INDEX)
+                if _ADVANCE_CHANGING_FEATURES.intersection(features):
+                    return True
+    return False
@@ -0,0 +1,309 @@
+"""
+Index of the fonts installed in the system, persisted in a cache directory.
+
+Asking the system font manager (fontconfig on Linux) for a font is slow in a cold process: it
+has to be initialized and it scans its configuration and caches first. The index stores the
+family, style and file of every installed font, and the font the system font manager chose for
+each family and glyph looked up so far. New processes find those fonts by reading a single JSON
+file, and only ask the system font manager for families and glyphs nobody looked up before.
+
+The choices are recorded instead of made from the installed fonts, so the fonts found are the
+ones the system font manager would have chosen (its preference order is kept).
+
+The index is built in the background (see `TypefaceLoader`), by one process at a time, and
+rebuilt when the modification time of any font directory changes (fonts installed or removed).
+If it can't be saved (e.g. the cache directory isn't writable), it's not used at all.
+"""
+
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from threading import Lock
+from typing import Any, Hashable, Iterator, Optional
+import json
+import os
+import sys
+import tempfile
+import skia
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+_INDEX_VERSION = 2
+_INDEX_FILENAME = "system_fonts.json"
+_LOCK_FILENAME = "system_fonts.lock"
+_FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".otc")
+_MAX_COLLECTION_FACES = 64
+
+@dataclass(frozen=True)
+class SystemFontEntry:
+    """A font face installed in the system."""
+    path: str
+    index: int # Index of the face in font collections (.ttc), 0 otherwise
+    family: str
+    postscript_name: str
+    weight: int
+    width: int
+    slant: int
+    variations: list[float] # Default position of variable fonts: (axis tag, value) pairs, flattened
+
+    def describes(self, typeface: skia.Typeface) -> bool:
+        """Whether the typeface is this face (the same font at the same variation position)."""
+        return _describe(typeface) == self._description()
+
+    def _description(self) -> tuple:
+        return self.family, self.postscript_name, self.weight, self.width, self.slant, tuple(self.variations)
+
+class SystemFontIndex:
+    """The installed fonts, and the fonts the system font manager chose for the families and glyphs looked up."""
+
+    def __init__(
+            self,
+            entries: list[SystemFontEntry],
+            directories: dict[str, int],
+            cache_dir: str,
+            matches: Optional[dict[str, Optional[list]]] = None
+    ):
+        self._entries = entries
+        self._directories = directories
+        self._cache_dir = cache_dir
+        self._faces = {(entry.path, entry.index): entry for entry in entries}
+        self._descriptions: dict[tuple, list[SystemFontEntry]] = {}
+        for entry in entries:
+            self._descriptions.setdefault(entry._description(), []).append(entry)
+        self._matches = {
+            key: self._faces.get(tuple(face)) if face is not None else None
+            for key, face in (matches or {}).items()
+            if face is None or tuple(face) in self._faces
+        }
+        self._unsaved_keys: set[str] = set()
+        self._lock = Lock()
+
+    @property
+    def entries(self) -> list[SystemFontEntry]:
+        return self._entries
+
+    @property
+    def has_unsaved_matches(self) -> bool:
+        return bool(self._unsaved_keys)
+
+    def get_match(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the face recorded for the key (None if no font matched it), or the default if it wasn't recorded.
+        Keys are tuples of JSON values, e.g. a family name and a style.
+        """
+        return self._matches.get(_serialize_key(key), default)
+
+    def record_match(self, key: Hashable, typeface: Optional[skia.Typeface]) -> bool:
+        """
+        Records the typeface the system font manager chose for the key (None if it didn't find any).
+        Returns False, without recording it, if the typeface isn't exactly one of the indexed faces.
+        """
+        entry = None
+        if typeface is not None:
+            entries = self._descriptions.get(_describe(typeface), [])
+            if len(entries) != 1:
+                return False
+            entry = entries[0]
+
+        serialized_key = _serialize_key(key)
+        with self._lock:
+            self._matches[serialized_key] = entry
+            self._unsaved_keys.add(serialized_key)
+        return True
+
+    def save(self) -> None:
+        """Adds the matches recorded since the last save to the persisted index, keeping the ones other processes recorded."""
+        with self._lock:
+            unsaved_keys, self._unsaved_keys = self._unsaved_keys, set()
+            matches = {key: self._matches[key] for key in unsaved_keys}
+        if not matches:
+            return
+
+        index_path = os.path.join(self._cache_dir, _INDEX_FILENAME)
+        with _locked(self._cache_dir):
+            data = _read_data(index_path, self._directories)
+            if data is None:
+                # Rebuilt for other fonts (or removed) since this index was loaded
+                return
+            data["matches"].update({
+                key: [entry.path, entry.index] if entry is not None else None for key, entry in matches.items()
+            })
+            _write_data(index_path, data)
+
+    @staticmethod
+    def load(font_dirs: Optional[list[str]] = None, cache_dir: Optional[str] = None) -> Optional[SystemFontIndex]:
+        """Returns the persisted index, or None if it's missing or outdated. It's never built here."""
+        font_dirs = get_default_font_dirs() if font_dirs is None else font_dirs
+        cache_dir = get_default_cache_dir() if cache_dir is None else cache_dir
+        directories = _get_directories_mtimes(font_dirs)
+        return _from_data(_read_data(os.path.join(cache_dir, _INDEX_FILENAME), directories), cache_dir)
+
+    @staticmethod
+    def build(font_dirs: Optional[list[str]] = None, cache_dir: Optional[str] = None) -> Optional[SystemFontIndex]:
+        """
+        Scans the installed fonts and persists the index, unless another process built it meanwhile.
+        Processes build it one at a time (the others wait and read it). Returns None if it can't be saved.
+        """
+        font_dirs = get_default_font_dirs() if font_dirs is None else font_dirs
+        cache_dir = get_default_cache_dir() if cache_dir is None else cache_dir
+        if not _is_writable(cache_dir):
+            return None
+
+        index_path = os.path.join(cache_dir, _INDEX_FILENAME)
+        with _locked(cache_dir):
+            directories = _get_directories_mtimes(font_dirs)
+            data = _read_data(index_path, directories)
+            if data is None:
+                data = {
+                    "version": _INDEX_VERSION,
+                    "directories": directories,
+                    "fonts": [asdict(entry) for entry in _scan_fonts(directories)],
+                    "matches": {},
+                }
+                if not _write_data(index_path, data):
+                    return None
+        return _from_data(data, cache_dir)
+
+def get_default_cache_dir() -> str:
+    """The directory where pictex persists its caches. It can be set with the PICTEX_CACHE_DIR variable."""
+    if os.environ.get("PICTEX_CACHE_DIR"):
+        return os.environ["PICTEX_CACHE_DIR"]
+    if sys.platform == "win32":
+        return os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "pictex", "Cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/pictex")
+    return os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "pictex")
+
+def get_default_font_dirs() -> list[str]:
+    """The directories where fonts are installed. They can be set with the PICTEX_FONT_DIRS variable."""
+    if os.environ.get("PICTEX_FONT_DIRS"):
+        return os.environ["PICTEX_FONT_DIRS"].split(os.pathsep)
+    if sys.platform == "win32":
+        return [
+            os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+            os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts"),
+        ]
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+    data_home = os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share"))
+    return ["/usr/share/fonts", "/usr/local/share/fonts", os.path.join(data_home, "fonts"), os.path.expanduser("~/.fonts")]
+
+def _describe(typeface: skia.Typeface) -> tuple:
+    style = typeface.fontStyle()
+    variations = tuple(value for coordinate in typeface.getVariationDesignPosition() for value in (coordinate.axis, coordinate.value))
+    return typeface.getFamilyName(), typeface.getPostScriptName(), style.weight(), style.width(), int(style.slant()), variations
+
+def _serialize_key(key: Hashable) -> str:
+    return json.dumps(key)
+
+def _get_directories_mtimes(font_dirs: list[str]) -> dict[str, int]:
+    """The modification time of each font directory and subdirectory. Any font installed or removed changes one."""
+    directories = {}
+    for font_dir in font_dirs:
+        for directory, _, _ in os.walk(font_dir):
+            try:
+                directories[directory] = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+    return directories
+
+def _scan_fonts(directories: dict[str, int]) -> Iterator[SystemFontEntry]:
+    for directory in sorted(directories):
+        try:
+            filenames = sorted(os.listdir(directory))
+        except OSError:
+            continue
+
+        for filename in filenames:
+            if filename.lower().endswith(_FONT_EXTENSIONS):
+                yield from _scan_font_file(os.path.join(directory, filename))
+
+def _scan_font_file(path: str) -> Iterator[SystemFontEntry]:
+    for index in range(_MAX_COLLECTION_FACES):
+        typeface = skia.Typeface.MakeFromFile(path, index)
+        if typeface is None:
+            return
+
+        family, postscript_name, weight, width, slant, variations = _describe(typeface)
+        yield SystemFontEntry(path, index, family, postscript_name, weight, width, slant, list(variations))
+
+def _read_data(index_path: str, directories: dict[str, int]) -> Optional[dict]:
+    """The persisted index, if it was built for the current font directories."""
+    try:
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            data = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+
+    if data.get("version") != _INDEX_VERSION or data.get("directories") != directories:
+        return None
+    return data
+
+def _from_data(data: Optional[dict], cache_dir: str) -> Optional[SystemFontIndex]:
+    if data is None:
+        return None
+    try:
+        entries = [SystemFontEntry(**entry) for entry in data["fonts"]]
+        return SystemFontIndex(entries, data["directories"], cache_dir, data["matches"])
+    except (KeyError, TypeError):
+        return None
+
+def _write_data(index_path: str, data: dict) -> bool:
+    # Written to a temporary file first, so concurrent processes never read a partial index
+    try:
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(index_path), suffix=".tmp")
+    except OSError:
+        return False
+
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as index_file:
+            json.dump(data, index_file)
+        # Readable by other users, e.g. workers using an index built when creating a container image
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, index_path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        return False
+    return True
+
+@contextmanager
+def _locked(cache_dir: str) -> Iterator[None]:
+    """Holds the lock of the index across processes. Without a lock file (read-only cache directory), nothing is held."""
+    try:
+        lock_file = open(os.path.join(cache_dir, _LOCK_FILENAME), "a+b")
+    except OSError:
+        yield
+        return
+
+    with lock_file:
+        if sys.platform == "win32":
+            lock_file.seek(0)
+            while True:
+                try:
+                    # It only waits for 10 seconds
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _is_writable(directory: str) -> bool:
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(directory, os.W_OK)
@@ -1,93 +1,325 @@
+from __future__ import annotations
+import re
+import sys
+from math import ceil
 import skia
-from typing import List
+import numpy as np
+from typing import Callable, Hashable, List, Optional
 from .typeface_loader import TypefaceLoader
 from .font_manager import FontManager
-from ..models import Style, Line, TextRun
+from .glyph_coverage import glyph_coverage_cache
+from .grapheme_clusters import find_clusters
+from .run_shaper import shape_run, shape_monospace_run, make_blob, is_harfbuzz_available
+from ..models import Style, Line, TextRun, TextWrap
+from ..utils import LRUCache, register_cache
+
+# Rough memory used by a Line and by each TextRun, apart from the run text and glyphs
+_LINE_OVERHEAD_BYTES = 400
+_RUN_OVERHEAD_BYTES = 200
+_GLYPH_BYTES = 16
+
+def _estimate_line_bytes(line: Line) -> int:
+    return _LINE_OVERHEAD_BYTES + sum(
+        _RUN_OVERHEAD_BYTES + sys.getsizeof(run.text) + _GLYPH_BYTES * len(run.text)
+        for run in line.runs
+    )
+
+# Font sizes tried by TextShaper.fit_font_size()
+FIT_STEP = 0.5
+
+# Break opportunities are only at spaces: each match is a word with the spaces before it.
+# No-break spaces (NBSP, figure space and narrow NBSP) are part of the words
+_BREAKABLE_SPACE = r"[^\S\u00a0\u2007\u202f]"
+_WORD_PATTERN = re.compile(rf"({_BREAKABLE_SPACE}*)((?:(?!{_BREAKABLE_SPACE}).)+)")
+_TRAILING_SPACES_PATTERN = re.compile(rf"{_BREAKABLE_SPACE}+$")
+
+# Shaped lines are shared between nodes and renders, so they must never be modified once created
+_shaped_lines_cache: LRUCache[Hashable, Line] = LRUCache(
+    maxsize=100_000,
+    maxbytes=64 * 1024 * 1024,
+    sizeof=_estimate_line_bytes
+)
+register_cache("shaped_lines", _shaped_lines_cache)
+TypefaceLoader.add_invalidation_listener(_shaped_lines_cache.cache_clear)
 
 class TextShaper:
     def __init__(self, style: Style, font_manager: FontManager):
         self._style = style
         self._font_manager = font_manager
 
-    def shape(self, text: str) -> List[Line]:
+    def shape(self, text: str, max_width: Optional[float] = None) -> List[Line]:
         """
         Breaks a text string into lines and runs, applying font fallbacks.
         This is the core of the text shaping and fallback logic.
+        When a max width is given and text wrapping is enabled, each paragraph is also wrapped to fit in it.
         """
 
         shaped_lines: list[Line] = []
         font_height = self._get_primary_font_height()
+        font_key = self._get_font_key()
+        text_wrap = self._style.text_wrap.get()
         for line_text in text.split('\n'):
             if not line_text:
                 shaped_lines.append(self._create_empty_line())
-                continue
-            
-            runs: list[TextRun] = self._split_line_in_runs(line_text)
-            line = self._create_line(runs, font_height)
-            shaped_lines.append(line)
+            elif max_width is None or text_wrap == TextWrap.NOWRAP:
+                shaped_lines.append(self._get_shaped_line(line_text, font_key, font_height))
+            else:
+                shaped_lines.extend(self._wrap_paragraph(line_text, max_width, text_wrap, font_key, font_height))
         
         return shaped_lines
 
+    def get_font_manager(self) -> FontManager:
+        return self._font_manager
+
+    def with_font_size(self, font_size: float) -> TextShaper:
+        """Returns a shaper for the same styles, but another font size."""
+        return TextShaper(self._style, self._font_manager.with_font_size(font_size))
+
+    def fit_font_size(
+            self,
+            text: str,
+            min_size: float,
+            max_size: float,
+            max_width: Optional[float],
+            max_height: Optional[float]
+    ) -> float:
+        """
+        Returns the largest font size, from `min_size` to `max_size` (in steps of `FIT_STEP`), that makes the text
+        fit in the given box. A None dimension is not constrained. If the text doesn't fit at all, it's `min_size`.
+
+        The search first runs on the text shaped at the current font size, scaling its widths linearly with the
+        candidate size, so it doesn't shape anything. Hinting makes real widths differ slightly from scaled ones,
+        so the result is then adjusted by shaping only the candidate sizes around it.
+        """
+        if max_width is None and max_height is None:
+            return max_size
+
+        size_count = ceil((max_size - min_size) / FIT_STEP) + 1
+        get_size = lambda index: min(min_size + index * FIT_STEP, max_size)
+        current_size = self._font_manager.get_primary_font().getSize()
+
+        def fits_scaled(index: int) -> bool:
+            scale = get_size(index) / current_size
+            return self._fits(
+                text,
+                max_width / scale if max_width is not None else None,
+                max_height / scale if max_height is not None else None
+            )
+
+        fits_by_index: dict[int, bool] = {}
+        def fits(index: int) -> bool:
+            if index not in fits_by_index:
+                fits_by_index[index] = self.with_font_size(get_size(index))._fits(text, max_width, max_height)
+            return fits_by_index[index]
+
+        estimated_index = _find_last_fitting(fits_scaled, size_count, size_count - 1)
+        return get_size(_find_last_fitting(fits, size_count, estimated_index))
+
+    def _fits(self, text: str, max_width: Optional[float], max_height: Optional[float]) -> bool:
+        lines = self.shape(text, max_width)
+        line_gap = self._font_manager.get_line_gap()
+        text_bounds = skia.Rect.MakeEmpty()
+        for i, line in enumerate(lines):
+            text_bounds.join(line.bounds.makeOffset(0, i * line_gap))
+
+        fits_width = max_width is None or text_bounds.width() <= max_width
+        fits_height = max_height is None or text_bounds.height() <= max_height
+        return fits_width and fits_height
+
+    def _get_shaped_line(self, line_text: str, font_key: Hashable, font_height: float) -> Line:
+        line_key = (line_text, font_key)
+        line = _shaped_lines_cache.get(line_key)
+        if line is None:
+            runs: list[TextRun] = self._split_line_in_runs(line_text)
+            line = self._create_line(runs, font_height)
+            _shaped_lines_cache.put(line_key, line)
+        return line
+
+    def _wrap_paragraph(
+            self,
+            paragraph: str,
+            max_width: float,
+            text_wrap: TextWrap,
+            font_key: Hashable,
+            font_height: float
+    ) -> list[Line]:
+        """
+        Words and spaces are shaped on their own (and cached like any other line), so wrapping the same
+        paragraph again, even at a different width, only joins the already measured pieces.
+        Trailing spaces are kept at the end of the last line, but they don't count to break the lines.
+        """
+        words = _WORD_PATTERN.findall(paragraph)
+        if not words:
+            return [self._get_shaped_line(paragraph, font_key, font_height)]
+
+        trailing_spaces = _TRAILING_SPACES_PATTERN.search(paragraph)
+
+        spaces = [self._get_shaped_line(space, font_key, font_height) if space else None for space, _ in words]
+        shaped_words = [self._get_shaped_line(word, font_key, font_height) for _, word in words]
+        # The spaces before the first word of a wrapped line are dropped, but the paragraph indentation is kept
+        space_widths = [space.width if space and i > 0 else 0.0 for i, space in enumerate(spaces)]
+        word_widths = [word.width for word in shaped_words]
+        if spaces[0]:
+            word_widths[0] += spaces[0].width
+
+        if text_wrap == TextWrap.PRETTY:
+            line_starts = _break_lines_optimally(space_widths, word_widths, max_width)
+        else:
+            line_starts = _break_lines_greedily(space_widths, word_widths, max_width)
+
+        lines: list[list[TextRun]] = []
+        for start, end in zip(line_starts, line_starts[1:] + [len(words)]):
+            runs: list[TextRun] = []
+            for i in range(start, end):
+                if spaces[i] and (i > start or i == 0):
+                    runs.extend(spaces[i].runs)
+                runs.extend(shaped_words[i].runs)
+            lines.append(runs)
+
+        if trailing_spaces:
+            lines[-1].extend(self._get_shaped_line(trailing_spaces.group(), font_key, font_height).runs)
+        return [self._join_runs(runs, font_height) for runs in lines]
+
+    def _get_font_key(self) -> Hashable:
+        """Identifies everything, apart from the text, that changes the shaping result."""
+        primary_font = self._font_manager.get_primary_font()
+        return (
+            primary_font.getTypeface().uniqueID(),
+            primary_font.getSize(),
+            primary_font.getEdging(),
+            primary_font.isSubpixel(),
+            # The specs rather than the typefaces, so the fallbacks are only loaded if a glyph needs them
+            self._font_manager.get_fallback_font_specs(),
+            # Used to find system fonts for glyphs not supported by the primary font or the fallbacks
+            self._style.font_weight.get(),
+            self._style.font_style.get(),
+            is_harfbuzz_available(),
+        )
+
     def _get_primary_font_height(self) -> float:
-        font_metrics = self._font_manager.get_primary_font().getMetrics()
-        return -font_metrics.fAscent + font_metrics.fDescent + font_metrics.fLeading
+        return self._font_manager.get_primary_font_metrics().height
 
     def _create_empty_line(self) -> Line:
         """Handle empty lines by creating a placeholder with correct height"""
 
-        primary_font = self._font_manager.get_primary_font()
         line = Line(runs=[], height=0, width=0, bounds=skia.Rect.MakeEmpty())
-        font_metrics = primary_font.getMetrics()
-        line.bounds = skia.Rect.MakeLTRB(0, font_metrics.fAscent, 0, font_metrics.fDescent)
+        font_metrics = self._font_manager.get_primary_font_metrics()
+        line.bounds = skia.Rect.MakeLTRB(0, font_metrics.ascent, 0, font_metrics.descent)
         return line
     
     def _create_line(self, runs: list[TextRun], font_height: float) -> Line:
-        line_width = 0
+        primary_font = self._font_manager.get_primary_font()
+        monospace_advance = self._font_manager.get_monospace_advance()
         for run in runs:
-            run.width = run.font.measureText(run.text)
-            line_width += run.width
+            if monospace_advance is not None and run.font is primary_font and _is_printable_ascii(run.text):
+                shape_monospace_run(run, monospace_advance)
+            else:
+                shape_run(run)
+        return self._join_runs(runs, font_height)
 
-        return Line(runs=runs, width=line_width, height=font_height, bounds=skia.Rect.MakeWH(line_width, font_height))
+    def _join_runs(self, runs: list[TextRun], font_height: float) -> Line:
+        line_width = sum(run.width for run in runs)
+        return Line(
+            runs=runs,
+            width=line_width,
+            height=font_height,
+            bounds=skia.Rect.MakeWH(line_width, font_height),
+            blob=make_blob(runs)
+        )
     
     def _split_line_in_runs(self, line_text: str) -> list[TextRun]:
         primary_font = self._font_manager.get_primary_font()
-        line_runs: list[TextRun] = []
-        current_run_text = ""
+        primary_typeface = primary_font.getTypeface()
+        # Fast path: printable ASCII is supported by most fonts, so it's checked once per typeface instead of per character
+        if _is_printable_ascii(line_text) and glyph_coverage_cache.supports_printable_ascii(primary_typeface):
+            return [TextRun(line_text, primary_font)]
 
-        for char in line_text:
-            if self._is_glyph_supported_for_typeface(char, primary_font.getTypeface()):
-                current_run_text += char
-                continue
+        codepoints = np.frombuffer(line_text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        primary_support = self._get_glyphs_support(codepoints, primary_typeface)
+        if primary_support.all():
+            return [TextRun(line_text, primary_font)]
 
-            if current_run_text:
-                run = TextRun(current_run_text, primary_font)
-                line_runs.append(run)
-                current_run_text = ""
+        # Fallbacks are resolved per grapheme cluster, so a cluster (e.g. an emoji with a skin tone) is never split between fonts.
+        # Every cluster gets the index of its fallback typeface, or -1 when the primary font supports it
+        cluster_starts, ignorable = find_clusters(codepoints)
+        cluster_lengths = np.append(cluster_starts[1:], len(codepoints)) - cluster_starts
+        typefaces: list[skia.Typeface] = []
+        cluster_typeface_indexes = np.full(len(cluster_starts), -1, dtype=np.int32)
+        unsupported = np.flatnonzero(~np.logical_and.reduceat(primary_support | ignorable, cluster_starts))
+        if unsupported.size:
+            indexes, starts = _gather_clusters(cluster_starts, cluster_lengths, unsupported)
+            cluster_typeface_indexes[unsupported] = self._resolve_fallback_typefaces(
+                codepoints[indexes], starts, primary_support[indexes] | ignorable[indexes], ignorable[indexes], typefaces, primary_font
+            )
+        typeface_indexes = np.repeat(cluster_typeface_indexes, cluster_lengths)
+
+        line_runs: list[TextRun] = []
+        for start, end in zip(*_find_runs(typeface_indexes)):
+            run_text = line_text[start:end]
+            typeface_index = typeface_indexes[start]
+            if typeface_index == -1:
+                line_runs.append(TextRun(run_text, primary_font))
+                continue
 
-            fallback_font = self._get_fallback_font_for_glyph(char, primary_font)
-            is_same_font_than_last_run = len(line_runs) > 0 and line_runs[-1].font.getTypeface() == fallback_font.getTypeface()
+            typeface = typefaces[typeface_index]
+            font = self._create_fallback_font(typeface, primary_font)
+            is_same_font_than_last_run = len(line_runs) > 0 and line_runs[-1].font.getTypeface() == typeface
             if is_same_font_than_last_run:
                 # we join contiguous runs with same font
-                line_runs[-1] = TextRun(line_runs[-1].text + char, fallback_font)
+                line_runs[-1] = TextRun(line_runs[-1].text + run_text, font)
             else:
-                line_runs.append(TextRun(char, fallback_font))
-        
-        # Add the last run
-        if current_run_text:
-            run = TextRun(current_run_text, primary_font)
-            line_runs.append(run)
-        
+                line_runs.append(TextRun(run_text, font))
+
         return line_runs
 
-    def _get_fallback_font_for_glyph(self, glyph: str, primary_font: skia.Font) -> skia.Font:
-        fallback_typefaces = self._font_manager.get_fallback_font_typefaces()
-        for typeface in fallback_typefaces:
-            if self._is_glyph_supported_for_typeface(glyph, typeface):
-                fallback_font = primary_font.makeWithSize(primary_font.getSize())
-                fallback_font.setTypeface(typeface)
-                return fallback_font
+    def _resolve_fallback_typefaces(
+            self,
+            codepoints: np.ndarray,
+            cluster_starts: np.ndarray,
+            primary_support: np.ndarray,
+            ignorable: np.ndarray,
+            typefaces: list[skia.Typeface],
+            primary_font: skia.Font
+    ) -> np.ndarray:
+        """
+        Finds the typeface for each grapheme cluster not supported by the primary font: the first fallback font supporting
+        all its visible codepoints, then a system font supporting its first codepoint missing in the primary font,
+        or the primary font. Ignorable codepoints count as supported by the primary font. The typefaces are added to the
+        given list, and the returned array contains the index of the typeface used by each cluster.
+        """
+        typeface_indexes = np.full(len(cluster_starts), -1, dtype=np.int32)
+        # The next fallback is only loaded if some clusters are still pending
+        for typeface in self._font_manager.iter_fallback_font_typefaces():
+            is_supported = np.logical_and.reduceat(self._get_glyphs_support(codepoints, typeface) | ignorable, cluster_starts)
+            is_resolved = is_supported & (typeface_indexes == -1)
+            if is_resolved.any():
+                typeface_indexes[is_resolved] = _index_of_typeface(typefaces, typeface)
+            if (typeface_indexes != -1).all():
+                break
+
+        pending = np.flatnonzero(typeface_indexes == -1)
+        if pending.size:
+            # Every unsupported cluster has a codepoint missing in the primary font, the first one finds the system font
+            missing = np.flatnonzero(~primary_support)
+            _, first_missing = np.unique(np.searchsorted(cluster_starts, missing, side="right"), return_index=True)
+            unique_codepoints, inverse = np.unique(codepoints[missing[first_missing]][pending], return_inverse=True)
+            system_indexes = np.array([
+                _index_of_typeface(typefaces, self._get_system_typeface_for_glyph(chr(codepoint), primary_font))
+                for codepoint in unique_codepoints.tolist()
+            ], dtype=np.int32)
+            typeface_indexes[pending] = system_indexes[inverse]
+
+        return typeface_indexes
 
-        # if we don't find a font supporting the glyph, we try to find one in the system
+    def _create_fallback_font(self, typeface: skia.Typeface, primary_font: skia.Font) -> skia.Font:
+        if typeface == primary_font.getTypeface():
+            return primary_font
+
+        fallback_font = primary_font.makeWithSize(primary_font.getSize())
+        fallback_font.setTypeface(typeface)
+        return fallback_font
+
+    def _get_system_typeface_for_glyph(self, glyph: str, primary_font: skia.Font) -> skia.Typeface:
         font_style = skia.FontStyle(
             weight=self._style.font_weight.get(),
             width=skia.FontStyle.kNormal_Width,
@@ -95,13 +327,114 @@ class TextShaper:
         )
         system_typeface = TypefaceLoader.load_for_glyph(glyph, font_style)
         if system_typeface:
-            fallback_font = primary_font.makeWithSize(primary_font.getSize())
-            fallback_font.setTypeface(system_typeface)
-            return fallback_font
+            return system_typeface
 
         # if we don't find any font in the system supporting the glyph, we just use the primary font
-        return primary_font
+        return primary_font.getTypeface()
+
+    def _get_glyphs_support(self, codepoints: np.ndarray, typeface: skia.Typeface) -> np.ndarray:
+        """Returns a boolean mask telling which codepoints have a glyph in the typeface."""
+        return glyph_coverage_cache.get_support(typeface, codepoints)
+
+def _is_printable_ascii(text: str) -> bool:
+    return text.isascii() and text.isprintable()
+
+def _find_runs(values: np.ndarray) -> tuple[list[int], list[int]]:
+    """Returns the start and end indexes of each run of equal contiguous values."""
+    boundaries = np.flatnonzero(values[1:] != values[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(values)]))
+    return starts.tolist(), ends.tolist()
+
+def _gather_clusters(starts: np.ndarray, lengths: np.ndarray, selected: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the indexes of the codepoints of the selected clusters, and where each selected cluster
+    starts in those indexes.
+    """
+    selected_lengths = lengths[selected]
+    selected_starts = np.cumsum(selected_lengths) - selected_lengths
+    indexes = np.arange(selected_lengths.sum()) + np.repeat(starts[selected] - selected_starts, selected_lengths)
+    return indexes, selected_starts
+
+def _index_of_typeface(typefaces: list[skia.Typeface], typeface: skia.Typeface) -> int:
+    for i, known_typeface in enumerate(typefaces):
+        if known_typeface == typeface:
+            return i
+    typefaces.append(typeface)
+    return len(typefaces) - 1
+
+def _break_lines_greedily(space_widths: list[float], word_widths: list[float], max_width: float) -> list[int]:
+    """
+    Puts as many words as possible in each line, in linear time. `space_widths[i]` is the width of the spaces
+    before word `i` (only used when the word isn't the first of a line). Returns the index of the first word of each line.
+    Words wider than `max_width` get their own line.
+    """
+    line_starts = [0]
+    line_width = word_widths[0]
+    for i in range(1, len(word_widths)):
+        width_with_word = line_width + space_widths[i] + word_widths[i]
+        if width_with_word <= max_width:
+            line_width = width_with_word
+        else:
+            line_starts.append(i)
+            line_width = word_widths[i]
+    return line_starts
+
+def _break_lines_optimally(space_widths: list[float], word_widths: list[float], max_width: float) -> list[int]:
+    """
+    Like `_break_lines_greedily()`, but choosing the breaks that minimize the sum of the squared free space at the end
+    of each line (except the last one), so lines end up with similar lengths. Since only the lines that fit are
+    considered, it takes O(n * k) time, where k is the maximum number of words per line.
+    """
+    word_count = len(word_widths)
+    # costs[i] is the minimum cost of breaking the first i words, and line_starts[i] where its last line starts
+    costs = [0.0] + [float("inf")] * word_count
+    line_starts = [0] * (word_count + 1)
+    for start in range(word_count):
+        line_width = word_widths[start]
+        for end in range(start + 1, word_count + 1):
+            if end > start + 1:
+                line_width += space_widths[end - 1] + word_widths[end - 1]
+                if line_width > max_width:
+                    break
+
+            is_last_line = end == word_count
+            free_space = max(0.0, max_width - line_width)
+            cost = costs[start] + (0.0 if is_last_line else free_space * free_space)
+            if cost < costs[end]:
+                costs[end] = cost
+                line_starts[end] = start
+
+    result = []
+    end = word_count
+    while end > 0:
+        end = line_starts[end]
+        result.append(end)
+    return result[::-1]
+
+def _find_last_fitting(fits: Callable[[int], bool], count: int, guess: int) -> int:
+    """
+    Returns the last index, from 0 to count - 1, for which `fits` is true (or 0 if there isn't any), assuming that
+    it's true up to some index and false after it. The search gallops from the guess, so a good guess takes few calls.
+    """
+    if fits(guess):
+        low, step = guess, 1
+        while low + step < count and fits(low + step):
+            low += step
+            step *= 2
+        high = min(low + step, count)
+    else:
+        high, step = guess, 1
+        while high - step >= 0 and not fits(high - step):
+            high -= step
+            step *= 2
+        low = max(high - step, -1)
 
-    def _is_glyph_supported_for_typeface(self, glyph: str, typeface: skia.Typeface) -> bool:
-        return typeface.unicharToGlyph(ord(glyph)) != 0
-    
\ No newline at end of file
+    # 'low' fits (or it's -1) and 'high' doesn't (or it's count)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+    return max(low, 0)
@@ -1,37 +1,148 @@
-from typing import Optional
+import os
+import sys
+from dataclasses import replace
+from threading import Lock, Thread, current_thread
+from typing import Callable, Hashable, Optional
 from ..models import TypefaceLoadingInfo, TypefaceSource
+from ..utils import LRUCache, CacheInfo, register_cache
+from .system_font_index import SystemFontIndex, SystemFontEntry
 import skia
 
+_NOT_CACHED = object()
+_MIN_PRUNING_SIZE = 64
+
+class _TypefaceRegistry:
+    """
+    The loading info of the typefaces loaded by TypefaceLoader, indexed by typeface unique ID.
+
+    Entries of typefaces that nothing else references anymore (no font, blob, cache or Python object) are
+    pruned each time the registry doubles its size since the last pruning, so it doesn't grow with each render.
+    """
+
+    def __init__(self):
+        self._entries: dict[int, TypefaceLoadingInfo] = {}
+        self._lock = Lock()
+        self._pruning_size = _MIN_PRUNING_SIZE
+        self._hits = 0
+        self._misses = 0
+
+    def add(self, loading_info: TypefaceLoadingInfo) -> None:
+        with self._lock:
+            # The same typeface may be loaded again (e.g. after being evicted from a cache), the first entry is kept
+            self._entries.setdefault(loading_info.typeface.uniqueID(), loading_info)
+            if len(self._entries) >= self._pruning_size:
+                self._prune()
+                self._pruning_size = max(_MIN_PRUNING_SIZE, 2 * len(self._entries))
+
+    def get(self, typeface: skia.Typeface) -> Optional[TypefaceLoadingInfo]:
+        with self._lock:
+            loading_info = self._entries.get(typeface.uniqueID())
+            if loading_info is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return loading_info
+
+    def _prune(self) -> None:
+        for unique_id, loading_info in list(self._entries.items()):
+            # Only referenced by the entry (and the getrefcount() argument), and only one reference on the Skia side.
+            # The entry must hold the wrapper the typeface was created with: wrappers returned later by
+            # skia (e.g. Font.getTypeface()) don't report unique() reliably
+            if sys.getrefcount(loading_info.typeface) <= 2 and loading_info.typeface.unique():
+                del self._entries[unique_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, None, len(self._entries))
+
+    def cache_clear(self) -> None:
+        """Entries of typefaces still in use can't be dropped (they are needed to export SVGs), so it only prunes."""
+        with self._lock:
+            self._prune()
+            self._pruning_size = max(_MIN_PRUNING_SIZE, 2 * len(self._entries))
+            self._hits = 0
+            self._misses = 0
+
 class TypefaceLoader:
-    _typefaces_loading_info: list[TypefaceLoadingInfo] = []
+    _registry = _TypefaceRegistry()
     _font_manager: skia.FontMgr = None
+    _glyph_typefaces: LRUCache[tuple, Optional[skia.Typeface]] = LRUCache(maxsize=4096)
+    _typefaces: LRUCache[Hashable, Optional[skia.Typeface]] = LRUCache(maxsize=256)
+    _variations: LRUCache[tuple, skia.Typeface] = LRUCache(maxsize=256)
+    _invalidation_listeners: list[Callable[[], None]] = []
+    _system_font_index: Optional[SystemFontIndex] = None
+    _system_font_index_loaded = False
+    _system_font_index_builder: Optional[Thread] = None
+    _system_font_index_saver: Optional[Thread] = None
+    _system_font_index_lock = Lock()
 
     @staticmethod
     def load_default() -> skia.Typeface:
-        return TypefaceLoader._save(skia.Typeface.MakeDefault(), TypefaceSource.SYSTEM)
+        return TypefaceLoader._load_cached(
+            ("default",),
+            lambda: TypefaceLoader._save(skia.Typeface.MakeDefault(), TypefaceSource.SYSTEM)
+        )
 
     @staticmethod
     def load_from_file(filepath: str) -> Optional[skia.Typeface]:
-        return TypefaceLoader._save(skia.Typeface.MakeFromFile(filepath), TypefaceSource.FILE, filepath)
+        """
+            Loads the typeface of a font file. The file is only read the first time:
+            typefaces are cached per path, and reloaded if the file size or modification time change.
+        """
+        try:
+            file_stat = os.stat(filepath)
+        except OSError:
+            return None
+
+        key = ("file", os.path.abspath(filepath), file_stat.st_mtime_ns, file_stat.st_size)
+        return TypefaceLoader._load_cached(
+            key,
+            lambda: TypefaceLoader._save(skia.Typeface.MakeFromFile(filepath), TypefaceSource.FILE, filepath)
+        )
 
     @staticmethod
     def load_system_font(family: str, style: skia.FontStyle = None) -> skia.Typeface:
         """
-            Creates a new reference to the typeface that most closely
-            matches the requested familyName and fontStyle.
-            Will never return null.
+            Returns the typeface that most closely matches the requested familyName and fontStyle.
+            Will never return null. Matches are cached, so the system fonts are only searched once.
+            Matches recorded in the system font index are loaded without asking the system font manager.
         """
-        return TypefaceLoader._save(skia.Typeface(family, style), TypefaceSource.SYSTEM)
+        style_key = (style.weight(), style.width(), style.slant()) if style else None
+        return TypefaceLoader._load_cached(
+            ("system", family, style_key),
+            lambda: TypefaceLoader._load_system_font(family, style)
+        )
+
+    @staticmethod
+    def _load_system_font(family: str, style: Optional[skia.FontStyle]) -> skia.Typeface:
+        style_key = [style.weight(), style.width(), int(style.slant())] if style else None
+        return TypefaceLoader._load_matched_font(
+            ("family", family, style_key),
+            lambda: skia.Typeface(family, style)
+        )
 
     @staticmethod
     def load_for_glyph(glyph: str, style: skia.FontStyle) -> Optional[skia.Typeface]:
-        system_typeface = TypefaceLoader._get_font_manager().matchFamilyStyleCharacter(
-            "",
-            style,
-            [],
-            ord(glyph)
+        """
+            Returns a system typeface supporting the glyph, or None if there isn't any.
+            Results (including None) are memoized per codepoint and style,
+            so the same typeface object is returned for repeated glyphs.
+            Matches recorded in the system font index are loaded without asking the system font manager.
+        """
+        key = (ord(glyph), style.weight(), style.width(), style.slant())
+        system_typeface = TypefaceLoader._glyph_typefaces.get(key, _NOT_CACHED)
+        if system_typeface is not _NOT_CACHED:
+            return system_typeface
+
+        system_typeface = TypefaceLoader._load_matched_font(
+            ("glyph", ord(glyph), style.weight(), style.width(), int(style.slant())),
+            lambda: TypefaceLoader._get_font_manager().matchFamilyStyleCharacter("", style, [], ord(glyph))
         )
-        return TypefaceLoader._save(system_typeface, TypefaceSource.SYSTEM)
+        TypefaceLoader._glyph_typefaces.put(key, system_typeface)
+        return system_typeface
 
     @staticmethod
     def clone_with_arguments(typeface: skia.Typeface, arguments: skia.FontArguments) -> skia.Typeface:
@@ -39,27 +150,194 @@ class TypefaceLoader:
         if not typeface_loading_info:
             raise RuntimeError("Impossible to clone typeface: it was not loaded")
 
+        # The original typeface is cached and shared, so the clone gets its own loading info
         new_typeface = typeface.makeClone(arguments)
-        typeface_loading_info.typeface = new_typeface
+        TypefaceLoader._registry.add(replace(typeface_loading_info, typeface=new_typeface))
         return new_typeface
     
+    @staticmethod
+    def clone_with_variations(typeface: skia.Typeface, coordinates: tuple[tuple[int, float], ...]) -> skia.Typeface:
+        """
+            Returns the instance of a variable typeface at the given (axis tag, value) coordinates.
+            Instances are cached per typeface and coordinates, so the same instance is shared by every font using it.
+        """
+        key = (typeface.uniqueID(), coordinates)
+        new_typeface = TypefaceLoader._variations.get(key)
+        if new_typeface is None:
+            # The variation position points to the coordinates, so they must be alive until the clone is made
+            skia_coordinates = skia.FontArguments.VariationPosition.Coordinates([
+                skia.FontArguments.VariationPosition.Coordinate(axis=axis, value=value) for axis, value in coordinates
+            ])
+            variation_position = skia.FontArguments.VariationPosition(skia_coordinates)
+            arguments = skia.FontArguments()
+            arguments.setVariationDesignPosition(variation_position)
+            new_typeface = TypefaceLoader.clone_with_arguments(typeface, arguments)
+            TypefaceLoader._variations.put(key, new_typeface)
+        return new_typeface
+
+    @staticmethod
+    def warm_up() -> None:
+        """
+            Starts the system font manager and loads the system font index, building it if needed (and waiting for it),
+            so the first lookups of system fonts don't have to.
+        """
+        TypefaceLoader._get_font_manager()
+        TypefaceLoader._get_system_font_index(wait=True)
+
+    @staticmethod
+    def flush() -> None:
+        """
+            Waits until the system fonts found so far are saved in the system font index,
+            so processes started later find them without asking the system font manager.
+        """
+        TypefaceLoader._save_system_font_index(wait=True)
+
+    @staticmethod
+    def add_invalidation_listener(listener: Callable[[], None]) -> None:
+        """
+            Registers a function called by invalidate().
+            Caches holding results that depend on the loaded fonts use it to drop them.
+        """
+        TypefaceLoader._invalidation_listeners.append(listener)
+
+    @staticmethod
+    def invalidate() -> None:
+        """
+            Forgets the typefaces and the system font matching done so far (e.g. after installing or removing fonts),
+            and notifies the invalidation listeners.
+        """
+        TypefaceLoader._font_manager = None
+        with TypefaceLoader._system_font_index_lock:
+            TypefaceLoader._system_font_index = None
+            TypefaceLoader._system_font_index_loaded = False
+            TypefaceLoader._system_font_index_builder = None
+        TypefaceLoader._typefaces.cache_clear()
+        TypefaceLoader._variations.cache_clear()
+        TypefaceLoader._glyph_typefaces.cache_clear()
+        for listener in TypefaceLoader._invalidation_listeners:
+            listener()
+
     @staticmethod
     def get_typeface_loading_info(typeface: skia.Typeface) -> Optional[TypefaceLoadingInfo]:
-        for loading_info in TypefaceLoader._typefaces_loading_info:
-            if loading_info.typeface == typeface:
-                return loading_info
-        return None
+        return TypefaceLoader._registry.get(typeface)
+
+    @staticmethod
+    def _load_cached(key: Hashable, load: Callable[[], Optional[skia.Typeface]]) -> Optional[skia.Typeface]:
+        typeface = TypefaceLoader._typefaces.get(key, _NOT_CACHED)
+        if typeface is _NOT_CACHED:
+            typeface = load()
+            TypefaceLoader._typefaces.put(key, typeface)
+        return typeface
 
     @staticmethod
     def _save(typeface: Optional[skia.Typeface], source: TypefaceSource, filepath: Optional[str] = None) -> Optional[skia.Typeface]:
         if not typeface:
             return None
         
-        TypefaceLoader._typefaces_loading_info.append(TypefaceLoadingInfo(typeface, source, filepath))
+        TypefaceLoader._registry.add(TypefaceLoadingInfo(typeface, source, filepath))
         return typeface
 
+    @staticmethod
+    def _load_matched_font(key: tuple, match: Callable[[], Optional[skia.Typeface]]) -> Optional[skia.Typeface]:
+        """
+            Loads the face the system font index recorded for the key, or asks the system font manager
+            (with `match`) and records its choice, so other processes find it in the index.
+        """
+        system_font_index = TypefaceLoader._get_system_font_index()
+        if system_font_index is not None:
+            entry = system_font_index.get_match(key, _NOT_CACHED)
+            if entry is None:
+                return None
+            if entry is not _NOT_CACHED:
+                typeface = TypefaceLoader._load_indexed_font(entry)
+                if typeface is not None:
+                    return typeface
+
+        typeface = TypefaceLoader._save(match(), TypefaceSource.SYSTEM)
+        if system_font_index is not None and system_font_index.record_match(key, typeface):
+            TypefaceLoader._save_system_font_index()
+        return typeface
+
+    @staticmethod
+    def _load_indexed_font(entry: SystemFontEntry) -> Optional[skia.Typeface]:
+        # Cached per face, so every family, glyph and style using it shares the same typeface
+        return TypefaceLoader._load_cached(
+            ("indexed", entry.path, entry.index),
+            lambda: TypefaceLoader._save(skia.Typeface.MakeFromFile(entry.path, entry.index), TypefaceSource.SYSTEM)
+        )
+
+    @staticmethod
+    def _get_system_font_index(wait: bool = False) -> Optional[SystemFontIndex]:
+        """
+            Returns the system font index, or None while it's being built (or if it can't be saved).
+            The persisted index is read the first time. If it's missing or outdated, it's built in a background thread,
+            so rendering never waits for it: the system font manager is asked meanwhile. `wait` waits for the build.
+        """
+        with TypefaceLoader._system_font_index_lock:
+            if not TypefaceLoader._system_font_index_loaded:
+                TypefaceLoader._system_font_index_loaded = True
+                TypefaceLoader._system_font_index = SystemFontIndex.load()
+                if TypefaceLoader._system_font_index is None:
+                    builder = Thread(target=TypefaceLoader._build_system_font_index, daemon=True)
+                    TypefaceLoader._system_font_index_builder = builder
+                    builder.start()
+            builder = TypefaceLoader._system_font_index_builder
+
+        if wait and builder is not None:
+            builder.join()
+        return TypefaceLoader._system_font_index
+
+    @staticmethod
+    def _build_system_font_index() -> None:
+        system_font_index = SystemFontIndex.build()
+        with TypefaceLoader._system_font_index_lock:
+            # Unless invalidate() was called meanwhile
+            if TypefaceLoader._system_font_index_builder is current_thread():
+                TypefaceLoader._system_font_index = system_font_index
+                TypefaceLoader._system_font_index_builder = None
+
+    @staticmethod
+    def _save_system_font_index(wait: bool = False) -> None:
+        """Persists the recorded matches in a background thread. `wait` waits for them to be saved."""
+        with TypefaceLoader._system_font_index_lock:
+            saver = TypefaceLoader._system_font_index_saver
+            system_font_index = TypefaceLoader._system_font_index
+            if saver is None and system_font_index is not None:
+                saver = Thread(target=TypefaceLoader._save_recorded_matches, args=(system_font_index,), daemon=True)
+                TypefaceLoader._system_font_index_saver = saver
+                saver.start()
+
+        if wait and saver is not None:
+            saver.join()
+
+    @staticmethod
+    def _save_recorded_matches(system_font_index: SystemFontIndex) -> None:
+        # Matches recorded while saving are saved by the same thread
+        while True:
+            with TypefaceLoader._system_font_index_lock:
+                if not system_font_index.has_unsaved_matches:
+                    TypefaceLoader._system_font_index_saver = None
+                    return
+            system_font_index.save()
+
     @staticmethod
     def _get_font_manager() -> skia.FontMgr:
         if TypefaceLoader._font_manager is None:
             TypefaceLoader._font_manager = skia.FontMgr()
         return TypefaceLoader._font_manager
+
+def _reset_system_font_index_threads() -> None:
+    # Only the forking thread is copied: a build or a save running in the parent doesn't exist in the child
+    TypefaceLoader._system_font_index_lock = Lock()
+    if TypefaceLoader._system_font_index_builder is not None:
+        TypefaceLoader._system_font_index_loaded = False
+        TypefaceLoader._system_font_index_builder = None
+    TypefaceLoader._system_font_index_saver = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_system_font_index_threads)
+
+register_cache("typeface_registry", TypefaceLoader._registry)
+register_cache("typefaces", TypefaceLoader._typefaces)
+register_cache("typeface_variations", TypefaceLoader._variations)
+register_cache("glyph_fallbacks", TypefaceLoader._glyph_typefaces)
@@ -1,6 +1,8 @@
 from .alignment import get_line_x_position
 from .shadow import create_composite_shadow_filter
-from .cache import cached_method, cached_property, Cacheable
+from .cache import cached_method, cached_property, Cacheable, LRUCache, CacheInfo, register_cache, cache_info, clear_caches
+from .image_loader import ImageLoader
+from .shaders import make_linear_shader
 from math import ceil, floor
 import skia
 
@@ -1,6 +1,7 @@
 from functools import wraps
-from collections import defaultdict
-from typing import Optional
+from collections import defaultdict, OrderedDict
+from threading import RLock
+from typing import Any, Callable, Generic, Hashable, NamedTuple, Optional, Protocol, TypeVar
 
 class _CachedPropertyDescriptor:
 
@@ -71,3 +72,113 @@ class Cacheable:
 
         for item in items_to_remove:
             delattr(self, item)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a process-wide cache, like the ones returned by `functools.lru_cache`.
+
+    `maxbytes` and `currbytes` are only set for caches limited by the (estimated) size of their entries.
+    `maxsize` is None for caches without a fixed limit.
+    """
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+    maxbytes: Optional[int] = None
+    currbytes: Optional[int] = None
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups answered by the cache (0.0 when nothing was looked up yet)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class _ProcessCache(Protocol):
+    def cache_info(self) -> CacheInfo: ...
+    def cache_clear(self) -> None: ...
+
+_caches: dict[str, _ProcessCache] = {}
+
+def register_cache(name: str, cache: _ProcessCache) -> None:
+    """Registers a process-wide cache, so it's reported by `cache_info()` and emptied by `clear_caches()`."""
+    _caches[name] = cache
+
+def cache_info() -> dict[str, CacheInfo]:
+    """Returns the statistics of the process-wide caches used by pictex.
+
+    Returns:
+        A dictionary from cache name to its `CacheInfo` (hits, misses,
+        maxsize and currsize). `CacheInfo.hit_rate` gives the fraction of
+        lookups answered from memory.
+    """
+    return {name: cache.cache_info() for name, cache in _caches.items()}
+
+def clear_caches() -> None:
+    """Empties all the process-wide caches used by pictex and resets their statistics."""
+    for cache in _caches.values():
+        cache.cache_clear()
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class LRUCache(Generic[K, V]):
+    """
+    A thread-safe mapping that keeps at most `maxsize` entries, evicting the least recently used ones.
+    If `maxbytes` is given, `sizeof` estimates the size of each value and the total is also kept under it.
+    """
+
+    def __init__(self, maxsize: int, maxbytes: Optional[int] = None, sizeof: Optional[Callable[[V], int]] = None):
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._sizes: dict[K, int] = {}
+        self._currbytes = 0
+        self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: K, default: Any = None) -> Optional[V]:
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return default
+
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = value
+            if self._maxbytes is not None:
+                self._sizes[key] = self._sizeof(value)
+                self._currbytes += self._sizes[key]
+
+            while len(self._entries) > self._maxsize or (self._maxbytes is not None and self._currbytes > self._maxbytes):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: K) -> None:
+        if key not in self._entries:
+            return
+        del self._entries[key]
+        if self._maxbytes is not None:
+            self._currbytes -= self._sizes.pop(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            if self._maxbytes is None:
+                return CacheInfo(self._hits, self._misses, self._maxsize, len(self._entries))
+            return CacheInfo(self._hits, self._misses, self._maxsize, len(self._entries), self._maxbytes, self._currbytes)
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._currbytes = 0
+            self._hits = 0
+            self._misses = 0
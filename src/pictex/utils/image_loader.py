@@ -0,0 +1,26 @@
+import os
+import skia
+from .cache import LRUCache, register_cache
+
+class ImageLoader:
+    """
+    Loads the images used as backgrounds. Each file is read once and the same `skia.Image`
+    is shared by every element using it, so Skia also decodes its pixels only once.
+    """
+    _images: LRUCache[tuple, skia.Image] = LRUCache(maxsize=64)
+
+    @staticmethod
+    def load(path: str) -> skia.Image:
+        """
+            Returns the image of a file. Images are cached per path, and loaded again if the file size
+            or modification time change. Raises an exception if the file can't be read or decoded.
+        """
+        file_stat = os.stat(path)
+        key = (os.path.abspath(path), file_stat.st_mtime_ns, file_stat.st_size)
+        image = ImageLoader._images.get(key)
+        if image is None:
+            image = skia.Image.open(path)
+            ImageLoader._images.put(key, image)
+        return image
+
+register_cache("images", ImageLoader._images)
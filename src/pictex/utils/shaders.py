@@ -0,0 +1,29 @@
+from typing import Optional
+import skia
+from .cache import LRUCache, register_cache
+
+_linear_shaders: LRUCache[tuple, skia.Shader] = LRUCache(maxsize=1024)
+
+def make_linear_shader(
+        start: tuple[float, float],
+        end: tuple[float, float],
+        colors: tuple[int, ...],
+        stops: Optional[tuple[float, ...]]
+) -> skia.Shader:
+    """
+    Builds (or reuses) a linear gradient shader.
+    Shaders are immutable, so the same instance can be shared by every paint
+    (and every node) that draws the same gradient over the same bounds.
+    """
+    key = (start, end, colors, stops)
+    shader = _linear_shaders.get(key)
+    if shader is None:
+        shader = skia.GradientShader.MakeLinear(
+            points=[start, end],
+            colors=list(colors),
+            positions=list(stops) if stops is not None else None
+        )
+        _linear_shaders.put(key, shader)
+    return shader
+
+register_cache("linear_shaders", _linear_shaders)
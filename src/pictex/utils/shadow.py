@@ -13,10 +13,7 @@ def create_composite_shadow_filter(shadows: list[Shadow], should_remove_content:
             filter(
                 dx=shadow.offset[0], dy=shadow.offset[1],
                 sigmaX=shadow.blur_radius, sigmaY=shadow.blur_radius,
-                color=skia.Color(
-                    shadow.color.r, shadow.color.g,
-                    shadow.color.b, shadow.color.a
-                )
+                color=shadow.color.to_skia_color()
             )
         )
 
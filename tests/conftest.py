@@ -4,6 +4,7 @@ from typing import List, Union
 from pictex import Image, VectorImage, Canvas, Element
 from pathlib import Path
 import pytest
+from pictex.text import run_shaper
 
 ASSETS_DIR = Path(__file__).parent / "assets"
 STATIC_FONT_PATH = str(ASSETS_DIR / "Lato-BoldItalic.ttf") # No emojies and japanese support
@@ -11,6 +12,21 @@ VARIABLE_WGHT_FONT_PATH = str(ASSETS_DIR / "Oswald-VariableFont_wght.ttf")
 JAPANESE_FONT_PATH = str(ASSETS_DIR / "NotoSansJP-Regular.ttf")
 IMAGE_PATH = str(ASSETS_DIR / "image.png")
 
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir_for_tests(tmp_path_factory):
+    """Persisted caches (like the system font index) are saved in a temporary directory, not in the user's one."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("PICTEX_CACHE_DIR", str(tmp_path_factory.mktemp("pictex_cache")))
+        yield
+
+@pytest.fixture(autouse=True)
+def shape_without_harfbuzz(monkeypatch):
+    """
+    HarfBuzz is an optional dependency and it changes glyph positions (kerning, ligatures),
+    so reference files are generated without it. Tests using HarfBuzz must enable it explicitly.
+    """
+    monkeypatch.setattr(run_shaper, "hb", None)
+
 def check_images_match(image_regression, image: Image):
     """
     Saves a pictex Image to a temporary file and checks it against a regression file.
@@ -0,0 +1,83 @@
+import pytest
+from pictex import Canvas, Text, Row, TextWrap, from_dict
+from pictex.models import Style, FontSmoothing, CropMode, RenderProps
+from pictex.text import FontManager, TextShaper
+from pictex.text.text_shaper import _find_last_fitting, FIT_STEP
+from .conftest import STATIC_FONT_PATH
+
+TITLE = "The quick brown fox jumps over the lazy dog"
+
+def _create_shaper(text_wrap: TextWrap = TextWrap.NOWRAP) -> TextShaper:
+    style = Style()
+    style.font_family.set(STATIC_FONT_PATH)
+    style.text_wrap.set(text_wrap)
+    return TextShaper(style, FontManager(style, FontSmoothing.SUBPIXEL))
+
+def _fitted_font_size(element: Text) -> float:
+    node = Row(element)._to_node()
+    node.prepare_tree_for_rendering(RenderProps(False, CropMode.NONE, FontSmoothing.SUBPIXEL))
+    return node.children[0].font_manager.get_primary_font().getSize()
+
+@pytest.mark.parametrize("guess", [0, 3, 7, 9])
+def test_find_last_fitting_from_any_guess(guess):
+    assert _find_last_fitting(lambda index: index <= 7, 10, guess) == 7
+
+def test_find_last_fitting_returns_first_index_if_nothing_fits():
+    assert _find_last_fitting(lambda index: False, 10, 5) == 0
+
+def test_find_last_fitting_with_a_good_guess_takes_few_calls():
+    calls = []
+    def fits(index):
+        calls.append(index)
+        return index <= 500
+
+    assert _find_last_fitting(fits, 1000, 500) == 500
+    assert len(calls) == 2
+
+@pytest.mark.parametrize("text_wrap, max_height", [(TextWrap.NOWRAP, None), (TextWrap.WRAP, 150), (TextWrap.PRETTY, 150)])
+def test_fitted_size_is_the_largest_that_fits(text_wrap, max_height):
+    shaper = _create_shaper(text_wrap)
+
+    size = shaper.fit_font_size(TITLE, 10, 100, 400, max_height)
+
+    assert 10 < size < 100
+    assert shaper.with_font_size(size)._fits(TITLE, 400, max_height)
+    assert not shaper.with_font_size(size + FIT_STEP)._fits(TITLE, 400, max_height)
+
+def test_unconstrained_box_uses_max_size():
+    assert _create_shaper().fit_font_size(TITLE, 10, 100, None, None) == 100
+
+def test_text_too_long_uses_min_size():
+    assert _create_shaper().fit_font_size(TITLE * 20, 10, 100, 400, None) == 10
+
+def test_fit_to_box_sets_the_font_size_in_layout():
+    small_box = Text(TITLE).size(width=300).fit_to_box(5, 200)
+    large_box = Text(TITLE).size(width=600).fit_to_box(5, 200)
+
+    small_size, large_size = _fitted_font_size(small_box), _fitted_font_size(large_box)
+
+    assert small_size < large_size
+    assert large_size == pytest.approx(2 * small_size, rel=0.05)
+
+def test_fit_to_box_ignores_the_font_size():
+    element = Text(TITLE).size(width=300).font_size(10)
+
+    assert _fitted_font_size(element.fit_to_box(5, 200)) > 10
+
+def test_fitted_text_fits_in_the_rendered_box():
+    canvas = Canvas().font_family(STATIC_FONT_PATH).text_wrap("wrap")
+
+    image = canvas.render(Text(TITLE * 3).size(400, 120).fit_to_box(8, 100))
+
+    assert (image.width, image.height) == (400, 120)
+
+@pytest.mark.parametrize("min_size, max_size", [(0, 10), (-5, 10), (20, 10)])
+def test_invalid_font_size_ranges_are_rejected(min_size, max_size):
+    with pytest.raises(ValueError):
+        Text(TITLE).fit_to_box(min_size, max_size)
+
+def test_fit_to_box_is_serialized():
+    data = Text(TITLE).size(400, 120).fit_to_box(8, 60.5).to_dict()
+
+    assert data["fit_to_box"] == [8, 60.5]
+    assert from_dict(data).to_dict() == data
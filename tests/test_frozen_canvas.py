@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from pictex import *
+import pytest
+
+def _build_elements(index: int) -> list[Element]:
+    gradient = LinearGradient(colors=["#f12711", "#f5af19"])
+    return [
+        Column(
+            Text(f"Item {index}").font_size(40).color(gradient),
+            Row(Text("left"), Text("right").color("blue")).gap(10).padding(5).border(2, "black"),
+        ).padding(10).background_color("#EEEEEE").border_radius(8)
+    ]
+
+def test_frozen_canvas_is_immutable():
+    frozen = Canvas().font_size(30).freeze()
+
+    with pytest.raises(AttributeError):
+        frozen._style = Style()
+    assert not hasattr(frozen, "font_size")
+
+def test_frozen_canvas_is_not_affected_by_later_changes():
+    canvas = Canvas().font_size(30).color("red")
+    frozen = canvas.freeze()
+    expected = frozen.render("Snapshot").to_bytes()
+
+    canvas.font_size(80).color("blue").padding(40)
+
+    assert frozen.render("Snapshot").to_bytes() == expected
+    assert canvas.render("Snapshot").to_bytes() != expected
+
+def test_frozen_canvas_renders_like_canvas():
+    canvas = Canvas().font_size(30).padding(10).background_color("yellow")
+    frozen = canvas.freeze()
+
+    assert frozen.render("Same").to_bytes() == canvas.render("Same").to_bytes()
+    assert frozen.render_as_svg("Same").svg == canvas.render_as_svg("Same").svg
+
+def test_frozen_canvas_concurrent_renders():
+    frozen = Canvas().font_size(30).color("#333333").padding(10).freeze()
+    indexes = list(range(64))
+    expected = {i: frozen.render(*_build_elements(i % 8)).to_bytes() for i in range(8)}
+
+    def render(index: int) -> bytes:
+        return frozen.render(*_build_elements(index % 8)).to_bytes()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(render, indexes))
+
+    for index, result in zip(indexes, results):
+        assert result == expected[index % 8]
+
+def test_frozen_canvas_concurrent_svg_renders():
+    frozen = Canvas().font_size(30).freeze()
+    expected = frozen.render_as_svg(*_build_elements(0)).svg
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: frozen.render_as_svg(*_build_elements(0)).svg, range(32)))
+
+    assert all(result == expected for result in results)
+
+def test_shared_elements_concurrent_renders():
+    frozen = Canvas().font_size(30).freeze()
+    elements = _build_elements(3)
+    expected = frozen.render(*elements).to_bytes()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: frozen.render(*elements).to_bytes(), range(32)))
+
+    assert all(result == expected for result in results)
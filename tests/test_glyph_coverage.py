@@ -0,0 +1,56 @@
+import numpy as np
+import skia
+import pictex
+from pictex import Canvas, Text
+from pictex.text.glyph_coverage import GlyphCoverageCache
+from .conftest import STATIC_FONT_PATH
+
+def _codepoints(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+def test_support_matches_typeface_glyphs():
+    typeface = skia.Typeface.MakeFromFile(STATIC_FONT_PATH)
+    codepoints = np.array([0x41, 0x10D, 0x4E00, 0x1F600, 0x61, 0x1F600, 0x10FFFF], dtype=np.uint32)
+    cache = GlyphCoverageCache()
+
+    supported = cache.get_support(typeface, codepoints)
+
+    expected = np.asarray(typeface.unicharsToGlyphs(codepoints.tolist())) != 0
+    assert supported.tolist() == expected.tolist()
+
+def test_codepoints_are_asked_only_once():
+    typeface = skia.Typeface.MakeFromFile(STATIC_FONT_PATH)
+    cache = GlyphCoverageCache()
+
+    cache.get_support(typeface, _codepoints("abca"))
+    assert cache.cache_info()[:2] == (0, 4)
+
+    cache.get_support(typeface, _codepoints("cab 😀"))
+    assert cache.cache_info()[:2] == (3, 6)
+
+def test_least_recently_used_typefaces_are_evicted():
+    typefaces = [skia.Typeface.MakeFromFile(STATIC_FONT_PATH) for _ in range(3)]
+    cache = GlyphCoverageCache(max_typefaces=2)
+
+    for typeface in typefaces:
+        cache.get_support(typeface, _codepoints("a"))
+
+    assert cache.cache_info().currsize == 2
+
+def test_warm_renders_only_hit_the_cache():
+    Canvas().render(Text("Hello, мир ☺ ✓"))
+    before = pictex.cache_info()["glyph_coverage"]
+
+    # Same characters in a different text, so the shaped lines can't be reused
+    Canvas().render(Text("✓ ☺ мир, Hello"))
+
+    after = pictex.cache_info()["glyph_coverage"]
+    assert after.misses == before.misses
+    assert after.hits > before.hits
+
+def test_clear_caches_resets_statistics():
+    Canvas().render("Hello")
+
+    pictex.clear_caches()
+
+    assert pictex.cache_info()["glyph_coverage"] == pictex.CacheInfo(0, 0, 256, 0)
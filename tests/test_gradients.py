@@ -1,4 +1,6 @@
+import pictex
 from pictex import Canvas, LinearGradient
+import skia
 
 def test_gradient_on_text_fill(file_regression, render_engine):
     """
@@ -62,3 +64,18 @@ def test_gradient_with_custom_stops(file_regression, render_engine):
     render_func, check_func = render_engine
     image = render_func(canvas, "STOPS")
     check_func(file_regression, image)
+
+def test_gradient_shader_is_shared_between_paints():
+    """
+    Applying equal gradients over equal bounds should reuse the same shader
+    instead of building a new one for every paint.
+    """
+    pictex.clear_caches()
+    bounds = skia.Rect.MakeWH(200, 100)
+    for _ in range(3):
+        gradient = LinearGradient(colors=["#f12711", "#f5af19"])
+        gradient.apply_to_paint(skia.Paint(), bounds)
+
+    cache_info = pictex.cache_info()["linear_shaders"]
+    assert cache_info.misses == 1
+    assert cache_info.hits == 2
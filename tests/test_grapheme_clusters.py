@@ -0,0 +1,43 @@
+import unicodedata
+import numpy as np
+import pytest
+from pictex.text import grapheme_clusters
+from pictex.text.grapheme_clusters import find_clusters
+
+def _clusters(text: str) -> list[str]:
+    codepoints = np.array([ord(character) for character in text], dtype=np.uint32)
+    bounds = find_clusters(codepoints)[0].tolist() + [len(text)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+def test_marks_and_modifiers_extend_the_cluster():
+    assert _clusters("ae\u0301b") == ["a", "e\u0301", "b"]
+    assert _clusters("👍\U0001f3fd👍") == ["👍\U0001f3fd", "👍"]
+    assert _clusters("❤\ufe0f!") == ["❤\ufe0f", "!"]
+    assert _clusters("🏴\U000e0067\U000e0062\U000e007f") == ["🏴\U000e0067\U000e0062\U000e007f"]
+
+def test_zwj_sequences_are_a_single_cluster():
+    assert _clusters("👨\u200d👩\u200d👧 ok") == ["👨\u200d👩\u200d👧", " ", "o", "k"]
+
+def test_regional_indicators_are_paired():
+    assert _clusters("🇦🇷🇪🇸🇫") == ["🇦🇷", "🇪🇸", "🇫"]
+
+def test_text_starting_with_a_mark():
+    assert _clusters("\u0301a") == ["\u0301", "a"]
+    assert _clusters("") == []
+
+def test_default_ignorable_codepoints():
+    codepoints = np.array([ord(character) for character in "a\u200c\u200d\ufe0f\U000e0101b"], dtype=np.uint32)
+
+    assert find_clusters(codepoints)[1].tolist() == [False, True, True, True, True, False]
+
+@pytest.mark.skipif(
+    unicodedata.unidata_version != grapheme_clusters._UNICODE_VERSION,
+    reason="The mark ranges are precompiled for another Unicode version"
+)
+def test_precompiled_mark_ranges_match_unicodedata():
+    marks = np.zeros(grapheme_clusters._TABLE_SIZE, dtype=bool)
+    for start, end in grapheme_clusters._MARK_RANGES:
+        marks[start:end] = True
+
+    expected = [unicodedata.category(chr(codepoint))[0] == "M" for codepoint in range(grapheme_clusters._TABLE_SIZE)]
+    assert marks.tolist() == expected
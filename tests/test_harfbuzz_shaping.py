@@ -0,0 +1,75 @@
+import base64
+import io
+import re
+import skia
+import pytest
+from pictex import Canvas, Text
+from pictex.models import Style, FontSmoothing
+from pictex.text import FontManager, TextShaper, run_shaper
+from .conftest import STATIC_FONT_PATH, VARIABLE_WGHT_FONT_PATH
+
+hb = pytest.importorskip("uharfbuzz")
+
+@pytest.fixture(autouse=True)
+def shape_with_harfbuzz(monkeypatch):
+    monkeypatch.setattr(run_shaper, "hb", hb)
+
+def _shape(text: str, font_path: str = STATIC_FONT_PATH, **styles):
+    style = Style()
+    style.font_family.set(font_path)
+    for name, value in styles.items():
+        getattr(style, name).set(value)
+    font_manager = FontManager(style, FontSmoothing.SUBPIXEL)
+    return TextShaper(style, font_manager).shape(text), font_manager.get_primary_font()
+
+def _glyph_count(blob: skia.TextBlob) -> int:
+    return sum(run.fGlyphCount for run in blob)
+
+def test_kerning_is_applied():
+    lines, font = _shape("AV")
+
+    unkerned_width = sum(font.getWidths(font.textToGlyphs("AV")))
+    assert lines[0].width < unkerned_width
+
+def test_ligatures_are_applied():
+    lines, _ = _shape("office")
+
+    assert _glyph_count(lines[0].blob) < len("office")
+
+def test_variable_font_axes_are_applied():
+    light_lines, _ = _shape("Hello", VARIABLE_WGHT_FONT_PATH, font_weight=200)
+    bold_lines, _ = _shape("Hello", VARIABLE_WGHT_FONT_PATH, font_weight=700)
+
+    assert bold_lines[0].width > light_lines[0].width
+
+def test_runs_of_different_fonts_share_the_line_blob():
+    # 'Ā' and 'Č' are only supported by the fallback font (Oswald)
+    lines, _ = _shape("abĀČcd", font_fallbacks=[VARIABLE_WGHT_FONT_PATH])
+
+    assert len(lines[0].runs) == 3
+    assert lines[0].width == pytest.approx(sum(run.width for run in lines[0].runs))
+    assert _glyph_count(lines[0].blob) == 6
+
+def test_rendered_text_uses_shaped_widths():
+    canvas = Canvas().font_family(STATIC_FONT_PATH).font_size(40)
+    image = canvas.render(Text("AVAVAV"))
+    svg = canvas.render_as_svg(Text("AVAVAV"), embed_font=False)
+
+    lines, _ = _shape("AVAVAV", font_size=40)
+    assert image.width == pytest.approx(lines[0].width, abs=2)
+    assert "AVAVAV" in svg.svg
+
+@pytest.mark.parametrize("font_path", [STATIC_FONT_PATH, VARIABLE_WGHT_FONT_PATH], ids=["lato", "oswald"])
+def test_svg_text_keeps_the_characters_of_ligatures(font_path):
+    svg = Canvas().font_family(font_path).render_as_svg(Text("office fi ffl AV"), embed_font=False).svg
+
+    texts = re.findall(r"<text[^>]*>([^<]*)</text>", svg)
+    assert [text.strip() for text in texts] == ["office fi ffl AV"]
+
+def test_embedded_subset_fonts_have_the_characters_of_the_svg_text():
+    ttLib = pytest.importorskip("fontTools.ttLib")
+    svg = Canvas().font_family(STATIC_FONT_PATH).render_as_svg(Text("office fi ffl AV")).svg
+
+    font = ttLib.TTFont(io.BytesIO(base64.b64decode(re.search(r"base64,([^']+)'", svg).group(1))))
+    texts = "".join(re.findall(r"<text[^>]*>([^<]*)</text>", svg)).strip()
+    assert set(map(ord, texts)) <= set(font.getBestCmap())
@@ -0,0 +1,25 @@
+from pictex.utils import LRUCache, CacheInfo
+
+def test_least_recently_used_entries_are_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.cache_info() == CacheInfo(hits=3, misses=1, maxsize=2, currsize=2)
+
+def test_entries_are_evicted_to_fit_byte_budget():
+    cache = LRUCache(maxsize=100, maxbytes=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.put("a", "xx")
+    cache.put("c", "xxxxxx")
+
+    assert cache.get("b") is None
+    assert cache.cache_info()[2:] == (100, 2, 10, 8)
+
+    cache.cache_clear()
+    assert cache.cache_info() == CacheInfo(0, 0, 100, 0, 10, 0)
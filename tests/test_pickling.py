@@ -0,0 +1,178 @@
+import gc
+import multiprocessing
+import pickle
+import runpy
+import shutil
+import subprocess
+import sys
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pytest
+import skia
+from pictex import *
+from multiprocessing import shared_memory
+from pictex.text import run_shaper
+from pictex.models import Position, PositionMode, SizeValue, SizeValueMode, BackgroundImage, Border, BorderStyle
+from .conftest import IMAGE_PATH, STATIC_FONT_PATH
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
+EXAMPLES = [
+    ("table/table.py", "table"),
+    ("tweet_card/tweet_card.py", "tweet_card"),
+    ("code_to_image/code_to_image.py", "window"),
+]
+
+def _shape_without_harfbuzz():
+    # Workers that aren't forked don't inherit the monkeypatching of shape_without_harfbuzz
+    run_shaper.hb = None
+
+def _render(canvas, element):
+    return canvas.render(element)
+
+def _render_shared(canvas, element):
+    return canvas.render(element).share()
+
+def _round_trip(value):
+    return pickle.loads(pickle.dumps(value))
+
+@pytest.mark.parametrize("value", [
+    Style(),
+    SolidColor.from_str("#12345678"),
+    LinearGradient(colors=["red", "blue"], stops=[0, 1], start_point=(0, 0.5)),
+    Shadow(offset=(2, 3), blur_radius=4, color="black"),
+    Padding(1, 2, 3, 4),
+    Position(container_anchor_x=0.5, container_anchor_y=1, content_anchor_x=0, content_anchor_y=0, x_offset=1, y_offset=2, mode=PositionMode.ABSOLUTE),
+    SizeValue(SizeValueMode.PERCENT, 50),
+    Border(2, SolidColor.from_str("red"), BorderStyle.DASHED),
+    Box(1, 2, 3, 4),
+    FontWeight.BOLD,
+], ids=lambda value: type(value).__name__)
+def test_public_models_are_picklable(value):
+    assert _round_trip(value) == value
+
+def test_background_image_drops_decoded_image():
+    background = BackgroundImage(IMAGE_PATH)
+    assert background.get_skia_image() is not None
+
+    restored = _round_trip(background)
+
+    assert (restored.path, restored.size_mode) == (background.path, background.size_mode)
+    assert restored._skia_image is None
+    assert restored.get_skia_image().width() == background.get_skia_image().width()
+
+def test_builders_are_picklable():
+    element = Column(
+        Text("Hello").font_family(STATIC_FONT_PATH).color(LinearGradient(["red", "blue"])).text_shadows(Shadow((1, 1), 2, "black")),
+        Row(Image(IMAGE_PATH).resize(0.5), Text("World").border(2, "red")).gap(4),
+    ).background_image(IMAGE_PATH).padding(10)
+    canvas = Canvas().font_size(30)
+
+    restored_element = _round_trip(element)
+    restored_canvas = _round_trip(canvas)
+    frozen = _round_trip(canvas.freeze())
+
+    expected = canvas.render(element).to_bytes()
+    assert restored_canvas.render(restored_element).to_bytes() == expected
+    assert frozen.render(restored_element).to_bytes() == expected
+
+def test_bitmap_image_round_trip():
+    image = Canvas().font_size(60).padding(10).render("Pickle")
+
+    for restored in (_round_trip(image), _round_trip(image.share())):
+        assert restored.content_box == image.content_box
+        assert (restored.width, restored.height) == (image.width, image.height)
+        assert restored.to_bytes() == image.to_bytes()
+
+def test_vector_image_round_trip():
+    image = Canvas().render_as_svg("Pickle", embed_font=False)
+
+    assert _round_trip(image).svg == image.svg
+
+START_METHODS = [method for method in ("fork", "spawn", "forkserver") if method in multiprocessing.get_all_start_methods()]
+
+@pytest.mark.parametrize("start_method", START_METHODS)
+@pytest.mark.parametrize("example_path, element_name", EXAMPLES, ids=[path for path, _ in EXAMPLES])
+def test_examples_render_in_process_pool(tmp_path, monkeypatch, example_path, element_name, start_method):
+    example_dir = EXAMPLES_DIR / Path(example_path).parent
+    shutil.copytree(example_dir, tmp_path, dirs_exist_ok=True)
+    monkeypatch.chdir(tmp_path)
+    example = runpy.run_path(str(tmp_path / Path(example_path).name))
+    canvas, element = example["canvas"], example[element_name]
+    expected = canvas.render(element)
+
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context(start_method), initializer=_shape_without_harfbuzz
+    ) as executor:
+        pickled = executor.submit(_render, canvas, element).result()
+        shared = executor.submit(_render_shared, canvas.freeze(), element).result()
+
+    for image in (pickled, shared):
+        assert image.content_box == expected.content_box
+        assert image.to_bytes() == expected.to_bytes()
+
+SHARED_IMAGE_SCRIPT = textwrap.dedent("""
+    import multiprocessing
+    import sys
+    from concurrent.futures import ProcessPoolExecutor
+    from pictex import Canvas
+
+    def get_width(image):
+        return image.width
+
+    if __name__ == "__main__":
+        image = Canvas().font_size(50).render("Shared").share()
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context(sys.argv[1])) as executor:
+            print(executor.submit(get_width, image).result())
+""")
+
+@pytest.mark.parametrize("start_method", START_METHODS)
+def test_shared_images_are_not_tracked_by_the_sender(tmp_path, start_method):
+    script = tmp_path / "share.py"
+    script.write_text(SHARED_IMAGE_SCRIPT)
+
+    result = subprocess.run([sys.executable, str(script), start_method], capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    assert int(result.stdout) > 0
+    assert "resource_tracker" not in result.stderr
+
+def _block_exists(name: str) -> bool:
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    block.close()
+    return True
+
+def test_shared_images_are_written_to_shared_memory_once():
+    shared = Canvas().font_size(50).render("Shared").share()
+
+    first, second = pickle.dumps(shared), pickle.dumps(shared)
+
+    assert pickle.loads(first).to_bytes() == shared.to_bytes()
+    with pytest.raises(ValueError):
+        pickle.loads(second)
+
+def test_shared_images_release_their_block_if_not_pickled():
+    shared = Canvas().font_size(50).render("Shared").share()
+    name = shared._shared_pixels.name
+    assert _block_exists(name)
+
+    del shared
+    gc.collect()
+
+    assert not _block_exists(name)
+
+def test_shared_images_release_their_block_if_loading_fails(monkeypatch):
+    shared = Canvas().font_size(50).render("Shared").share()
+    name = shared._shared_pixels.name
+    pickled = pickle.dumps(shared)
+
+    def fail(*args):
+        raise RuntimeError("Invalid pixels")
+    monkeypatch.setattr(skia.Image, "frombytes", fail)
+    with pytest.raises(RuntimeError):
+        pickle.loads(pickled)
+
+    assert not _block_exists(name)
@@ -0,0 +1,42 @@
+import multiprocessing
+import pytest
+import pictex
+from pictex import Canvas, Text, Image
+from .conftest import STATIC_FONT_PATH, IMAGE_PATH
+
+def _misses(name: str) -> int:
+    return pictex.cache_info()[name].misses
+
+def test_renders_after_preloading_do_not_load_fonts():
+    pictex.clear_caches()
+    pictex.preload(fonts=[STATIC_FONT_PATH], charsets=["Hello ☺"], font_sizes=[30])
+    misses = {name: _misses(name) for name in ("typefaces", "glyph_fallbacks", "glyph_coverage")}
+
+    Canvas().font_family(STATIC_FONT_PATH).font_size(30).render(Text("Hello ☺ olleH"))
+
+    assert {name: _misses(name) for name in misses} == misses
+
+def test_preloaded_images_are_shared():
+    pictex.clear_caches()
+    pictex.preload(images=[IMAGE_PATH])
+
+    Canvas().render(Image(IMAGE_PATH))
+
+    assert pictex.cache_info()["images"][:2] == (1, 1)
+
+def test_missing_images_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        pictex.preload(images=[str(tmp_path / "missing.png")])
+
+def _typeface_misses_after_render(_) -> int:
+    Canvas().font_family(STATIC_FONT_PATH).render("Hello")
+    return _misses("typefaces")
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="fork is not available")
+def test_forked_workers_start_warm():
+    pictex.clear_caches()
+    pictex.preload(fonts=[STATIC_FONT_PATH])
+    misses = _misses("typefaces")
+
+    with multiprocessing.get_context("fork").Pool(1) as pool:
+        assert pool.map(_typeface_misses_after_render, [None]) == [misses]
@@ -0,0 +1,58 @@
+from pictex import *
+from pictex.nodes.render_cache import RenderCache
+from pictex.text import TextShaper, FontManager
+from .conftest import STATIC_FONT_PATH
+
+def _calendar() -> Column:
+    header = Row(*[Text(day).padding(4).background_color("#34495e").color("white") for day in "MTWTFSS"]).gap(2)
+    weeks = [
+        Row(*[Text("—").padding(4).border(1, "black").box_shadows(Shadow((1, 1), 2, "gray")) for _ in range(7)]).gap(2)
+        for _ in range(5)
+    ]
+    return Column(header, *weeks).gap(2).padding(10)
+
+def _count_shaping(monkeypatch) -> list:
+    calls = []
+    original_shape = TextShaper.shape
+
+    def shape(self, text):
+        calls.append(text)
+        return original_shape(self, text)
+
+    monkeypatch.setattr(TextShaper, "shape", shape)
+    return calls
+
+def test_identical_text_nodes_are_shaped_once(monkeypatch):
+    calls = _count_shaping(monkeypatch)
+
+    Canvas().font_family(STATIC_FONT_PATH).render(_calendar())
+
+    assert sorted(set(calls)) == sorted(set("MTWFS—"))
+    assert calls.count("—") == 1
+
+def test_shared_results_render_like_unshared(monkeypatch):
+    canvas = Canvas().font_family(STATIC_FONT_PATH).font_size(20)
+    shared = canvas.render(_calendar())
+
+    monkeypatch.setattr(RenderCache, "get_picture", lambda self, node: None)
+    monkeypatch.setattr(RenderCache, "get_text_prototype", lambda self, node: node)
+    unshared = canvas.render(_calendar())
+
+    assert shared.to_bytes() == unshared.to_bytes()
+
+def test_nodes_with_different_styles_are_not_shared(monkeypatch):
+    calls = _count_shaping(monkeypatch)
+
+    Canvas().font_family(STATIC_FONT_PATH).render(Row(Text("a"), Text("a").font_size(30), Text("a").color("red")))
+
+    assert calls == ["a", "a", "a"]
+
+def test_text_nodes_with_the_same_font_share_the_font_manager(monkeypatch):
+    font_managers = []
+    original_init = FontManager.__init__
+    monkeypatch.setattr(FontManager, "__init__", lambda self, *args: font_managers.append(self) or original_init(self, *args))
+
+    table = Column(*[Row(Text(f"Item {index}").color("red"), Text(f"{index} €").padding(4)) for index in range(20)])
+    Canvas().font_family(STATIC_FONT_PATH).render(Column(table, Text("Title").font_size(30), Text("Bold").font_weight(700)))
+
+    assert len(font_managers) == 3
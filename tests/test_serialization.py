@@ -0,0 +1,103 @@
+import json
+import pytest
+import pictex
+from pictex import *
+from .conftest import IMAGE_PATH, STATIC_FONT_PATH
+
+def _fully_styled(builder):
+    return (
+        builder.font_family(STATIC_FONT_PATH)
+        .font_fallbacks("fallback_1.ttf", "fallback_2")
+        .font_size(50)
+        .font_weight(FontWeight.BOLD)
+        .font_style(FontStyle.ITALIC)
+        .line_height(1.5)
+        .text_align('right')
+        .text_wrap('pretty')
+        .color(LinearGradient(colors=["red", "#00FF0080"], stops=[0.2, 1.0], start_point=(0, 0), end_point=(1, 1)))
+        .text_shadows(Shadow([1, 1], 1, 'black'), Shadow([2, 2], 2, 'black'))
+        .text_stroke(10, 'green')
+        .underline(5.0, 'pink')
+        .strikethrough(3.5)
+        .box_shadows(Shadow([3, 3], 3, 'blue'))
+        .padding(10, 20)
+        .margin(1, 2, 3, 4)
+        .background_color('olive')
+        .background_image(IMAGE_PATH, 'tile')
+        .border(3, "red", "dashed")
+        .border_radius("50%", 15.5)
+        .size("50%", "fill-available")
+        .position("center", "75%", x_offset=4)
+    )
+
+def test_to_dict_covers_every_style_property():
+    text = _fully_styled(Text("styled"))
+    data = text.to_dict()
+
+    assert data["type"] == "text"
+    assert set(data["style"]) == set(Style().get_field_names()) - {
+        "horizontal_distribution", "vertical_alignment", "vertical_distribution", "horizontal_alignment", "gap"
+    }
+
+    row = _fully_styled(Row()).gap(5).horizontal_distribution("center").vertical_align("bottom")
+    column = _fully_styled(Column()).vertical_distribution("space-between").horizontal_align("stretch")
+    row_style, column_style = row.to_dict()["style"], column.to_dict()["style"]
+    assert set(row_style) | set(column_style) == set(Style().get_field_names())
+
+def test_round_trip_preserves_style():
+    element = Column(
+        _fully_styled(Text("styled")),
+        Row(Text("a"), Image(IMAGE_PATH).resize(0.5)).gap(3).vertical_align("center"),
+    ).horizontal_align("center")
+
+    data = element.to_dict()
+    rebuilt = pictex.from_dict(data)
+
+    assert rebuilt.to_dict() == data
+    assert json.loads(json.dumps(data)) == data
+    assert rebuilt._children[0]._style.color.get() == element._children[0]._style.color.get()
+    assert rebuilt._children[0]._style.padding.get() == Padding(10, 20, 10, 20)
+
+def test_round_trip_renders_identically():
+    element = Column(
+        Text("Title").font_size(40).color(LinearGradient(["#f12711", "#f5af19"])).underline(),
+        Row(
+            Text("left").text_shadows(Shadow((2, 2), 2, "black")),
+            Text("right").text_stroke(2, "red").color("white"),
+        ).gap(10).border(2, "black", "dotted").border_radius(8),
+        Image(IMAGE_PATH).resize(0.25),
+    ).padding(10).background_color("#EEEEEE").horizontal_align("center")
+    canvas = Canvas().font_family(STATIC_FONT_PATH).font_size(30)
+
+    rebuilt = pictex.from_json(element.to_json())
+
+    assert canvas.render(rebuilt).to_bytes() == canvas.render(element).to_bytes()
+
+def test_json_is_canonical():
+    first = Row(Text("x").font_size(10).padding(5), Text("y").color("red")).gap(2)
+    second = Row(Text("x").padding(5.0).font_size(10.0), Text("y").color("#FF0000")).gap(2.0)
+
+    assert first.to_json() == second.to_json()
+    assert " " not in first.to_json()
+
+def test_to_dict_omits_unset_properties():
+    assert Text("plain").to_dict() == {"type": "text", "text": "plain"}
+    assert Row().to_dict() == {"type": "row"}
+
+def test_from_dict_rejects_unknown_data():
+    with pytest.raises(ValueError):
+        pictex.from_dict({"type": "circle"})
+    with pytest.raises(ValueError):
+        pictex.from_dict({"type": "text", "text": "x", "style": {"font_sizes": 10}})
+
+def test_json_schema_describes_every_style_property():
+    schema = pictex.json_schema()
+
+    style_properties = schema["$defs"]["style"]["properties"]
+    assert set(style_properties) == set(Style().get_field_names())
+
+def test_serialized_trees_match_json_schema():
+    jsonschema = pytest.importorskip("jsonschema")
+    element = Column(_fully_styled(Text("styled")), Row(Image(IMAGE_PATH).resize(2)))
+
+    jsonschema.validate(element.to_dict(), pictex.json_schema())
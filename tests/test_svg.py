@@ -1,5 +1,10 @@
+import base64
+import io
+import re
+import pytest
+import pictex
 from pictex import Canvas
-from .conftest import STATIC_FONT_PATH
+from .conftest import STATIC_FONT_PATH, VARIABLE_WGHT_FONT_PATH
 
 def test_svg_with_embedded_font():
     """
@@ -30,3 +35,71 @@ def test_svg_without_embedded_font():
     assert "@font-face" in svg_content
     assert "base64" not in svg_content
     assert "font-family: 'pictex-Lato'" in svg_content
+
+def _embedded_font(svg_content: str) -> bytes:
+    return base64.b64decode(re.search(r"base64,([^']+)'", svg_content).group(1))
+
+def test_embedded_fonts_only_include_the_used_glyphs():
+    ttLib = pytest.importorskip("fontTools.ttLib")
+    canvas = Canvas().font_family(VARIABLE_WGHT_FONT_PATH)
+
+    full_svg = canvas.render_as_svg("Hello", subset_fonts=False).svg
+    subset_svg = canvas.render_as_svg("Hello").svg
+
+    font = ttLib.TTFont(io.BytesIO(_embedded_font(subset_svg)))
+    assert set(font.getBestCmap()) == set(map(ord, "Helo"))
+    assert "fvar" in font
+    assert len(subset_svg) < len(full_svg) / 10
+
+def test_subset_fonts_are_cached():
+    pytest.importorskip("fontTools")
+    from pictex.renderer.font_subsetter import subset_font
+    pictex.clear_caches()
+
+    first = subset_font(STATIC_FONT_PATH, "Hello")
+    second = subset_font(STATIC_FONT_PATH, "olleH")
+
+    assert second is first
+    assert pictex.cache_info()["font_subsets"][:2] == (1, 1)
+
+def test_embedded_fonts_can_be_woff2():
+    pytest.importorskip("fontTools")
+    pytest.importorskip("brotli")
+    svg_content = Canvas().font_family(STATIC_FONT_PATH).render_as_svg("Hello", woff2_fonts=True).svg
+
+    assert "src: url('data:font/woff2;base64," in svg_content
+    assert "format('woff2')" in svg_content
+    assert _embedded_font(svg_content).startswith(b"wOF2")
+
+def test_whole_embedded_fonts_can_be_woff2():
+    pytest.importorskip("fontTools")
+    pytest.importorskip("brotli")
+    canvas = Canvas().font_family(STATIC_FONT_PATH)
+
+    svg_content = canvas.render_as_svg("Hello", subset_fonts=False, woff2_fonts=True).svg
+    full_font = _embedded_font(canvas.render_as_svg("Hello", subset_fonts=False).svg)
+
+    assert "format('woff2')" in svg_content
+    woff2_font = _embedded_font(svg_content)
+    assert woff2_font.startswith(b"wOF2")
+    assert len(woff2_font) < len(full_font) / 2
+
+def test_repeated_exports_do_not_read_the_fonts(monkeypatch):
+    canvas = Canvas().font_family(STATIC_FONT_PATH)
+    pictex.clear_caches()
+    first = canvas.render_as_svg("Hello").svg
+
+    def fail_to_open(*args, **kwargs):
+        raise AssertionError("Font files should not be read again")
+    monkeypatch.setattr("builtins.open", fail_to_open)
+    second = canvas.render_as_svg("Hello").svg
+
+    assert second == first
+    assert pictex.cache_info()["font_face_css"][:2] == (1, 1)
+
+def test_instances_of_a_variable_font_are_embedded_once():
+    canvas = Canvas().font_family(VARIABLE_WGHT_FONT_PATH)
+
+    svg_content = canvas.render_as_svg(pictex.Row("Light", pictex.Text("Bold").font_weight(700))).svg
+
+    assert svg_content.count("@font-face") == 1
@@ -0,0 +1,198 @@
+import os
+import shutil
+from threading import Thread
+import skia
+import pytest
+from pictex.models import TypefaceSource
+from pictex.text import TypefaceLoader
+from pictex.text import system_font_index
+from pictex.text.system_font_index import SystemFontIndex
+from .conftest import STATIC_FONT_PATH, VARIABLE_WGHT_FONT_PATH
+
+STYLES = [
+    skia.FontStyle.Normal(),
+    skia.FontStyle.Bold(),
+    skia.FontStyle.Italic(),
+    skia.FontStyle(700, skia.FontStyle.kCondensed_Width, skia.FontStyle.kItalic_Slant),
+]
+
+@pytest.fixture
+def font_dir(tmp_path):
+    directory = tmp_path / "fonts"
+    (directory / "lato").mkdir(parents=True)
+    shutil.copy(STATIC_FONT_PATH, directory / "lato")
+    shutil.copy(VARIABLE_WGHT_FONT_PATH, directory)
+    return str(directory)
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+def _describe(typeface):
+    return system_font_index._describe(typeface) if typeface is not None else None
+
+def _bold_instance(path):
+    coordinates = skia.FontArguments.VariationPosition.Coordinates([
+        skia.FontArguments.VariationPosition.Coordinate(axis=0x77676874, value=700) # 'wght'
+    ])
+    arguments = skia.FontArguments()
+    arguments.setVariationDesignPosition(skia.FontArguments.VariationPosition(coordinates))
+    return skia.Typeface.MakeFromFile(path).makeClone(arguments)
+
+def test_index_lists_the_installed_faces(font_dir, cache_dir):
+    index = SystemFontIndex.build([font_dir], cache_dir)
+
+    assert [entry.family for entry in index.entries] == ["Oswald", "Lato"]
+    assert [entry.postscript_name for entry in index.entries] == ["Oswald-Regular", "Lato-BoldItalic"]
+    assert index.entries[1].describes(skia.Typeface.MakeFromFile(STATIC_FONT_PATH))
+
+def test_index_is_only_loaded_once_built(font_dir, cache_dir):
+    assert SystemFontIndex.load([font_dir], cache_dir) is None
+
+    entries = SystemFontIndex.build([font_dir], cache_dir).entries
+
+    assert SystemFontIndex.load([font_dir], cache_dir).entries == entries
+
+def test_index_is_not_built_again(font_dir, cache_dir, monkeypatch):
+    entries = SystemFontIndex.build([font_dir], cache_dir).entries
+
+    monkeypatch.setattr(system_font_index, "_scan_fonts", lambda directories: pytest.fail("The index was built again"))
+
+    assert SystemFontIndex.build([font_dir], cache_dir).entries == entries
+
+def test_index_is_rebuilt_when_fonts_change(font_dir, cache_dir):
+    SystemFontIndex.build([font_dir], cache_dir)
+
+    os.remove(os.path.join(font_dir, "lato", "Lato-BoldItalic.ttf"))
+    os.utime(os.path.join(font_dir, "lato"), ns=(0, 0))
+
+    assert SystemFontIndex.load([font_dir], cache_dir) is None
+    assert [entry.family for entry in SystemFontIndex.build([font_dir], cache_dir).entries] == ["Oswald"]
+
+def test_index_is_not_built_if_it_cannot_be_saved(font_dir, tmp_path):
+    not_a_directory = tmp_path / "file"
+    not_a_directory.write_text("")
+
+    assert SystemFontIndex.build([font_dir], str(not_a_directory / "cache")) is None
+
+def test_builds_wait_for_the_process_building_the_index(font_dir, cache_dir):
+    os.makedirs(cache_dir)
+    results = []
+    build = Thread(target=lambda: results.append(SystemFontIndex.build([font_dir], cache_dir)))
+
+    with system_font_index._locked(cache_dir):
+        build.start()
+        build.join(timeout=0.5)
+        assert build.is_alive()
+    build.join()
+
+    assert [entry.family for entry in results[0].entries] == ["Oswald", "Lato"]
+
+def test_recorded_matches_are_persisted(font_dir, cache_dir):
+    index = SystemFontIndex.build([font_dir], cache_dir)
+    lato = skia.Typeface.MakeFromFile(os.path.join(font_dir, "lato", "Lato-BoldItalic.ttf"))
+
+    assert index.record_match(("family", "Lato", None), lato)
+    assert index.record_match(("glyph", 0x10FFFD), None)
+    # Not an indexed face: only the default instance of variable fonts is
+    assert not index.record_match(("family", "Other", None), _bold_instance(VARIABLE_WGHT_FONT_PATH))
+    index.save()
+
+    loaded = SystemFontIndex.load([font_dir], cache_dir)
+    assert loaded.get_match(("family", "Lato", None)).family == "Lato"
+    assert loaded.get_match(("glyph", 0x10FFFD), "missing") is None
+    assert loaded.get_match(("family", "Other", None), "missing") == "missing"
+
+def test_saving_keeps_the_matches_of_other_processes(font_dir, cache_dir):
+    SystemFontIndex.build([font_dir], cache_dir)
+    first = SystemFontIndex.load([font_dir], cache_dir)
+    second = SystemFontIndex.load([font_dir], cache_dir)
+
+    first.record_match(("glyph", 1), None)
+    first.save()
+    second.record_match(("glyph", 2), None)
+    second.save()
+
+    loaded = SystemFontIndex.load([font_dir], cache_dir)
+    assert loaded.get_match(("glyph", 1), "missing") is None
+    assert loaded.get_match(("glyph", 2), "missing") is None
+
+@pytest.fixture
+def indexed_loader(monkeypatch):
+    def use_index(index):
+        monkeypatch.setattr(TypefaceLoader, "_system_font_index", index)
+        TypefaceLoader._typefaces.cache_clear()
+        TypefaceLoader._glyph_typefaces.cache_clear()
+
+    monkeypatch.setattr(TypefaceLoader, "_system_font_index_loaded", True)
+    # A build started by another test must not replace the index
+    monkeypatch.setattr(TypefaceLoader, "_system_font_index_builder", None)
+    yield use_index
+    TypefaceLoader._typefaces.cache_clear()
+    TypefaceLoader._glyph_typefaces.cache_clear()
+
+class _FontManager:
+    def __init__(self, typeface):
+        self._typeface = typeface
+
+    def matchFamilyStyleCharacter(self, *args):
+        return self._typeface
+
+def test_loader_records_the_font_manager_choices(indexed_loader, font_dir, cache_dir, monkeypatch):
+    indexed_loader(SystemFontIndex.build([font_dir], cache_dir))
+    oswald = skia.Typeface.MakeFromFile(os.path.join(font_dir, "Oswald-VariableFont_wght.ttf"))
+    monkeypatch.setattr(TypefaceLoader, "_get_font_manager", lambda: _FontManager(oswald))
+    assert TypefaceLoader.load_for_glyph("Ā", skia.FontStyle.Normal()) is oswald
+    TypefaceLoader._save_system_font_index(wait=True)
+
+    indexed_loader(SystemFontIndex.load([font_dir], cache_dir))
+    monkeypatch.setattr(TypefaceLoader, "_get_font_manager", lambda: pytest.fail("The system font manager was used"))
+    typeface = TypefaceLoader.load_for_glyph("Ā", skia.FontStyle.Normal())
+
+    assert _describe(typeface) == _describe(oswald)
+    assert TypefaceLoader.get_typeface_loading_info(typeface).source == TypefaceSource.SYSTEM
+
+def test_loader_loads_recorded_families(indexed_loader, font_dir, cache_dir):
+    index = SystemFontIndex.build([font_dir], cache_dir)
+    # Lato isn't installed, so the system font manager would return another family
+    index.record_match(("family", "Lato", [400, 5, 0]), skia.Typeface.MakeFromFile(os.path.join(font_dir, "lato", "Lato-BoldItalic.ttf")))
+    indexed_loader(index)
+
+    typeface = TypefaceLoader.load_system_font("Lato", skia.FontStyle.Normal())
+
+    assert typeface.getFamilyName() == "Lato"
+    assert TypefaceLoader.get_typeface_loading_info(typeface).source == TypefaceSource.SYSTEM
+
+@pytest.fixture(scope="module")
+def installed_fonts_cache_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("installed_fonts"))
+
+@pytest.mark.parametrize("style", STYLES, ids=["normal", "bold", "italic", "bold_condensed_italic"])
+def test_loader_chooses_the_fonts_of_the_font_manager(indexed_loader, installed_fonts_cache_dir, style):
+    font_manager = skia.FontMgr()
+    glyphs = ["a", "Ā", "√", "☺", "日", "😀", chr(0x10FFFD)]
+    families = ["DejaVu Sans", "DejaVu Serif", "sans-serif", "monospace", "Missing Family"]
+    expected_glyphs = [_describe(font_manager.matchFamilyStyleCharacter("", style, [], ord(glyph))) for glyph in glyphs]
+    expected_families = [_describe(skia.Typeface(family, style)) for family in families]
+
+    # Recorded by the first pass, and loaded from the index by the second one
+    for _ in range(2):
+        indexed_loader(SystemFontIndex.build(cache_dir=installed_fonts_cache_dir))
+        assert [_describe(TypefaceLoader.load_for_glyph(glyph, style)) for glyph in glyphs] == expected_glyphs
+        assert [_describe(TypefaceLoader.load_system_font(family, style)) for family in families] == expected_families
+        TypefaceLoader._save_system_font_index(wait=True)
+
+def test_warm_up_loads_the_index_and_flush_saves_the_matches(tmp_path, monkeypatch):
+    monkeypatch.setenv("PICTEX_CACHE_DIR", str(tmp_path))
+    TypefaceLoader.invalidate()
+    try:
+        TypefaceLoader.warm_up()
+        assert TypefaceLoader._get_system_font_index() is not None
+
+        TypefaceLoader.load_for_glyph("☺", skia.FontStyle.Bold())
+        TypefaceLoader.flush()
+
+        index = SystemFontIndex.load(cache_dir=str(tmp_path))
+        assert index.get_match(("glyph", ord("☺"), 700, 5, 0), "missing") != "missing"
+    finally:
+        TypefaceLoader.invalidate()
@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+import skia
+import pictex
+from pictex.models import Style, FontSmoothing, Line, TextRun
+from pictex.text import FontManager, TextShaper, TypefaceLoader
+from pictex.text.run_shaper import shape_run
+from .conftest import STATIC_FONT_PATH, VARIABLE_WGHT_FONT_PATH
+
+def _shape_lines(text: str, fallbacks: list[str], font_size: float = 50) -> list[Line]:
+    # The default typeface is shared by every shaper, so shaped lines can be reused between them
+    style = Style()
+    style.font_size.set(font_size)
+    style.font_fallbacks.set(fallbacks)
+    return TextShaper(style, FontManager(style, FontSmoothing.SUBPIXEL)).shape(text)
+
+def _shape_runs(text: str, fallbacks: list[str]) -> list[list[tuple[str, str]]]:
+    style = Style()
+    style.font_family.set(STATIC_FONT_PATH)
+    style.font_fallbacks.set(fallbacks)
+    shaper = TextShaper(style, FontManager(style, FontSmoothing.SUBPIXEL))
+    return [
+        [(run.text, run.font.getTypeface().getFamilyName()) for run in line.runs]
+        for line in shaper.shape(text)
+    ]
+
+def test_runs_are_split_by_font():
+    # 'Ā' and 'Č' are only supported by the fallback font (Oswald)
+    lines = _shape_runs("abĀČcd\nĀ\n\nxy", [VARIABLE_WGHT_FONT_PATH])
+
+    assert lines == [
+        [("ab", "Lato"), ("ĀČ", "Oswald"), ("cd", "Lato")],
+        [("Ā", "Oswald")],
+        [],
+        [("xy", "Lato")],
+    ]
+
+def test_long_fallback_runs_are_grouped():
+    text = "a" + "Ā" * 10_000 + "b"
+
+    lines = _shape_runs(text, [VARIABLE_WGHT_FONT_PATH])
+
+    assert lines == [[("a", "Lato"), ("Ā" * 10_000, "Oswald"), ("b", "Lato")]]
+
+def test_unsupported_glyphs_without_fallbacks_keep_the_text():
+    text = "abĀČcd" * 3
+
+    lines = _shape_runs(text, [])
+
+    assert "".join(run_text for run_text, _ in lines[0]) == text
+
+def test_shaped_lines_are_reused_between_shapers():
+    pictex.clear_caches()
+    first = _shape_lines("shared line\nother", [])
+    second = _shape_lines("other\nshared line", [])
+
+    assert second[0] is first[1]
+    assert second[1] is first[0]
+    info = pictex.cache_info()["shaped_lines"]
+    assert (info.hits, info.misses, info.currsize) == (2, 2, 2)
+    assert 0 < info.currbytes <= info.maxbytes
+
+def test_shaped_lines_depend_on_font_size():
+    pictex.clear_caches()
+    small = _shape_lines("text", [], font_size=10)
+    big = _shape_lines("text", [], font_size=20)
+
+    assert small[0] is not big[0]
+    assert big[0].width > small[0].width
+
+def test_font_invalidation_clears_shaped_lines():
+    first = _shape_lines("text", [])
+
+    TypefaceLoader.invalidate()
+
+    assert pictex.cache_info()["shaped_lines"].currsize == 0
+    assert _shape_lines("text", [])[0] is not first[0]
+
+def test_font_metrics_follow_the_font_size():
+    style = Style()
+    style.font_family.set(STATIC_FONT_PATH)
+    style.font_size.set(20)
+    font_manager = FontManager(style, FontSmoothing.SUBPIXEL)
+    metrics = font_manager.get_primary_font_metrics()
+
+    assert font_manager.get_primary_font_metrics() is metrics
+    assert metrics.ascent < 0 < metrics.descent
+    assert metrics.height == TextShaper(style, font_manager).shape("Hello")[0].height
+    assert font_manager.with_font_size(40).get_primary_font_metrics().height == pytest.approx(2 * metrics.height, rel=0.05)
+
+def test_fallbacks_are_loaded_when_a_glyph_needs_them(monkeypatch):
+    pictex.clear_caches()
+    style = Style()
+    style.font_family.set(STATIC_FONT_PATH)
+    style.font_fallbacks.set([VARIABLE_WGHT_FONT_PATH, STATIC_FONT_PATH])
+    font_manager = FontManager(style, FontSmoothing.SUBPIXEL)
+    loaded = []
+    create_font_typeface = font_manager._create_font_typeface
+    monkeypatch.setattr(font_manager, "_create_font_typeface", lambda font: loaded.append(font) or create_font_typeface(font))
+    shaper = TextShaper(style, font_manager)
+
+    shaper.shape("only supported glyphs")
+    assert loaded == []
+
+    # 'Ā' is supported by the first fallback, so the second one is never needed
+    shaper.shape("abĀ")
+    shaper.with_font_size(20).shape("Č")
+    assert loaded == [VARIABLE_WGHT_FONT_PATH]
+
+def test_grapheme_clusters_are_not_split_between_fonts():
+    # Lato has no combining marks, Oswald does
+    lines = _shape_runs("ae\u0301b", [VARIABLE_WGHT_FONT_PATH])
+
+    assert lines == [[("a", "Lato"), ("e\u0301", "Oswald"), ("b", "Lato")]]
+
+def test_invisible_codepoints_keep_the_font_of_their_cluster():
+    # Neither font has glyphs for ZWJ or variation selectors
+    assert _shape_runs("x\u200dy\ufe0fz", [VARIABLE_WGHT_FONT_PATH]) == [[("x\u200dy\ufe0fz", "Lato")]]
+
+def test_ascii_lines_skip_the_coverage_checks(monkeypatch):
+    _shape_runs("warm up", [])
+
+    monkeypatch.setattr(TextShaper, "_get_glyphs_support", lambda *args: pytest.fail("Coverage was checked"))
+
+    assert _shape_runs("Plain ASCII text, 100% covered!", []) == [[("Plain ASCII text, 100% covered!", "Lato")]]
+
+@pytest.fixture
+def monospace_family():
+    typeface = skia.FontMgr().matchFamilyStyle("monospace", skia.FontStyle.Normal())
+    if typeface is None or not typeface.isFixedPitch():
+        pytest.skip("There isn't any monospaced system font")
+    return typeface.getFamilyName()
+
+@pytest.mark.parametrize("font_size", [9, 14, 50])
+def test_monospaced_lines_are_positioned_like_shaped_ones(monospace_family, font_size):
+    pictex.clear_caches()
+    style = Style()
+    style.font_family.set(monospace_family)
+    style.font_size.set(font_size)
+    font_manager = FontManager(style, FontSmoothing.SUBPIXEL)
+    text = "def shape(self, text: str) -> list[Line]:  # ~100% {ok}"
+
+    assert font_manager.get_monospace_advance() is not None
+    line = TextShaper(style, font_manager).shape(text)[0]
+    shaped_run = TextRun(text, font_manager.get_primary_font())
+    shape_run(shaped_run)
+
+    assert line.width == pytest.approx(shaped_run.width)
+    assert np.array_equal(line.runs[0].glyphs, shaped_run.glyphs)
+    assert np.allclose(line.runs[0].positions, shaped_run.positions)
+
+def test_proportional_fonts_have_no_monospace_advance():
+    style = Style()
+    style.font_family.set(STATIC_FONT_PATH)
+
+    assert FontManager(style, FontSmoothing.SUBPIXEL).get_monospace_advance() is None
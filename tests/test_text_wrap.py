@@ -0,0 +1,102 @@
+import pytest
+import pictex
+from pictex import Canvas, Text, Row, Column, TextWrap
+from pictex.models import Style, FontSmoothing
+from pictex.text import FontManager, TextShaper
+from pictex.text.text_shaper import _break_lines_greedily, _break_lines_optimally
+from .conftest import STATIC_FONT_PATH
+
+TEXT = "The quick brown fox jumps over the lazy dog"
+
+def _create_shaper(text_wrap: TextWrap = TextWrap.WRAP) -> TextShaper:
+    style = Style()
+    style.font_family.set(STATIC_FONT_PATH)
+    style.font_size.set(30)
+    style.text_wrap.set(text_wrap)
+    return TextShaper(style, FontManager(style, FontSmoothing.SUBPIXEL))
+
+def _texts(lines) -> list[str]:
+    return ["".join(run.text for run in line.runs) for line in lines]
+
+def test_greedy_breaker_fills_each_line():
+    assert _break_lines_greedily([0, 1, 1, 1], [3, 2, 2, 5], max_width=6) == [0, 2, 3]
+
+def test_optimal_breaker_balances_the_lines():
+    # Greedy leaves a line with 4 units of free space, the optimal fit spreads it: 3 + 1
+    assert _break_lines_optimally([0, 1, 1, 1], [3, 2, 2, 5], max_width=6) == [0, 1, 3]
+
+@pytest.mark.parametrize("breaker", [_break_lines_greedily, _break_lines_optimally])
+def test_words_wider_than_the_line_get_their_own_line(breaker):
+    assert breaker([0, 1, 1], [2, 10, 2], max_width=5) == [0, 1, 2]
+
+def test_lines_fit_in_the_max_width():
+    lines = _create_shaper().shape(TEXT, max_width=200)
+
+    assert len(lines) > 1
+    assert all(line.width <= 200 for line in lines)
+    assert " ".join(_texts(lines)) == TEXT
+
+def test_optimal_wrap_keeps_the_words():
+    lines = _create_shaper(TextWrap.PRETTY).shape(TEXT, max_width=200)
+
+    assert all(line.width <= 200 for line in lines)
+    assert " ".join(_texts(lines)) == TEXT
+
+def test_nowrap_ignores_the_max_width():
+    lines = _create_shaper(TextWrap.NOWRAP).shape(TEXT, max_width=200)
+
+    assert _texts(lines) == [TEXT]
+
+def test_explicit_newlines_and_indentation_are_kept():
+    lines = _create_shaper().shape("  first paragraph\n\nsecond", max_width=10_000)
+
+    assert _texts(lines) == ["  first paragraph", "", "second"]
+
+@pytest.mark.parametrize("no_break_space", ["\u00a0", "\u2007", "\u202f"])
+def test_no_break_spaces_join_the_words(no_break_space):
+    text = no_break_space.join(["aaaa", "bbbb", "cccc"])
+
+    lines = _create_shaper().shape(f"{text} dd", max_width=60)
+
+    assert _texts(lines) == [text, "dd"]
+
+def test_trailing_spaces_are_kept():
+    lines = _create_shaper().shape("first second  ", max_width=100)
+
+    assert _texts(lines) == ["first", "second  "]
+
+def test_rewrapping_does_not_measure_words_again():
+    pictex.clear_caches()
+    shaper = _create_shaper()
+    shaper.shape(TEXT, max_width=300)
+    misses = pictex.cache_info()["shaped_lines"].misses
+
+    narrow_lines = shaper.shape(TEXT, max_width=150)
+
+    assert pictex.cache_info()["shaped_lines"].misses == misses
+    assert len(narrow_lines) > 1
+
+def test_wrapped_text_grows_in_height():
+    canvas = Canvas().font_family(STATIC_FONT_PATH).font_size(30)
+
+    single_line = canvas.render(Text(TEXT).size(width=200))
+    wrapped = canvas.render(Text(TEXT).size(width=200).text_wrap("wrap"))
+
+    assert wrapped.width == 200
+    assert wrapped.height > 1.5 * single_line.height
+
+def test_text_wraps_to_percent_width():
+    canvas = Canvas().font_family(STATIC_FONT_PATH).font_size(30).text_wrap("wrap")
+
+    image = canvas.render(Column(Text(TEXT).size(width="50%")).size(width=400))
+
+    assert image.height > 1.5 * canvas.render(Text("The")).height
+
+def test_fill_available_text_wraps_and_grows_its_row():
+    canvas = Canvas().font_family(STATIC_FONT_PATH).font_size(30).text_wrap("wrap")
+    label = Text("Label:")
+
+    image = canvas.render(Row(label, Text(TEXT).size(width="fill-available")).size(width=400))
+
+    assert image.width == 400
+    assert image.height > 1.5 * canvas.render(label).height
@@ -0,0 +1,189 @@
+import os
+import shutil
+import skia
+import pytest
+from pictex import Canvas
+from pictex.models import TypefaceLoadingInfo, TypefaceSource
+from pictex.text import TypefaceLoader
+from pictex.text.typeface_loader import _TypefaceRegistry, _MIN_PRUNING_SIZE
+from .conftest import STATIC_FONT_PATH, VARIABLE_WGHT_FONT_PATH
+
+class _CountingFontManager:
+    def __init__(self, font_manager: skia.FontMgr):
+        self._font_manager = font_manager
+        self.calls = 0
+
+    def matchFamilyStyleCharacter(self, *args):
+        self.calls += 1
+        return self._font_manager.matchFamilyStyleCharacter(*args)
+
+@pytest.fixture
+def without_system_font_index(monkeypatch):
+    monkeypatch.setattr(TypefaceLoader, "_system_font_index", None)
+    monkeypatch.setattr(TypefaceLoader, "_system_font_index_loaded", True)
+
+@pytest.fixture
+def font_manager(monkeypatch, without_system_font_index):
+    counting_font_manager = _CountingFontManager(TypefaceLoader._get_font_manager())
+    monkeypatch.setattr(TypefaceLoader, "_font_manager", counting_font_manager)
+    TypefaceLoader._glyph_typefaces.cache_clear()
+    yield counting_font_manager
+    TypefaceLoader._glyph_typefaces.cache_clear()
+
+def test_glyph_fallbacks_are_memoized(font_manager):
+    style = skia.FontStyle.Normal()
+    first = TypefaceLoader.load_for_glyph("☺", style)
+    registered = len(TypefaceLoader._registry)
+
+    second = TypefaceLoader.load_for_glyph("☺", skia.FontStyle.Normal())
+
+    assert second is first
+    assert font_manager.calls == 1
+    assert len(TypefaceLoader._registry) == registered
+
+def test_glyph_fallbacks_depend_on_style(font_manager):
+    TypefaceLoader.load_for_glyph("a", skia.FontStyle.Normal())
+    TypefaceLoader.load_for_glyph("a", skia.FontStyle.Bold())
+    TypefaceLoader.load_for_glyph("a", skia.FontStyle.Bold())
+
+    assert font_manager.calls == 2
+
+def test_missing_glyph_fallbacks_are_memoized(font_manager):
+    private_use_codepoint = chr(0x10FFFD)
+
+    results = [TypefaceLoader.load_for_glyph(private_use_codepoint, skia.FontStyle.Normal()) for _ in range(3)]
+
+    assert results[0] is results[1] is results[2]
+    assert font_manager.calls == 1
+
+@pytest.fixture
+def typefaces():
+    TypefaceLoader._typefaces.cache_clear()
+    yield TypefaceLoader._typefaces
+    TypefaceLoader._typefaces.cache_clear()
+
+def test_file_typefaces_are_cached(typefaces):
+    first = TypefaceLoader.load_from_file(STATIC_FONT_PATH)
+    registered = len(TypefaceLoader._registry)
+
+    second = TypefaceLoader.load_from_file(STATIC_FONT_PATH)
+
+    assert second is first
+    assert len(TypefaceLoader._registry) == registered
+    assert (typefaces.cache_info().hits, typefaces.cache_info().misses) == (1, 1)
+
+def test_modified_font_files_are_loaded_again(typefaces, tmp_path):
+    font_path = tmp_path / "font.ttf"
+    shutil.copy(STATIC_FONT_PATH, font_path)
+    first = TypefaceLoader.load_from_file(str(font_path))
+
+    os.utime(font_path, ns=(0, os.stat(font_path).st_mtime_ns + 10**9))
+    second = TypefaceLoader.load_from_file(str(font_path))
+
+    assert second is not first
+    assert second.getFamilyName() == first.getFamilyName()
+
+def test_missing_font_files_are_not_loaded(typefaces, tmp_path):
+    assert TypefaceLoader.load_from_file(str(tmp_path / "missing.ttf")) is None
+
+def test_system_typefaces_are_cached_per_style(typefaces, without_system_font_index):
+    regular = TypefaceLoader.load_system_font("DejaVu Sans", skia.FontStyle.Normal())
+    bold = TypefaceLoader.load_system_font("DejaVu Sans", skia.FontStyle.Bold())
+
+    assert TypefaceLoader.load_system_font("DejaVu Sans", skia.FontStyle.Normal()) is regular
+    assert TypefaceLoader.load_system_font("DejaVu Sans", skia.FontStyle.Bold()) is bold
+    assert typefaces.cache_info().misses == 2
+
+def test_invalidate_forgets_typefaces(typefaces):
+    first = TypefaceLoader.load_from_file(STATIC_FONT_PATH)
+
+    TypefaceLoader.invalidate()
+
+    assert TypefaceLoader.load_from_file(STATIC_FONT_PATH) is not first
+
+def test_warm_renders_do_not_load_typefaces(typefaces):
+    canvas = Canvas().font_family(VARIABLE_WGHT_FONT_PATH).font_fallbacks(STATIC_FONT_PATH).font_weight(700)
+    canvas.render("Warm up")
+    misses = typefaces.cache_info().misses
+
+    canvas.render("Warm up")
+    canvas.render("Again")
+
+    assert typefaces.cache_info().misses == misses
+
+def _load_unshared_typeface() -> skia.Typeface:
+    # A new typeface each time, not cached by TypefaceLoader
+    return skia.Typeface.MakeFromFile(STATIC_FONT_PATH)
+
+def test_registry_finds_typefaces_by_unique_id():
+    registry = _TypefaceRegistry()
+    typeface = _load_unshared_typeface()
+    registry.add(TypefaceLoadingInfo(typeface, TypefaceSource.FILE, STATIC_FONT_PATH))
+
+    assert registry.get(typeface).filepath == STATIC_FONT_PATH
+    assert registry.get(_load_unshared_typeface()) is None
+    assert registry.cache_info()[:2] == (1, 1)
+
+def test_registry_prunes_unreferenced_typefaces():
+    registry = _TypefaceRegistry()
+    typeface = _load_unshared_typeface()
+    registry.add(TypefaceLoadingInfo(typeface, TypefaceSource.FILE, STATIC_FONT_PATH))
+    font = skia.Font(typeface, 20)
+    del typeface
+
+    for _ in range(1000):
+        registry.add(TypefaceLoadingInfo(_load_unshared_typeface(), TypefaceSource.FILE, STATIC_FONT_PATH))
+
+    assert len(registry) < 2 * _MIN_PRUNING_SIZE
+    assert registry.get(font.getTypeface()) is not None
+
+def test_registry_size_is_stable_between_renders():
+    canvas = Canvas().font_family("sans-serif").font_fallbacks(STATIC_FONT_PATH)
+    canvas.render("Hello ☺")
+    size = len(TypefaceLoader._registry)
+
+    for _ in range(20):
+        canvas.render("Hello ☺")
+
+    assert len(TypefaceLoader._registry) == size
+
+@pytest.fixture
+def variations():
+    TypefaceLoader._variations.cache_clear()
+    yield TypefaceLoader._variations
+    TypefaceLoader._variations.cache_clear()
+
+def test_variable_font_instances_are_shared(variations):
+    typeface = TypefaceLoader.load_from_file(VARIABLE_WGHT_FONT_PATH)
+    wght = typeface.getVariationDesignParameters()[0].tag
+
+    bold = TypefaceLoader.clone_with_variations(typeface, ((wght, 700.0),))
+    thin = TypefaceLoader.clone_with_variations(typeface, ((wght, 200.0),))
+
+    assert TypefaceLoader.clone_with_variations(typeface, ((wght, 700.0),)) is bold
+    assert thin is not bold
+    assert (variations.cache_info().hits, variations.cache_info().misses) == (1, 2)
+    assert TypefaceLoader.get_typeface_loading_info(bold).filepath == VARIABLE_WGHT_FONT_PATH
+    assert TypefaceLoader.get_typeface_loading_info(typeface).typeface is typeface
+
+def test_warm_renders_do_not_clone_variable_fonts(variations):
+    canvas = Canvas().font_family(VARIABLE_WGHT_FONT_PATH).font_weight(700)
+    canvas.render("Hello")
+    misses, registered = variations.cache_info().misses, len(TypefaceLoader._registry)
+
+    for _ in range(20):
+        canvas.render("Hello")
+
+    assert variations.cache_info().misses == misses
+    assert len(TypefaceLoader._registry) == registered
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="It reads the memory mappings of the process (Linux)")
+def test_font_files_are_memory_mapped(typefaces, tmp_path):
+    # Mapped files are shared by every process through the page cache, copied bytes would be private to each one
+    font_path = tmp_path / "mapped.ttf"
+    shutil.copy(STATIC_FONT_PATH, font_path)
+
+    skia.Font(TypefaceLoader.load_from_file(str(font_path)), 20).measureText("Hello")
+
+    with open("/proc/self/maps") as memory_maps:
+        assert str(font_path) in memory_maps.read()